@@ -1,12 +1,9 @@
-import asyncio
 import json
 import os
 import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
-import threading
-import time
 from typing import Dict, List, Optional, Tuple
 import webbrowser
 
@@ -15,7 +12,13 @@ from edge_tts import VoicesManager
 import pygame
 import pysrt
 
-# Initialize pygame mixer for audio playback
+from async_loop import get_shared_loop
+from debounce import Debouncer
+from tts_engine import EdgeEngine, SynthesisRequest
+from audio_playback import MusicWatcher, load_music
+
+# Initialize pygame for audio playback, the event system reports when playback ends
+pygame.init()
 pygame.mixer.init()
 
 class EdgeTTSApp:
@@ -44,11 +47,13 @@ class EdgeTTSApp:
         self.current_voice = tk.StringVar()
         self.pitch_value = tk.StringVar(value="0")
         self.rate_value = tk.StringVar(value="0")
-        self.temp_audio_file = os.path.join(os.environ.get('TEMP', '.'), f"edge_tts_temp_{int(time.time())}.mp3")
+        self.preview_audio = None  # Last preview, played from memory
+        self.music_watcher = MusicWatcher(self.root)
         self.current_timestamps = []
         self.is_playing = False
         self.is_previewing = False  # Flag to track if preview is in progress
-        self.preview_thread = None  # Track the preview thread
+        self.preview_future = None  # Track the preview task
+        self.async_loop = get_shared_loop()  # Background loop for all Edge TTS calls
         self.favorites_file = "favorite_voices.json"
         
         # Load favorites if file exists
@@ -79,7 +84,7 @@ class EdgeTTSApp:
         self.setup_voice_list_tab()
         
         # Load voices (async operation)
-        threading.Thread(target=self.load_voices, daemon=True).start()
+        self.load_voices()
 
     def setup_main_tab(self):
         # Voice selection frame
@@ -204,7 +209,7 @@ class EdgeTTSApp:
         ttk.Label(export_frame, text="Format:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         
         self.format_var = tk.StringVar(value="mp3")
-        formats = ["mp3", "wav", "ogg", "webm"]
+        formats = ["mp3", "wav", "ogg", "webm", "flac"]
         format_dropdown = ttk.Combobox(export_frame, textvariable=self.format_var, values=formats, width=8, state="readonly")
         format_dropdown.grid(row=0, column=1, padx=5, pady=5, sticky="w")
         
@@ -237,7 +242,8 @@ class EdgeTTSApp:
         # Search box
         ttk.Label(filter_frame, text="Search:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", self.filter_voices)
+        self.search_debouncer = Debouncer(self.root, self.filter_voices)
+        self.search_var.trace("w", self.search_debouncer.trigger)
         search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=25)
         search_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
         
@@ -410,15 +416,19 @@ class EdgeTTSApp:
         return voices
 
     def load_voices(self):
-        # This runs in a separate thread
+        # Fetch the voice list on the background loop
         self.status_var.set("Loading voices...")
-        
-        # Create event loop in this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Get voices asynchronously
-        voices = loop.run_until_complete(self.get_voices())
+        future = self.async_loop.submit(self.get_voices())
+        future.add_done_callback(self._on_voices_loaded)
+
+    def _on_voices_loaded(self, future):
+        # Called on the loop thread once the voice list has arrived
+        try:
+            voices = future.result()
+        except Exception as e:
+            print(f"Error loading voices: {e}")
+            self.root.after(0, self.status_var.set, f"Error loading voices: {e}")
+            return
         
         # Process voices
         self.organize_voices(voices)
@@ -537,6 +547,9 @@ class EdgeTTSApp:
         self.filter_language_dropdown['values'] = [""] + languages  # Empty option for "All"
     
     def filter_voices(self, *args):
+        # This pass supersedes any search still waiting on the debounce timer
+        self.search_debouncer.cancel()
+        
         # Get filter values
         search_text = self.search_var.get()
         language = self.filter_language_var.get()
@@ -554,6 +567,7 @@ class EdgeTTSApp:
         self.show_favorites_var.set(False)
         
         # Update the list
+        self.search_debouncer.cancel()
         self.update_voice_list()
 
     def update_favorites_dropdown(self):
@@ -751,24 +765,17 @@ class EdgeTTSApp:
             # If there's an error, we'll yield empty data
             yield b""
 
-    async def save_speech(self, text, voice, output_file):
+    async def save_speech(self, text, voice, output_file, output_format="mp3"):
         """Generate speech with Edge TTS and save to file"""
         try:
-            # Create communicate object with plain text
-            communicate = edge_tts.Communicate(text, voice)
-            
-            # Collect timestamps
-            timestamps = []
+            # Long text is split and synthesized in parallel by the engine,
+            # which also converts it to the output format
+            result = await EdgeEngine().synthesize(SynthesisRequest(text=text, voice=voice, format=output_format))
             
-            # Process the stream
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    with open(output_file, "ab") as f:
-                        f.write(chunk["data"])
-                elif chunk["type"] == "WordBoundary":
-                    timestamps.append(chunk)
+            with open(output_file, "wb") as f:
+                f.write(result.audio)
             
-            return timestamps
+            return result.word_boundaries
                 
         except Exception as e:
             print(f"Error in save_speech: {e}")
@@ -792,12 +799,11 @@ class EdgeTTSApp:
             # Cancel the current preview
             self.cancel_preview()
             
-        # Generate a new temporary file name
-        self.temp_audio_file = os.path.join(os.environ.get('TEMP', '.'), f"edge_tts_temp_{int(time.time())}.mp3")
-            
-        # Clear previous audio file if exists
+        # Clear previous audio if any
+        self.preview_audio = None
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
+        self.music_watcher.cancel()
         
         self.is_playing = False
         self.play_pause_button.config(text="Pause", state=tk.DISABLED)
@@ -806,10 +812,9 @@ class EdgeTTSApp:
         self.is_previewing = True
         self.preview_button.config(state=tk.DISABLED)
         
-        # Generate speech in a separate thread
+        # Generate speech on the background loop
         self.status_var.set("Generating speech preview...")
-        self.preview_thread = threading.Thread(target=self._preview_thread, args=(voice_id, text), daemon=True)
-        self.preview_thread.start()
+        self.preview_future = self.async_loop.submit(self._preview_task(voice_id, text))
         
     def cancel_preview(self):
         """Cancel any ongoing preview generation"""
@@ -817,83 +822,64 @@ class EdgeTTSApp:
         # Stop any playing audio
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
+        self.music_watcher.cancel()
         self.is_playing = False
         self.play_pause_button.config(text="Play", state=tk.DISABLED)
-        # The preview thread will terminate itself since it's a daemon thread
-        self.preview_thread = None
+        # Stop the running synthesis instead of letting it finish in the background
+        if self.preview_future:
+            self.preview_future.cancel()
+        self.preview_future = None
         self.status_var.set("Preview cancelled")
 
-    def _preview_thread(self, voice_id, text):
-        # Run in a separate thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+    async def _preview_task(self, voice_id, text):
+        # Runs on the background event loop
         try:
-            # Create the output directory if it doesn't exist
-            temp_dir = os.path.dirname(self.temp_audio_file)
-            if temp_dir and not os.path.exists(temp_dir):
-                os.makedirs(temp_dir, exist_ok=True)
-            
-            # Generate the audio file
-            with open(self.temp_audio_file, "wb") as f:
-                pass  # Create empty file
-            
-            # Generate and write audio
-            async def generate():
-                try:
-                    async for audio_chunk in self.stream_speech(text, voice_id):
-                        # Check if preview was cancelled
-                        if not self.is_previewing:
-                            return
-                            
-                        with open(self.temp_audio_file, "ab") as f:
-                            f.write(audio_chunk)
-                except Exception as e:
-                    # Handle any exceptions during generation
-                    print(f"Error during speech generation: {e}")
-                    self.root.after(0, lambda: self.status_var.set(f"Error: {str(e)}"))
-                    self.root.after(0, lambda: self.preview_button.config(state=tk.NORMAL))
-                    self.is_previewing = False
-                    return
-            
-            loop.run_until_complete(generate())
+            # Collect the audio in memory, the preview never touches the disk
+            audio = bytearray()
+            try:
+                async for audio_chunk in self.stream_speech(text, voice_id):
+                    # Check if preview was cancelled
+                    if not self.is_previewing:
+                        return
+                        
+                    audio.extend(audio_chunk)
+            except Exception as e:
+                # Handle any exceptions during generation
+                print(f"Error during speech generation: {e}")
+                self.root.after(0, lambda: self.status_var.set(f"Error: {str(e)}"))
+                self.root.after(0, lambda: self.preview_button.config(state=tk.NORMAL))
+                self.is_previewing = False
+                return
             
             # If preview was cancelled, don't play
             if not self.is_previewing:
                 return
                 
-            # Small delay to ensure file is fully written
-            time.sleep(0.1)
-                
-            # Play the audio using a method we know exists
+            # Play the audio on the Tk thread
+            self.preview_audio = bytes(audio)
             self.root.after(0, self._play_audio_preview)
             
         except Exception as e:
             # Handle any exceptions
-            print(f"Error in preview thread: {e}")
+            print(f"Error in preview task: {e}")
             self.root.after(0, lambda: self.status_var.set(f"Error: {str(e)}"))
             self.root.after(0, lambda: self.preview_button.config(state=tk.NORMAL))
             self.is_previewing = False
-        finally:
-            # Clean up the event loop
-            loop.close()
 
-        def _play_audio_preview(self):
-            """Play the generated preview audio file"""
+    def _play_audio_preview(self):
+        """Play the generated preview audio"""
         # Play the generated preview
-        if os.path.exists(self.temp_audio_file) and os.path.getsize(self.temp_audio_file) > 0:
+        if self.preview_audio:
             try:
-                pygame.mixer.music.load(self.temp_audio_file)
+                load_music(self.preview_audio)
                 pygame.mixer.music.play()
+                self.music_watcher.watch(self._on_preview_ended)
                 self.is_playing = True
                 self.play_pause_button.config(text="Pause", state=tk.NORMAL)
                 self.status_var.set("Playing preview...")
                 
                 # Re-enable preview button
                 self.preview_button.config(state=tk.NORMAL)
-                
-                # Monitor playback status
-                threading.Thread(target=self._monitor_playback, daemon=True).start()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to play audio: {e}")
                 self.status_var.set("Error playing preview")
@@ -904,28 +890,24 @@ class EdgeTTSApp:
             self.preview_button.config(state=tk.NORMAL)
             self.is_previewing = False
 
-    def _monitor_playback(self):
-        # Monitor playback and update UI when done
-        while pygame.mixer.music.get_busy() and self.is_playing:
-            time.sleep(0.1)
-        
-        if not self.is_playing:
-            return
-        
+    def _on_preview_ended(self):
+        # Called on the Tk thread by the music watcher when playback ends
         self.is_playing = False
         self.is_previewing = False  # Reset preview flag when playback ends
-        self.root.after(0, lambda: self.play_pause_button.config(text="Play", state=tk.NORMAL))
-        self.root.after(0, lambda: self.status_var.set("Preview complete"))
+        self.play_pause_button.config(text="Play", state=tk.NORMAL)
+        self.status_var.set("Preview complete")
 
     def toggle_play_pause(self):
         # Toggle play/pause for preview
         if self.is_playing:
             pygame.mixer.music.pause()
+            self.music_watcher.pause()
             self.is_playing = False
             self.play_pause_button.config(text="Play")
             self.status_var.set("Preview paused")
         else:
             pygame.mixer.music.unpause()
+            self.music_watcher.resume()
             self.is_playing = True
             self.play_pause_button.config(text="Pause")
             self.status_var.set("Playing preview...")
@@ -957,23 +939,14 @@ class EdgeTTSApp:
         if not output_file:
             return
         
-        # Generate speech in a separate thread
+        # Generate speech on the background loop
         self.status_var.set("Generating speech...")
-        threading.Thread(
-            target=self._generate_thread, 
-            args=(voice_id, text, output_file, timestamps_format),
-            daemon=True
-        ).start()
+        self.async_loop.submit(self._generate_task(voice_id, text, output_file, output_format, timestamps_format))
 
-    def _generate_thread(self, voice_id, text, output_file, timestamps_format):
-        # Run in a separate thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+    async def _generate_task(self, voice_id, text, output_file, output_format, timestamps_format):
+        # Runs on the background event loop
         # Generate the audio file
-        timestamps = loop.run_until_complete(
-            self.save_speech(text, voice_id, output_file)
-        )
+        timestamps = await self.save_speech(text, voice_id, output_file, output_format)
         
         # Save timestamps if requested
         if timestamps_format in ["json", "both"]:
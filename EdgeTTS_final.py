@@ -7,13 +7,24 @@ import io
 from tkinter import Scale, DoubleVar, IntVar, BooleanVar, StringVar
 import pygame
 import datetime
-import threading
 import time
-import asyncio
 import edge_tts
-import aiofiles
 import tempfile
 import re
+from tts_chunking import DEFAULT_CONCURRENCY
+from tts_engine import EdgeEngine, SynthesisRequest
+from tts_cache import SynthesisCache, DEFAULT_CACHE_MAX_BYTES
+from async_loop import get_shared_loop
+from audio_playback import StreamingPlayer, MusicWatcher, play_music_from, music_position
+from seek_index import build_seek_index, is_compact, word_at, word_seconds, format_duration
+from scrub_bar import ScrubBar
+from voice_index import VoiceIndex
+from treeview_sync import TreeviewSync
+from debounce import Debouncer
+from history_store import HistoryStore
+from blob_store import BlobStore
+from storage_gc import StorageSweeper
+from transcode import submit_transcode, format_of
 
 class EdgeTTSApp:
     def __init__(self, root):
@@ -36,17 +47,38 @@ class EdgeTTSApp:
         # Initialize favorites list
         self.favorite_voices = []
         
+        # Number of text chunks synthesized in parallel
+        self.max_concurrent_chunks = DEFAULT_CONCURRENCY
+        
+        # Size cap for the synthesis cache
+        self.cache_max_bytes = DEFAULT_CACHE_MAX_BYTES
+        
+        # How long the cached voice list is used before refreshing it (seconds)
+        self.voice_cache_ttl = 24 * 60 * 60
+        
         # Load configuration
         self.load_app_config()
         
+        # Cache of previously synthesized audio and timestamps
+        self.synthesis_cache = SynthesisCache(os.path.join(self.app_dir, "cache"), self.cache_max_bytes)
+        
+        # Background event loop that runs all Edge TTS coroutines
+        self.async_loop = get_shared_loop()
+        self.generation_future = None
+        
         # Load voice data asynchronously
         self.voices_loaded = False
         self.voice_data = {}
         self.voices_by_language = {}
         self.init_voice_data()
         
-        # Load history
-        self.audio_history = self.load_history()
+        # Load history, the History tab only keeps the rows it has shown
+        self.load_history()
+        self.history_rows = []
+        self.history_total = 0
+        self.history_loading = False
+        self.history_query = ""
+        self.selected_history_entry = None
         
         # Create the main frame
         self.main_frame = ttk.Frame(root, padding="10")
@@ -88,6 +120,9 @@ class EdgeTTSApp:
         pygame.init()
         pygame.mixer.init()
         
+        # Reports when the music ends, nothing runs while no audio plays
+        self.music_watcher = MusicWatcher(self.root)
+        
         # Currently playing audio
         self.currently_playing = None
         self.is_paused = False
@@ -101,12 +136,15 @@ class EdgeTTSApp:
         self.status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
-        # Set up an audio status checker 
-        self.root.after(100, self.check_audio_status)
-        
         # Set up cleanup on exit
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
+        # Periodically remove stale temp files and files no history entry uses
+        self.storage_sweeper = StorageSweeper(self.root, self.get_sweep_targets,
+                                              self.history_store.referenced_paths,
+                                              self.on_storage_swept)
+        self.storage_sweeper.start(delay_ms=60 * 1000)
+        
     def load_app_config(self):
         """Load application configuration including favorites"""
         config_file = os.path.join(self.app_dir, "config.json")
@@ -120,6 +158,12 @@ class EdgeTTSApp:
                         self.audio_dir = config['audio_dir']
                     if 'timestamp_dir' in config:
                         self.timestamp_dir = config['timestamp_dir']
+                    if 'max_concurrent_chunks' in config:
+                        self.max_concurrent_chunks = int(config['max_concurrent_chunks'])
+                    if 'cache_max_mb' in config:
+                        self.cache_max_bytes = int(config['cache_max_mb']) * 1024 * 1024
+                    if 'voice_cache_ttl_hours' in config:
+                        self.voice_cache_ttl = float(config['voice_cache_ttl_hours']) * 60 * 60
             except Exception as e:
                 print(f"Error loading config: {str(e)}")
                 self.favorite_voices = []
@@ -140,6 +184,9 @@ class EdgeTTSApp:
             config['favorite_voices'] = self.favorite_voices
             config['audio_dir'] = self.audio_dir
             config['timestamp_dir'] = self.timestamp_dir
+            config['max_concurrent_chunks'] = self.max_concurrent_chunks
+            config['cache_max_mb'] = self.cache_max_bytes // (1024 * 1024)
+            config['voice_cache_ttl_hours'] = self.voice_cache_ttl / (60 * 60)
             
             # Save config
             with open(config_file, 'w') as file:
@@ -151,61 +198,107 @@ class EdgeTTSApp:
             return False
             
     def init_voice_data(self):
-        """Initialize voice data from Edge TTS"""
-        thread = threading.Thread(target=self.load_voice_data)
-        thread.daemon = True
-        thread.start()
+        """Initialize voice data, from the on-disk cache first and then from Edge TTS"""
+        cached_voices, fetched_at = self.load_voice_cache()
+        if cached_voices:
+            # Populate immediately so startup doesn't wait on the network
+            self.process_voice_data(cached_voices)
+            
+        # Refresh in the background when the cache is missing or stale
+        if not cached_voices or time.time() - fetched_at > self.voice_cache_ttl:
+            future = self.async_loop.submit(self.get_edge_voices())
+            future.add_done_callback(self.load_voice_data)
     
-    def load_voice_data(self):
-        """Load voice data in a background thread"""
+    def load_voice_cache(self):
+        """Load the cached voice list, returning (voices, fetched_at)"""
+        cache_file = os.path.join(self.app_dir, "voices_cache.json")
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+                return cache.get('voices', []), cache.get('fetched_at', 0)
+            except Exception as e:
+                print(f"Error loading voice cache: {str(e)}")
+        return [], 0
+    
+    def save_voice_cache(self, voices):
+        """Save the voice list with the time it was fetched"""
+        cache_file = os.path.join(self.app_dir, "voices_cache.json")
         try:
-            # Run the async function to get voices
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            voices = loop.run_until_complete(self.get_edge_voices())
-            
-            # Process voices
-            self.voices_by_language = {}
-            for voice in voices:
-                lang_code = voice["Locale"]
-                gender = voice["Gender"]
-                name = voice["ShortName"]
-                display_name = voice["FriendlyName"]
-                
-                if lang_code not in self.voices_by_language:
-                    self.voices_by_language[lang_code] = {"male": [], "female": [], "neutral": []}
-                
-                gender_key = gender.lower()
-                if gender_key not in ["male", "female"]:
-                    gender_key = "neutral"
+            temp_file = cache_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time(), 'voices': voices}, f, separators=(',', ':'))
+            os.replace(temp_file, cache_file)
+        except Exception as e:
+            print(f"Error saving voice cache: {str(e)}")
+    
+    def load_voice_data(self, future):
+        """Process the voice list once it has been fetched on the background loop"""
+        try:
+            voices = future.result()
+            self.save_voice_cache(voices)
+            
+            # Nothing to redraw if the catalog hasn't changed since it was cached
+            if self.voices_loaded and voices == self.voice_data:
+                return
                 
-                self.voices_by_language[lang_code][gender_key].append({
-                    "name": name,
-                    "display_name": display_name,
-                    "gender": gender
-                })
-            
-            # Create a list of language codes and friendly names
-            self.language_options = []
-            for lang_code in sorted(self.voices_by_language.keys()):
-                # Get a friendly name for the language
-                friendly_name = self.get_language_name(lang_code)
-                self.language_options.append({
-                    "code": lang_code,
-                    "name": friendly_name
-                })
-            
-            self.voices_loaded = True
-            self.voice_data = voices
-            
-            # Update UI elements on the main thread
-            self.root.after(0, self.update_ui_after_voice_loading)
+            self.process_voice_data(voices)
         
         except Exception as e:
             print(f"Error loading voices: {str(e)}")
+            
+            # Keep using the cached catalog when offline
+            if self.voices_loaded:
+                return
+                
             error_message = str(e)
             self.root.after(0, lambda: self.status_var.set(f"Error loading voices: {error_message}"))
     
+    def process_voice_data(self, voices):
+        """Organize the voice list by language and gender and refresh the UI"""
+        # Process voices
+        voices_by_language = {}
+        for voice in voices:
+            lang_code = voice["Locale"]
+            gender = voice["Gender"]
+            name = voice["ShortName"]
+            display_name = voice["FriendlyName"]
+            
+            if lang_code not in voices_by_language:
+                voices_by_language[lang_code] = {"male": [], "female": [], "neutral": []}
+            
+            gender_key = gender.lower()
+            if gender_key not in ["male", "female"]:
+                gender_key = "neutral"
+            
+            voices_by_language[lang_code][gender_key].append({
+                "name": name,
+                "display_name": display_name,
+                "gender": gender
+            })
+        
+        # Create a list of language codes and friendly names
+        language_options = []
+        for lang_code in sorted(voices_by_language.keys()):
+            # Get a friendly name for the language
+            friendly_name = self.get_language_name(lang_code)
+            language_options.append({
+                "code": lang_code,
+                "name": friendly_name
+            })
+        
+        # Search index for the Voice List tab
+        voice_index = VoiceIndex(voices, self.get_language_name)
+        
+        self.voices_by_language = voices_by_language
+        self.language_options = language_options
+        self.voice_index = voice_index
+        self.voices_loaded = True
+        self.voice_data = voices
+        
+        # Update UI elements on the main thread
+        self.root.after(0, self.update_ui_after_voice_loading)
+    
     async def get_edge_voices(self):
         """Get list of voices from Edge TTS"""
         try:
@@ -326,12 +419,16 @@ class EdgeTTSApp:
         # Stop any playing audio
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
+        self._stop_streaming_playback()
+        self.music_watcher.cancel()
             
-        # Clean up temp files
-        self.cleanup_temp_files()
+        # Cancel outstanding synthesis and stop the event loop
+        self.async_loop.stop()
+        self.storage_sweeper.stop()
             
         # Save config
         self.save_app_config()
+        self.history_store.close()
             
         # Properly quit pygame
         pygame.quit()
@@ -339,30 +436,41 @@ class EdgeTTSApp:
         # Close the window
         self.root.destroy()
         
-    def cleanup_temp_files(self):
-        """Clean up any temporary audio files"""
-        if hasattr(self, 'temp_audio_file') and self.temp_audio_file:
-            if os.path.exists(self.temp_audio_file):
-                try:
-                    os.remove(self.temp_audio_file)
-                except:
-                    pass
-    
-    def check_audio_status(self):
-        """Check if music is still playing and update UI accordingly"""
-        # If music was playing but has stopped
-        if hasattr(self, 'play_button') and not pygame.mixer.music.get_busy() and self.play_button.cget('text') == "⏸ Pause":
+    def get_sweep_targets(self):
+        """Directories the storage sweeper cleans
+        
+        Generated audio is kept in memory, so nothing in the temp directory is
+        in use; it only holds files left behind by older versions.
+        """
+        return {
+            'temp_dir': os.path.join(self.app_dir, "temp"),
+            'audio_dirs': [self.audio_dir, os.path.join(self.audio_dir, "blobs")],
+            'timestamp_dirs': [self.timestamp_dir]
+        }
+    
+    def on_storage_swept(self, report):
+        """Report what the storage sweeper reclaimed"""
+        if report['files']:
+            size_mb = report['bytes'] / (1024 * 1024)
+            self.status_var.set(f"Cleaned up {report['files']} unused files ({size_mb:.1f} MB freed)")
+    
+    def on_music_ended(self):
+        """Reset the play buttons once the mixer reports the music has ended"""
+        if hasattr(self, 'play_button') and self.streaming_player is None and self.play_button.cget('text') == "⏸ Pause":
             # Reset the play button
             self.play_button.config(text="▶ Play")
             self.status_var.set("Ready")
         
         # Check history play button if applicable
-        if hasattr(self, 'history_play_button') and self.currently_playing == "history" and not pygame.mixer.music.get_busy() and self.history_play_button.cget('text') == "⏸ Pause":
+        if hasattr(self, 'history_play_button') and self.currently_playing == "history" and self.history_play_button.cget('text') == "⏸ Pause":
             self.history_play_button.config(text="▶ Play")
             self.status_var.set("Ready")
         
-        # Schedule this to run again
-        self.root.after(100, self.check_audio_status)
+        # Return the position slider that was following playback to the start
+        for scrub in (self.tts_scrub, self.history_scrub):
+            if scrub.tracking:
+                scrub.cancel()
+                scrub.set_position(0)
             
     def ensure_directories(self):
         """Ensure that necessary directories exist"""
@@ -373,24 +481,11 @@ class EdgeTTSApp:
         os.makedirs(os.path.join(self.app_dir, "srt"), exist_ok=True)
         
     def load_history(self):
-        """Load audio file history from disk"""
-        history_file = os.path.join(self.app_dir, "history.json")
-        if os.path.exists(history_file):
-            try:
-                with open(history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-        
-    def save_history(self):
-        """Save audio file history to disk"""
-        history_file = os.path.join(self.app_dir, "history.json")
-        try:
-            with open(history_file, 'w') as f:
-                json.dump(self.audio_history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving history: {str(e)}")
+        """Open the history database, importing history.json once, and the blob store it points into"""
+        self.history_store = HistoryStore(
+            os.path.join(self.app_dir, "history.db"),
+            legacy_json_path=os.path.join(self.app_dir, "history.json"))
+        self.blob_store = BlobStore(os.path.join(self.audio_dir, "blobs"))
     
     def is_favorite(self, voice_name):
         """Check if a voice is in favorites"""
@@ -406,9 +501,9 @@ class EdgeTTSApp:
         # Update config
         self.save_app_config()
         
-        # Update UI
+        # Update UI, only the star of this one voice changes in the voice list
         if hasattr(self, 'voices_tree'):
-            self.filter_voices()
+            self.update_voice_favorite_mark(voice_name)
         
         if hasattr(self, 'favorites_tree'):
             self.populate_favorites_listbox()
@@ -416,6 +511,18 @@ class EdgeTTSApp:
         if hasattr(self, 'favorite_combobox'):
             self.update_favorites_dropdown()
     
+    def update_voice_favorite_mark(self, voice_name):
+        """Refresh the favorite star of a single row in the voice list"""
+        if not self.voices_loaded or voice_name not in self.voice_index.by_name:
+            return
+        # With "favorites only" the row may have to appear or disappear, not just change
+        if self.filter_favorites_var.get():
+            self.filter_voices()
+            return
+        row = self.voice_index.rows[self.voice_index.by_name[voice_name]]
+        is_favorite = "★" if self.is_favorite(voice_name) else ""
+        self.voices_tree_sync.update(voice_name, row["values"] + (is_favorite,))
+    
     def update_favorites_dropdown(self):
         """Update the favorites dropdown in the TTS tab"""
         if not self.voices_loaded:
@@ -456,6 +563,7 @@ class EdgeTTSApp:
         
         self.tts_text = scrolledtext.ScrolledText(input_frame, height=8)
         self.tts_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.tts_text.bind("<Button-3>", self.show_text_context_menu)
         self.tts_text.insert(tk.END, "Type text to convert to speech here...")
         
         # Title for the audio file
@@ -527,7 +635,7 @@ class EdgeTTSApp:
         ttk.Label(param_grid, text="Format:").grid(column=2, row=0, sticky=tk.W, padx=5, pady=5)
         
         # Supported audio formats
-        self.formats = ["mp3", "wav", "ogg", "webm"]
+        self.formats = ["mp3", "wav", "ogg", "webm", "flac"]
         self.format_var = tk.StringVar(value="mp3")
         format_combobox = ttk.Combobox(param_grid, textvariable=self.format_var)
         format_combobox['values'] = self.formats
@@ -606,6 +714,16 @@ class EdgeTTSApp:
         ssml_info_button = ttk.Button(ssml_frame, text="ℹ️", width=2, command=self.show_ssml_info)
         ssml_info_button.pack(side=tk.LEFT, padx=2)
         
+        # Streaming playback checkbox
+        stream_frame = ttk.Frame(param_grid)
+        stream_frame.grid(column=0, row=5, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        
+        ttk.Label(stream_frame, text="Play While Generating:").pack(side=tk.LEFT)
+        
+        self.stream_playback_var = BooleanVar(value=False)
+        stream_check = ttk.Checkbutton(stream_frame, variable=self.stream_playback_var)
+        stream_check.pack(side=tk.LEFT, padx=5)
+        
         # Buttons frame
         button_frame = ttk.Frame(tts_frame)
         button_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -656,10 +774,19 @@ class EdgeTTSApp:
         ttk.Label(playback_frame, textvariable=self.now_playing_var, 
                 font=("Helvetica", 9, "italic")).pack(side=tk.LEFT, padx=20)
         
+        # Position slider, seeking uses the index built when the audio was generated
+        self.tts_scrub = ScrubBar(tts_frame, self.seek_tts_audio)
+        self.tts_scrub.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
         # Variable to store the audio data
         self.audio_data = None
-        self.temp_audio_file = None
+        self.audio_index = None
         self.timestamp_data = None
+        # The text that was synthesized and its located WordBoundary events
+        self.synthesized_words = None
+        
+        # Player used while audio is still streaming in
+        self.streaming_player = None
     
     def on_favorite_selected(self, event):
         """Handle selection from favorites dropdown"""
@@ -883,6 +1010,15 @@ You can click "Insert SSML Sample" to see more examples."""
         list_frame = ttk.Frame(history_frame)
         list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Search box, matches title, text, voice and language
+        search_frame = ttk.Frame(list_frame)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.history_search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.history_search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.history_search_debouncer = Debouncer(self.root, self.populate_history_list)
+        self.history_search_var.trace_add("write", self.history_search_debouncer.trigger)
+        
         # Create scrollable listbox
         ttk.Label(list_frame, text="Generated Audio Files:").pack(anchor=tk.W, padx=5, pady=5)
         
@@ -893,7 +1029,7 @@ You can click "Insert SSML Sample" to see more examples."""
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.history_listbox = tk.Listbox(list_container, height=15, 
-                                        yscrollcommand=scrollbar.set, 
+                                        yscrollcommand=lambda first, last: self.on_history_scroll(scrollbar, first, last), 
                                         font=("Helvetica", 10))
         self.history_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.history_listbox.yview)
@@ -963,6 +1099,10 @@ You can click "Insert SSML Sample" to see more examples."""
         self.history_favorite_button.pack(side=tk.LEFT, padx=5)
         self.history_favorite_button.config(state="disabled")
         
+        # Position slider for the selected item
+        self.history_scrub = ScrubBar(details_frame, self.seek_history_audio)
+        self.history_scrub.grid(column=0, row=6, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
+        
         # Populate the history list
         self.populate_history_list()
     
@@ -972,7 +1112,7 @@ You can click "Insert SSML Sample" to see more examples."""
             return
             
         # Get the voice from the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         voice_name = entry.get('voice', '')
         
         if not voice_name:
@@ -1024,9 +1164,15 @@ You can click "Insert SSML Sample" to see more examples."""
         default_format_combobox['values'] = self.formats
         default_format_combobox.grid(column=1, row=2, sticky=(tk.W, tk.E), padx=5, pady=5)
         
+        # Parallel synthesis requests for long texts
+        ttk.Label(app_frame, text="Parallel Requests:").grid(column=0, row=3, sticky=tk.W, padx=5, pady=5)
+        self.concurrency_var = tk.IntVar(value=self.max_concurrent_chunks)
+        ttk.Spinbox(app_frame, from_=1, to=16, width=5, textvariable=self.concurrency_var).grid(
+            column=1, row=3, sticky=tk.W, padx=5, pady=5)
+        
         # Save settings button
         ttk.Button(app_frame, text="Save Settings", command=self.save_settings).grid(
-            column=1, row=3, sticky=tk.E, padx=5, pady=10)
+            column=1, row=4, sticky=tk.E, padx=5, pady=10)
         
         # Favorites management
         favorites_frame = ttk.LabelFrame(settings_frame, text="Favorites Management", padding="10")
@@ -1036,6 +1182,13 @@ You can click "Insert SSML Sample" to see more examples."""
         ttk.Button(favorites_frame, text="Clear All Favorites", command=self.clear_all_favorites).pack(
             side=tk.LEFT, padx=5, pady=5)
         
+        # Synthesis cache management
+        cache_frame = ttk.LabelFrame(settings_frame, text="Synthesis Cache", padding="10")
+        cache_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Button(cache_frame, text="Clear Cache", command=self.clear_synthesis_cache).pack(
+            side=tk.LEFT, padx=5, pady=5)
+        
         # Config file section
         config_frame = ttk.LabelFrame(settings_frame, text="Configuration File", padding="10")
         config_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -1071,6 +1224,17 @@ You can click "Insert SSML Sample" to see more examples."""
             
         messagebox.showinfo("Favorites Cleared", "All favorite voices have been cleared.")
     
+    def clear_synthesis_cache(self):
+        """Remove all cached audio and timestamps"""
+        size_mb = self.synthesis_cache.size() / (1024 * 1024)
+        confirm = messagebox.askyesno("Confirm Clear", 
+                                    f"Remove {size_mb:.1f} MB of cached audio?")
+        if not confirm:
+            return
+            
+        self.synthesis_cache.clear()
+        self.status_var.set("Synthesis cache cleared")
+    
     def init_voices_tab(self):
         """Initialize the voices tab with a list of all available voices"""
         voices_frame = ttk.Frame(self.voices_tab, padding="10")
@@ -1085,8 +1249,9 @@ You can click "Insert SSML Sample" to see more examples."""
         search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        # Bind search entry to filter voices
-        self.search_var.trace_add("write", lambda name, index, mode: self.filter_voices())
+        # Bind search entry to filter voices, a burst of keystrokes runs a single pass
+        self.search_debouncer = Debouncer(self.root, self.filter_voices)
+        self.search_var.trace_add("write", self.search_debouncer.trigger)
         
         # Filter by language
         ttk.Label(filter_frame, text="Language:").pack(side=tk.LEFT, padx=5)
@@ -1154,6 +1319,9 @@ You can click "Insert SSML Sample" to see more examples."""
         voice_hsb.pack(side=tk.BOTTOM, fill=tk.X)
         self.voices_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
+        # Rows are diffed against the filter result instead of being rebuilt
+        self.voices_tree_sync = TreeviewSync(self.voices_tree)
+        
         # Add double-click event to select voice
         self.voices_tree.bind("<Double-1>", self.select_voice_from_list)
         
@@ -1242,6 +1410,9 @@ You can click "Insert SSML Sample" to see more examples."""
         favorites_hsb.pack(side=tk.BOTTOM, fill=tk.X)
         self.favorites_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
+        # Rows are diffed against the favorites list instead of being rebuilt
+        self.favorites_tree_sync = TreeviewSync(self.favorites_tree)
+        
         # Add double-click event to select voice
         self.favorites_tree.bind("<Double-1>", self.select_favorite_from_list)
         
@@ -1257,27 +1428,20 @@ You can click "Insert SSML Sample" to see more examples."""
         if not self.voices_loaded:
             return
             
-        # Clear the treeview
-        for i in self.favorites_tree.get_children():
-            self.favorites_tree.delete(i)
-            
         # If no favorites, show message
         if not self.favorite_voices:
+            self.favorites_tree_sync.sync([])
             self.favorites_empty_label.pack(padx=20, pady=20)
             return
         else:
             self.favorites_empty_label.pack_forget()
             
-        # Add favorites to the treeview
-        for voice in self.voice_data:
-            if voice["ShortName"] in self.favorite_voices:
-                language_name = self.get_language_name(voice["Locale"])
-                self.favorites_tree.insert("", "end", values=(
-                    voice["FriendlyName"],
-                    voice["Gender"],
-                    f"{language_name} ({voice['Locale']})",
-                    voice["ShortName"]
-                ))
+        # Update the treeview to show exactly the favorites
+        rows = []
+        for row_id in self.voice_index.search(names=self.favorite_voices):
+            row = self.voice_index.rows[row_id]
+            rows.append((row["short_name"], row["values"]))
+        self.favorites_tree_sync.sync(rows)
     
     def select_favorite_from_list(self, event):
         """Handle double-click on a favorite voice"""
@@ -1364,7 +1528,7 @@ You can click "Insert SSML Sample" to see more examples."""
             # Update UI
             self.populate_favorites_listbox()
             if hasattr(self, 'voices_tree'):
-                self.filter_voices()
+                self.update_voice_favorite_mark(voice_name)
             if hasattr(self, 'favorite_combobox'):
                 self.update_favorites_dropdown()
                 
@@ -1402,8 +1566,6 @@ You can click "Insert SSML Sample" to see more examples."""
     def toggle_favorite_from_context(self, voice_name):
         """Toggle favorite status from context menu"""
         self.toggle_favorite(voice_name)
-        # Update the voice list to reflect the change
-        self.filter_voices()
     
     def toggle_detail_voice_favorite(self):
         """Toggle favorite status of the voice in details panel"""
@@ -1446,6 +1608,10 @@ You can click "Insert SSML Sample" to see more examples."""
         """Save application settings"""
         self.audio_dir = self.output_dir_var.get()
         self.timestamp_dir = self.timestamp_dir_var.get()
+        try:
+            self.max_concurrent_chunks = max(1, int(self.concurrency_var.get()))
+        except (tk.TclError, ValueError):
+            self.concurrency_var.set(self.max_concurrent_chunks)
         
         # Ensure directories exist
         os.makedirs(self.audio_dir, exist_ok=True)
@@ -1479,6 +1645,9 @@ You can click "Insert SSML Sample" to see more examples."""
                         self.timestamp_dir = config['timestamp_dir']
                     if 'default_format' in config:
                         self.default_format_var.set(config['default_format'])
+                    if 'max_concurrent_chunks' in config:
+                        self.max_concurrent_chunks = int(config['max_concurrent_chunks'])
+                        self.concurrency_var.set(self.max_concurrent_chunks)
                 
                 # Update UI
                 if hasattr(self, 'voices_tree') and self.voices_loaded:
@@ -1509,7 +1678,8 @@ You can click "Insert SSML Sample" to see more examples."""
                     'favorite_voices': self.favorite_voices,
                     'audio_dir': self.output_dir_var.get(),
                     'timestamp_dir': self.timestamp_dir_var.get(),
-                    'default_format': self.default_format_var.get()
+                    'default_format': self.default_format_var.get(),
+                    'max_concurrent_chunks': self.max_concurrent_chunks
                 }
                 with open(file_path, 'w') as file:
                     json.dump(config, file, indent=4)
@@ -1523,9 +1693,9 @@ You can click "Insert SSML Sample" to see more examples."""
         if not self.voices_loaded:
             return
             
-        # Clear the treeview
-        for i in self.voices_tree.get_children():
-            self.voices_tree.delete(i)
+        # Start from an empty treeview, the catalog may have changed
+        self.voices_tree_sync.clear()
+        self.favorites_tree_sync.clear()
             
         # Populate filter language dropdown
         languages = ["All"]
@@ -1541,6 +1711,8 @@ You can click "Insert SSML Sample" to see more examples."""
     
     def filter_voices(self):
         """Filter the voices in the treeview based on search and filters"""
+        # This pass supersedes any search still waiting on the debounce timer
+        self.search_debouncer.cancel()
         if not self.voices_loaded:
             return
             
@@ -1550,10 +1722,6 @@ You can click "Insert SSML Sample" to see more examples."""
         gender_filter = self.filter_gender_var.get()
         favorites_only = self.filter_favorites_var.get()
         
-        # Clear the treeview
-        for i in self.voices_tree.get_children():
-            self.voices_tree.delete(i)
-            
         # Parse language filter to get code
         language_code = None
         if language_filter != "All":
@@ -1561,38 +1729,22 @@ You can click "Insert SSML Sample" to see more examples."""
             if match:
                 language_code = match.group(1)
         
-        # Add matching voices
-        for voice in self.voice_data:
-            # Check favorites filter
-            if favorites_only and voice["ShortName"] not in self.favorite_voices:
-                continue
-                
-            # Check language filter
-            if language_code and voice["Locale"] != language_code:
-                continue
-                
-            # Check gender filter
-            if gender_filter != "All" and voice["Gender"].lower() != gender_filter.lower():
-                continue
-                
-            # Check search text
-            if (search_text and 
-                search_text not in voice["FriendlyName"].lower() and
-                search_text not in voice["ShortName"].lower() and
-                search_text not in voice["Locale"].lower()):
-                continue
-                
-            # Voice passed all filters, add to treeview
-            language_name = self.get_language_name(voice["Locale"])
-            is_favorite = "★" if voice["ShortName"] in self.favorite_voices else ""
-            
-            self.voices_tree.insert("", "end", values=(
-                voice["FriendlyName"],
-                voice["Gender"],
-                f"{language_name} ({voice['Locale']})",
-                voice["ShortName"],
-                is_favorite
-            ))
+        # Look up matching voices in the index
+        matches = self.voice_index.search(
+            search_text,
+            locale=language_code,
+            gender=None if gender_filter == "All" else gender_filter,
+            names=self.favorite_voices if favorites_only else None
+        )
+        
+        # Show matching voices, only rows that changed are touched
+        favorites = set(self.favorite_voices)
+        rows = []
+        for row_id in matches:
+            row = self.voice_index.rows[row_id]
+            is_favorite = "★" if row["short_name"] in favorites else ""
+            rows.append((row["short_name"], row["values"] + (is_favorite,)))
+        self.voices_tree_sync.sync(rows)
     
     def select_voice_from_list(self, event):
         """Handle double-click on a voice in the voices list"""
@@ -1687,14 +1839,28 @@ You can click "Insert SSML Sample" to see more examples."""
     
     def toggle_play_pause(self):
         """Toggle between play and pause for the current audio"""
-        if not self.temp_audio_file or not os.path.exists(self.temp_audio_file) or os.path.getsize(self.temp_audio_file) == 0:
-            messagebox.showerror("Playback Error", "No valid audio file available")
+        # Audio that is still streaming in is played by the streaming player
+        if self.streaming_player is not None:
+            if self.streaming_player.is_paused:
+                self.streaming_player.resume()
+                self.play_button.config(text="⏸ Pause")
+                self.status_var.set("Playing audio...")
+            else:
+                self.streaming_player.pause()
+                self.play_button.config(text="▶ Resume")
+                self.status_var.set("Audio paused")
+            return
+                
+        if not self.audio_data:
+            messagebox.showerror("Playback Error", "No valid audio available")
             return
             
         try:
             if pygame.mixer.music.get_busy() and not self.is_paused:
                 # Pause the currently playing audio
                 pygame.mixer.music.pause()
+                self.music_watcher.pause()
+                self.tts_scrub.pause()
                 self.is_paused = True
                 self.play_button.config(text="▶ Resume")
                 self.status_var.set("Audio paused")
@@ -1702,16 +1868,15 @@ You can click "Insert SSML Sample" to see more examples."""
                 # Either start playing or resume
                 if self.is_paused:
                     pygame.mixer.music.unpause()
+                    self.music_watcher.resume()
+                    self.tts_scrub.resume()
                     self.is_paused = False
                     self.play_button.config(text="⏸ Pause")
                     self.status_var.set("Playing audio...")
                 else:
-                    # Try using pygame
+                    # Play straight from memory, no temp file involved
                     try:
-                        pygame.mixer.music.load(self.temp_audio_file)
-                        pygame.mixer.music.play()
-                        self.play_button.config(text="⏸ Pause")
-                        self.status_var.set("Playing audio...")
+                        self.play_tts_audio()
                     except Exception as e:
                         print(f"Pygame playback error: {str(e)}")
                         messagebox.showerror("Playback Error", 
@@ -1719,6 +1884,53 @@ You can click "Insert SSML Sample" to see more examples."""
         except Exception as e:
             messagebox.showerror("Playback Error", f"Error playing audio: {str(e)}")
     
+    def play_tts_audio(self, seconds=0.0):
+        """Play the generated audio from seconds, the seek index makes any position instant"""
+        self.history_scrub.cancel()
+        start = play_music_from(self.audio_data, self.audio_index, seconds)
+        self.music_watcher.watch(self.on_music_ended)
+        self.tts_scrub.track(lambda: music_position(start))
+        self.currently_playing = "tts"
+        self.is_paused = False
+        self.play_button.config(text="⏸ Pause")
+        self.status_var.set("Playing audio...")
+    
+    def seek_tts_audio(self, seconds):
+        """Continue playback of the generated audio from the slider position"""
+        if not self.audio_data or self.streaming_player is not None:
+            return
+        try:
+            self.play_tts_audio(seconds)
+        except Exception as e:
+            messagebox.showerror("Playback Error", f"Error playing audio: {str(e)}")
+    
+    def show_text_context_menu(self, event):
+        """Show context menu for the text input"""
+        boundary = self.word_at_text_index(f"@{event.x},{event.y}")
+        
+        # Create a menu
+        menu = tk.Menu(self.tts_text, tearoff=0)
+        menu.add_command(label="Play from Here", state="normal" if boundary else "disabled",
+                         command=lambda: self.seek_tts_audio(word_seconds(boundary)))
+        
+        # Display the menu
+        menu.post(event.x_root, event.y_root)
+    
+    def word_at_text_index(self, index):
+        """WordBoundary of the generated audio for the word at a text index, or None
+        
+        Words are mapped through the character offsets located when the audio
+        was generated, so only while the text is still what was synthesized.
+        """
+        if not self.audio_data or not self.synthesized_words or self.streaming_player is not None:
+            return None
+        text, word_boundaries = self.synthesized_words
+        current = self.tts_text.get("1.0", "end-1c")
+        if current.strip() != text:
+            return None
+        leading = len(current) - len(current.lstrip())
+        return word_at(word_boundaries, len(self.tts_text.get("1.0", index)) - leading)
+    
     def export_timestamps(self):
         """Export timestamp data as JSON file"""
         if not self.timestamp_data:
@@ -1847,7 +2059,7 @@ You can click "Insert SSML Sample" to see more examples."""
             return
         
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         
         # Check if it has timestamps
         if not entry.get('has_timestamps', False) or not entry.get('timestamp_file'):
@@ -1888,7 +2100,7 @@ You can click "Insert SSML Sample" to see more examples."""
             return
         
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         
         # Check if it has timestamps
         if not entry.get('has_timestamps', False) or not entry.get('timestamp_file'):
@@ -1928,41 +2140,67 @@ You can click "Insert SSML Sample" to see more examples."""
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate SRT file: {str(e)}")
     
+    def convert_audio(self, audio_format, callback):
+        """Convert the generated MP3 in the transcode pool, then call callback(data, error) on the Tk thread"""
+        future = submit_transcode(self.audio_data, audio_format)
+        
+        def done(future):
+            error = future.exception()
+            self.root.after(0, callback, None if error else future.result(), error)
+        
+        future.add_done_callback(done)
+        
     def add_to_history(self):
-        """Add current audio to history"""
+        """Add current audio to history in the selected format"""
         if not self.audio_data:
             return
             
+        audio_format = self.format_var.get()
+        if audio_format != "mp3":
+            self.status_var.set(f"Converting audio to {audio_format}...")
+        
+        # A generation finishing during the conversion replaces these, the entry keeps the converted audio's
+        audio_index = self.audio_index
+        timestamp_data = self.timestamp_data
+        self.convert_audio(audio_format,
+                           lambda audio, error: self._add_converted_to_history(audio, audio_format, error,
+                                                                               audio_index, timestamp_data))
+        
+    def _add_converted_to_history(self, audio, audio_format, error, audio_index, timestamp_data):
+        """Store converted audio and its history entry"""
+        if error is not None:
+            self.status_var.set("Audio conversion failed")
+            messagebox.showerror("Error", f"Failed to add to history: {str(error)}")
+            return
+            
         # Create a timestamp for unique filename
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
         
         # Generate a safe filename
         safe_title = "".join([c if c.isalnum() or c in [' ', '-', '_'] else '_' for c in self.title_var.get()])
         
-        # Create a filename
-        filename = f"{safe_title}_{timestamp}.{self.format_var.get()}"
-        file_path = os.path.join(self.audio_dir, filename)
+        # Create a filename, the audio itself is stored once per distinct content
+        filename = f"{safe_title}_{timestamp}.{audio_format}"
         
         # Check for timestamp data
         timestamp_file = None
-        if self.timestamp_data:
+        if timestamp_data:
             timestamp_filename = f"{safe_title}_{timestamp}_timestamps.json"
             timestamp_file = os.path.join(self.timestamp_dir, timestamp_filename)
             
             # Save the timestamp data
             try:
                 with open(timestamp_file, 'w') as f:
-                    json.dump(self.timestamp_data, f, indent=2)
+                    json.dump(timestamp_data, f, indent=2)
             except Exception as e:
                 print(f"Error saving timestamp data: {str(e)}")
                 timestamp_file = None
         
-        # Save the audio file
+        # Save the audio file, identical audio already in history is reused
         try:
-            with open(file_path, 'wb') as file:
-                file.write(self.audio_data)
-                with open(file_path, 'wb') as file:
-                    file.write(self.audio_data)
+            # The output folder may have been changed in the settings since the last save
+            self.blob_store.move_to(os.path.join(self.audio_dir, "blobs"))
+            file_path = self.blob_store.put(audio, audio_format)
                 
             # Create voice display name
             voice_display = "Unknown"
@@ -1972,28 +2210,35 @@ You can click "Insert SSML Sample" to see more examples."""
                         voice_display = voice["FriendlyName"]
                         break
             
+            # Duration is known exactly from the frames, a constant bitrate seek index
+            # is only a few numbers and is kept so playback can start anywhere at once
+            duration = audio_index["duration"] if audio_index else None
+            seek_index = audio_index if audio_format == "mp3" and is_compact(audio_index) else None
+            
             # Create history entry
             history_entry = {
                 'title': self.title_var.get(),
                 'filename': filename,
                 'path': file_path,
+                'blob': file_path,
                 'text': self.tts_text.get("1.0", tk.END).strip(),
                 'voice': self.voice_var.get(),
                 'voice_display': voice_display,
                 'language': self.language_var.get(),
-                'format': self.format_var.get(),
+                'format': audio_format,
                 'rate': self.speed_var.get(),
                 'pitch': self.pitch_var.get(),
                 'volume': self.volume_var.get(),
                 'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 'has_timestamps': bool(timestamp_file),
                 'timestamp_file': timestamp_file,
-                'ssml': self.ssml_var.get()
+                'ssml': self.ssml_var.get(),
+                'duration': duration,
+                'seek_index': seek_index
             }
             
             # Add to history
-            self.audio_history.append(history_entry)
-            self.save_history()
+            self.history_store.add(history_entry)
             
             # Update the history list
             self.populate_history_list()
@@ -2009,25 +2254,56 @@ You can click "Insert SSML Sample" to see more examples."""
             messagebox.showerror("Error", f"Failed to add to history: {str(e)}")
     
     def populate_history_list(self):
-        """Populate the history listbox with entries from history"""
+        """Show the first page of history, newest first, more pages load on scroll"""
+        # Only entries matching the search box are listed
+        self.history_search_debouncer.cancel()
+        self.history_query = self.history_search_var.get().strip()
+        
         # Clear the listbox
         self.history_listbox.delete(0, tk.END)
+        self.history_rows = []
+        self.history_total = self.history_store.count(self.history_query)
         
-        # Add entries to the listbox
-        for i, entry in enumerate(self.audio_history):
-            timestamp_icon = "🕒 " if entry.get('has_timestamps', False) else ""
-            favorite_icon = "★ " if self.is_favorite(entry.get('voice', '')) else ""
-            voice_display = entry.get('voice_display', entry.get('voice', 'Unknown'))
-            self.history_listbox.insert(tk.END, f"{timestamp_icon}{favorite_icon}{entry['title']} ({voice_display})")
+        # Add the first page of entries to the listbox
+        self.load_more_history()
             
         # Disable buttons if no history
-        if len(self.audio_history) == 0:
+        if self.history_total == 0:
             self.history_play_button.config(state="disabled")
             self.history_delete_button.config(state="disabled")
             self.history_export_timestamps_button.config(state="disabled")
             self.history_export_srt_button.config(state="disabled")
             self.history_favorite_button.config(state="disabled")
     
+    def format_history_row(self, entry):
+        """Text of the history listbox row for an entry"""
+        timestamp_icon = "🕒 " if entry.get('has_timestamps', False) else ""
+        favorite_icon = "★ " if self.is_favorite(entry.get('voice', '')) else ""
+        voice_display = entry.get('voice_display', entry.get('voice', 'Unknown'))
+        duration = f" [{format_duration(entry['duration'])}]" if entry.get('duration') else ""
+        return f"{timestamp_icon}{favorite_icon}{entry['title']} ({voice_display}){duration}"
+
+    def load_more_history(self):
+        """Fetch the next page of history entries and append them to the list"""
+        if self.history_loading or len(self.history_rows) >= self.history_total:
+            return
+        self.history_loading = True
+        try:
+            before_id = self.history_rows[-1]['id'] if self.history_rows else None
+            for entry in self.history_store.page(before_id, query=self.history_query):
+                self.history_listbox.insert(tk.END, self.format_history_row(entry))
+                self.history_rows.append(entry)
+        except Exception as e:
+            print(f"Error loading history: {str(e)}")
+        finally:
+            self.history_loading = False
+    
+    def on_history_scroll(self, scrollbar, first, last):
+        """Update the scrollbar and load more entries when the end comes into view"""
+        scrollbar.set(first, last)
+        if float(last) > 0.9 and len(self.history_rows) < self.history_total:
+            self.root.after_idle(self.load_more_history)
+
     def on_history_select(self, event):
         """Handle selection from history list"""
         if not self.history_listbox.curselection():
@@ -2036,8 +2312,11 @@ You can click "Insert SSML Sample" to see more examples."""
         # Get selected index
         index = self.history_listbox.curselection()[0]
         
-        # Get the corresponding history entry
-        entry = self.audio_history[index]
+        # Fetch the full entry, including its text, only now that it is needed
+        entry = self.history_store.get(self.history_rows[index]['id'])
+        if entry is None:
+            return
+        self.selected_history_entry = entry
         
         # Update the details
         self.history_title_var.set(entry['title'])
@@ -2066,6 +2345,10 @@ You can click "Insert SSML Sample" to see more examples."""
         self.history_text.insert("1.0", entry['text'])
         self.history_text.config(state="disabled")
         
+        # The slider always belongs to the selected entry, so a seek never lands in another clip.
+        # It shows the stored duration and stays disabled for older entries without one
+        self.history_scrub.set_duration(entry.get('duration'))
+        
         # Enable the buttons
         self.history_play_button.config(state="normal")
         self.history_delete_button.config(state="normal")
@@ -2083,11 +2366,19 @@ You can click "Insert SSML Sample" to see more examples."""
     
     def play_history_item(self):
         """Play the currently selected history item"""
+        self.play_history_from(0.0)
+    
+    def seek_history_audio(self, seconds):
+        """Play the selected history item from the slider position"""
+        self.play_history_from(seconds)
+    
+    def play_history_from(self, seconds):
+        """Play the selected history item starting at seconds"""
         if not hasattr(self, 'selected_history_index') or self.selected_history_index is None:
             return
             
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         file_path = entry['path']
         
         # Check if the file exists
@@ -2096,13 +2387,17 @@ You can click "Insert SSML Sample" to see more examples."""
             return
             
         # Stop any currently playing audio
+        self._stop_streaming_playback()
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
             
         try:
-            # Load and play the audio
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
+            # Load and play the audio, the stored seek index finds the start without decoding
+            self.tts_scrub.cancel()
+            self.history_scrub.set_duration(entry.get('duration'))
+            start = play_music_from(file_path, entry.get('seek_index'), seconds)
+            self.music_watcher.watch(self.on_music_ended)
+            self.history_scrub.track(lambda: music_position(start))
             
             # Update the status
             self.status_var.set(f"Playing: {entry['title']}")
@@ -2123,7 +2418,7 @@ You can click "Insert SSML Sample" to see more examples."""
             return
             
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Delete", 
@@ -2136,9 +2431,14 @@ You can click "Insert SSML Sample" to see more examples."""
         if pygame.mixer.music.get_busy() and self.currently_playing == "history":
             pygame.mixer.music.stop()
             
-        # Delete the audio file
+        # Remove from history first so the blob's reference count no longer includes this entry
+        self.history_store.delete(entry['id'])
+        
+        # Delete the audio file once no other entry shares it
         try:
-            if os.path.exists(entry['path']):
+            if entry.get('blob'):
+                self.blob_store.remove(entry['blob'], self.history_store.count_blob_references)
+            elif os.path.exists(entry['path']):
                 os.remove(entry['path'])
         except Exception as e:
             messagebox.showwarning("Warning", f"Could not delete audio file: {str(e)}")
@@ -2150,12 +2450,15 @@ You can click "Insert SSML Sample" to see more examples."""
         except Exception as e:
             messagebox.showwarning("Warning", f"Could not delete timestamp file: {str(e)}")
             
-        # Remove from history
-        self.audio_history.pop(self.selected_history_index)
-        self.save_history()
+        # Remove the row from the list, nothing else in it changes
+        self.history_listbox.delete(self.selected_history_index)
+        self.history_rows.pop(self.selected_history_index)
+        self.history_total -= 1
+        self.history_listbox.selection_clear(0, tk.END)
         
-        # Update the list
-        self.populate_history_list()
+        # Fill the gap from the next page if the end of the list is in view
+        if len(self.history_rows) < self.history_total and self.history_listbox.yview()[1] > 0.9:
+            self.load_more_history()
         
         # Clear the details
         self.history_title_var.set("")
@@ -2175,6 +2478,7 @@ You can click "Insert SSML Sample" to see more examples."""
         
         # Reset selection
         self.selected_history_index = None
+        self.selected_history_entry = None
         
         # Update status
         self.status_var.set("Item deleted from history")
@@ -2192,131 +2496,115 @@ You can click "Insert SSML Sample" to see more examples."""
             messagebox.showwarning("Warning", "No voice selected. Please select a voice.")
             return
         
-        # Check if text is too long
-        if len(text) > 10000:
-            messagebox.showwarning("Warning", "Text is too long. Please limit to 10000 characters.")
-            return
-        
         # Disable generate button
         self.generate_button.config(state="disabled")
         
         # Update status
         self.status_var.set("Generating speech...")
         
-        # Start a thread for the Edge TTS generation
-        thread = threading.Thread(target=self._generate_speech_thread, args=(text,))
-        thread.daemon = True
-        thread.start()
+        # Start playing as soon as the first audio arrives if requested
+        self._stop_streaming_playback()
+        if self.stream_playback_var.get():
+            if pygame.mixer.music.get_busy():
+                pygame.mixer.music.stop()
+            self.is_paused = False
+            self.streaming_player = StreamingPlayer()
+            self.play_button.config(text="⏸ Pause", state="normal")
+            self.root.after(50, self._pump_streaming_player)
+        
+        # Collect the request here, the engine never touches Tk variables
+        request = SynthesisRequest(
+            text=text,
+            voice=self.voice_var.get(),
+            backend="edge",
+            # Kept as MP3 for playback, converted to the selected format when saved
+            format="mp3",
+            word_timestamps=self.timestamps_var.get(),
+            rate=self.speed_var.get().replace("%", ""),
+            pitch=self.pitch_var.get().replace("Hz", ""),
+            volume=self.volume_var.get().replace("%", ""),
+            ssml=self.ssml_var.get()
+        )
+        
+        # Run the Edge TTS generation on the background loop
+        self.generation_future = self.async_loop.submit(self._generate_speech_async(request))
     
-    def _generate_speech_thread(self, text):
-        """Background thread for Edge TTS synthesis"""
-        try:
-            # Create a temporary file for the audio
-            temp_dir = os.path.join(self.app_dir, "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Create a unique temporary filename
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            temp_file = os.path.join(temp_dir, f"temp_{timestamp}.{self.format_var.get()}")
-            
-            # Create a temporary file for the timestamp data
-            timestamp_file = os.path.join(temp_dir, f"temp_{timestamp}_timestamps.json")
-            
-            # Get voice parameters
-            voice = self.voice_var.get()
-            rate = self.speed_var.get().replace("%", "")
-            pitch = self.pitch_var.get().replace("Hz", "")
-            volume = self.volume_var.get().replace("%", "")
-            
-            # Create the communicate object
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Check if using SSML
-            if self.ssml_var.get():
-                # Use text as SSML directly
-                loop.run_until_complete(self._generate_speech_with_edge_tts(voice, text, temp_file, timestamp_file, 
-                                                                          rate, pitch, volume, True))
-            else:
-                # Add basic SSML wrapper around text
-                loop.run_until_complete(self._generate_speech_with_edge_tts(voice, text, temp_file, timestamp_file, 
-                                                                          rate, pitch, volume, False))
-            
-            # Read the audio file
-            with open(temp_file, 'rb') as f:
-                self.audio_data = f.read()
-            
-            # Read the timestamp file if it exists
-            if os.path.exists(timestamp_file):
-                with open(timestamp_file, 'r') as f:
-                    self.timestamp_data = json.load(f)
-                
-                # Edge TTS timestamps are provided
-                has_timestamps = True
-            else:
-                # No timestamps available
-                self.timestamp_data = None
-                has_timestamps = False
-            
-            # Set the temp audio file
-            self.temp_audio_file = temp_file
+    def _pump_streaming_player(self):
+        """Keep the streaming player supplied with decoded audio"""
+        if self.streaming_player is None:
+            return
             
-            # Update the UI on the main thread
-            self.root.after(0, self._update_ui_after_generation, True, None, has_timestamps)
+        if self.streaming_player.pump():
+            self.root.after(50, self._pump_streaming_player)
+        else:
+            # Stream has been played to the end
+            self.streaming_player = None
+            self.play_button.config(text="▶ Play")
+            self.status_var.set("Ready")
+    
+    def _stop_streaming_playback(self):
+        """Stop any audio that is playing from an in-progress stream"""
+        if self.streaming_player is not None:
+            self.streaming_player.stop()
+            self.streaming_player = None
+    
+    async def _generate_speech_async(self, request):
+        """Edge TTS synthesis, runs on the background event loop"""
+        try:
+            def report_progress(completed, total):
+                if total > 1:
+                    self.root.after(0, self.status_var.set, f"Generating speech... ({completed} of {total} parts done)")
+            
+            # When streaming, the player receives audio as it arrives
+            player = self.streaming_player
+            engine = EdgeEngine(self.synthesis_cache, self.max_concurrent_chunks)
+            result = await engine.synthesize(
+                request,
+                on_audio=player.feed if player is not None else None,
+                on_progress=report_progress
+            )
+            if result.cached:
+                self.root.after(0, self.status_var.set, "Loaded speech from cache")
+            
+            # Index the frames once, for the exact duration and seeking
+            audio_index = build_seek_index(result.audio)
+            
+            # Keep timestamp data if requested and we got any
+            has_timestamps = bool(request.word_timestamps and result.word_boundaries)
+            
+            # Let the streaming player drain whatever is left
+            if player is not None:
+                player.finish()
+            
+            # Update the UI on the main thread, which also takes over the new audio
+            self.root.after(0, self._update_ui_after_generation, True, None, has_timestamps, result, audio_index,
+                            request.text)
             
         except Exception as e:
             # Handle any exceptions
             print(f"Exception in speech generation: {str(e)}")
             error_message = str(e)
             self.root.after(0, lambda: self._update_ui_after_generation(False, error_message))
-    
-    async def _generate_speech_with_edge_tts(self, voice, text, output_file, timestamp_file, rate="0", pitch="0", volume="0", is_ssml=False):
-        """Generate speech using Edge TTS with minimal parameters"""
-        try:
-            # Create a communicate object with just the essential parameters
-            if is_ssml:
-                communicate = edge_tts.Communicate(text, voice=voice)
-            else:
-                communicate = edge_tts.Communicate(text, voice=voice)
-            
-            # Generate the audio with timestamps
-            if self.timestamps_var.get():
-                # Open the files for writing
-                async with aiofiles.open(output_file, "wb") as file:
-                    words_in_metadata = []
-                    
-                    # Process the speech data with timestamp extraction
-                    async for chunk in communicate.stream():
-                        if chunk["type"] == "audio":
-                            await file.write(chunk["data"])
-                        elif chunk["type"] == "WordBoundary":
-                            words_in_metadata.append(chunk)
-                    
-                    # Write timestamp data if we got any
-                    if words_in_metadata:
-                        async with aiofiles.open(timestamp_file, "w") as timestamp_output:
-                            await timestamp_output.write(json.dumps(words_in_metadata))
-            else:
-                # Generate without timestamps
-                async with aiofiles.open(output_file, "wb") as file:
-                    async for chunk in communicate.stream():
-                        if chunk["type"] == "audio":
-                            await file.write(chunk["data"])
-        
-        except Exception as e:
-            print(f"Error in speech generation: {str(e)}")
-            raise e
         
-    def _update_ui_after_generation(self, success, error_message=None, has_timestamps=False):
+    def _update_ui_after_generation(self, success, error_message=None, has_timestamps=False,
+                                    result=None, audio_index=None, text=None):
         """Update the UI after speech generation"""
         # Re-enable generate button
         self.generate_button.config(state="normal")
         
         if success:
+            # Keep the audio in memory, it is only written out when saved or added to history.
+            # Audio, index and timestamps change together, on the thread that plays them
+            self.audio_data = result.audio
+            self.audio_index = audio_index
+            self.timestamp_data = result.word_boundaries if has_timestamps else None
+            self.synthesized_words = (text, result.word_boundaries) if result.word_boundaries else None
+            
             # Enable playback controls
             self.play_button.config(state="normal")
             self.save_button.config(state="normal")
             self.add_history_button.config(state="normal")
+            self.tts_scrub.set_duration(self.audio_index["duration"] if self.audio_index else None)
             
             # Enable timestamp export buttons if timestamps are available
             if has_timestamps:
@@ -2340,11 +2628,15 @@ You can click "Insert SSML Sample" to see more examples."""
             timestamp_msg = " with timestamps" if has_timestamps else ""
             self.status_var.set(f"Speech generated successfully{timestamp_msg}")
             
-            # Offer to play
-            play_now = messagebox.askyesno("Success", f"Speech generated successfully{timestamp_msg}. Play now?")
-            if play_now:
-                self.toggle_play_pause()
+            # Offer to play, unless it is already playing from the stream
+            if self.streaming_player is None:
+                play_now = messagebox.askyesno("Success", f"Speech generated successfully{timestamp_msg}. Play now?")
+                if play_now:
+                    self.toggle_play_pause()
         else:
+            self._stop_streaming_playback()
+            self.play_button.config(text="▶ Play")
+            
             # Show error message
             messagebox.showerror("Error", f"Failed to generate speech: {error_message}")
             
@@ -2368,6 +2660,8 @@ You can click "Insert SSML Sample" to see more examples."""
             filetypes.append(("OGG files", "*.ogg"))
         elif file_ext == "webm":
             filetypes.append(("WebM files", "*.webm"))
+        elif file_ext == "flac":
+            filetypes.append(("FLAC files", "*.flac"))
             
         filetypes.append(("All files", "*.*"))
         
@@ -2383,29 +2677,43 @@ You can click "Insert SSML Sample" to see more examples."""
         )
         
         if file_path:
-            try:
-                with open(file_path, 'wb') as file:
-                    file.write(self.audio_data)
-                
-                # Ask to save timestamps if available
-                if self.timestamp_data:
-                    save_timestamps = messagebox.askyesno("Save Timestamps", 
-                                                        "Would you also like to save the timestamp data?")
-                    if save_timestamps:
-                        timestamp_path = file_path + ".json"
-                        with open(timestamp_path, 'w') as f:
-                            json.dump(self.timestamp_data, f, indent=2)
-                        messagebox.showinfo("Success", 
-                                        f"Audio saved as: {file_path}\nTimestamps saved as: {timestamp_path}")
-                    else:
-                        messagebox.showinfo("Success", f"Audio saved as: {file_path}")
+            # The file gets the format its extension names, unknown extensions get the MP3
+            audio_format = format_of(file_path) or "mp3"
+            if audio_format != "mp3":
+                self.status_var.set(f"Converting audio to {audio_format}...")
+            self.convert_audio(audio_format,
+                               lambda audio, error: self._write_saved_audio(file_path, audio, error))
+            
+    def _write_saved_audio(self, file_path, audio, error):
+        """Write converted audio to the file chosen in save_audio"""
+        if error is not None:
+            self.status_var.set("Audio conversion failed")
+            messagebox.showerror("Error", f"Failed to save audio: {str(error)}")
+            return
+            
+        try:
+            with open(file_path, 'wb') as file:
+                file.write(audio)
+            
+            # Ask to save timestamps if available
+            if self.timestamp_data:
+                save_timestamps = messagebox.askyesno("Save Timestamps", 
+                                                    "Would you also like to save the timestamp data?")
+                if save_timestamps:
+                    timestamp_path = file_path + ".json"
+                    with open(timestamp_path, 'w') as f:
+                        json.dump(self.timestamp_data, f, indent=2)
+                    messagebox.showinfo("Success", 
+                                    f"Audio saved as: {file_path}\nTimestamps saved as: {timestamp_path}")
                 else:
                     messagebox.showinfo("Success", f"Audio saved as: {file_path}")
-                    
-                self.status_var.set(f"Audio saved to {os.path.basename(file_path)}")
+            else:
+                messagebox.showinfo("Success", f"Audio saved as: {file_path}")
                 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save audio: {str(e)}")
+            self.status_var.set(f"Audio saved to {os.path.basename(file_path)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save audio: {str(e)}")
 
 
 # Initialize and run the application
@@ -0,0 +1,62 @@
+"""Long-lived asyncio event loop running on a background thread"""
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """Owns one event loop thread that runs every edge_tts coroutine
+
+    Coroutines are handed over with submit(), which is safe to call from any
+    thread (including the Tk main thread) and returns a
+    concurrent.futures.Future that can be waited on, polled or cancelled.
+    """
+
+    def __init__(self, name="edge-tts-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a concurrent Future for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block the calling thread until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        """Cancel outstanding tasks and stop the loop thread"""
+        if self.loop.is_closed():
+            return
+
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(shutdown()).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+_shared_loop = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_loop():
+    """Return the process-wide background loop, starting it on first use"""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None or _shared_loop.loop.is_closed():
+            _shared_loop = BackgroundLoop()
+        return _shared_loop
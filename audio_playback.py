@@ -0,0 +1,309 @@
+"""Audio playback helpers built on pygame's mixer"""
+import io
+import queue
+import threading
+from collections import deque
+
+import pygame
+
+from mp3_frames import complete_frames_end, frame_index
+from seek_index import seek_position
+
+# The first segment is kept small so speech starts quickly, later ones are larger
+FIRST_SEGMENT_BYTES = 6 * 1024
+SEGMENT_BYTES = 48 * 1024
+# A frame's audio data may start up to this many bytes back, in earlier frames
+MAX_RESERVOIR_BYTES = 511
+
+# Posted by the mixer when pygame.mixer.music stops
+MUSIC_END_EVENT = pygame.USEREVENT + 1
+# How often the event queue is read while music plays
+END_CHECK_MS = 250
+
+
+def _overlap_tail(segment):
+    """The frames ending segment that prime the decoder for the next one
+
+    Enough whole frames to hold a full bit reservoir, plus one more so the
+    decoder's overlap-add is primed too.
+    """
+    index = frame_index(segment)
+    offsets = index["offsets"]
+    if not offsets:
+        return b""
+    first = len(offsets) - 1
+    while first > 0 and index["end"] - offsets[first] < MAX_RESERVOIR_BYTES:
+        first -= 1
+    first = max(0, first - 1)
+    return bytes(segment[offsets[first]:index["end"]])
+
+
+class StreamingPlayer:
+    """Plays MP3 data progressively while it is still being synthesized
+
+    feed() and finish() may be called from any thread and only queue the
+    bytes, so an event loop feeding the player is never held up by pygame.
+    The player's own thread cuts the bytes at frame boundaries into segments,
+    decodes them into pygame Sounds and queues those one after another on a
+    dedicated mixer channel. pump() must be called periodically from the Tk
+    thread to keep the channel supplied.
+
+    Each segment is decoded together with the last frames of the one before
+    it, so the decoder starts with a filled bit reservoir and primed state,
+    and the samples of those frames are dropped again. Segments then join
+    without clicks or gaps.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # the segment queue and state, held only briefly
+        self._incoming = queue.Queue()
+        self._buffer = bytearray()
+        self._tail = b""
+        self._shortfall = 0
+        self._segments = deque()
+        self._segment_count = 0
+        self._finished = False
+        self._stopped = False
+        self.channel = None
+        self.is_paused = False
+        threading.Thread(target=self._decode_thread, daemon=True).start()
+
+    def feed(self, data):
+        """Append newly received MP3 bytes"""
+        if not self._stopped:
+            self._incoming.put(bytes(data))
+
+    def finish(self):
+        """Mark the stream as complete, whatever is still buffered is played too"""
+        self._incoming.put(None)
+
+    def _decode_thread(self):
+        while True:
+            data = self._incoming.get()
+            if self._stopped:
+                return
+            if data is None:
+                if self._buffer:
+                    self._cut_segment(final=True)
+                with self._lock:
+                    self._finished = True
+                return
+
+            self._buffer.extend(data)
+            threshold = FIRST_SEGMENT_BYTES if self._segment_count == 0 else SEGMENT_BYTES
+            if len(self._buffer) >= threshold:
+                self._cut_segment(final=False)
+
+    def _cut_segment(self, final):
+        end = len(self._buffer) if final else complete_frames_end(self._buffer)
+        if end == 0:
+            return
+        segment = bytes(self._buffer[:end])
+        del self._buffer[:end]
+
+        sound = self._decode(segment)
+        self._tail = _overlap_tail(segment)
+        self._segment_count += 1
+        if sound is not None:
+            with self._lock:
+                if not self._stopped:
+                    self._segments.append(sound)
+
+    def _decode(self, segment):
+        """Sound for a segment, decoded after the previous segment's tail frames"""
+        data = self._tail + segment
+        try:
+            sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        except Exception as e:
+            print(f"Error decoding audio segment: {str(e)}")
+            return None
+
+        # Sample counts in the mixer's format. Converting to the mixer's rate
+        # can leave out a few samples at the end of a Sound, and those are owed
+        # by the next segment
+        frequency, size, channels = pygame.mixer.get_init()
+        sample_bytes = channels * (abs(size) // 8)
+        index = frame_index(data)
+        ratio = frequency / index["sample_rate"] if index["sample_rate"] else 1.0
+        raw = sound.get_raw()
+        skip = max(0, round(frame_index(self._tail)["samples"] * ratio) - self._shortfall) if self._tail else 0
+        self._shortfall = max(0, round(index["samples"] * ratio) - len(raw) // sample_bytes)
+
+        # Drop what the tail decodes to, it already ended the previous segment
+        if not skip:
+            return sound
+        if skip * sample_bytes >= len(raw):
+            return None
+        return pygame.mixer.Sound(buffer=raw[skip * sample_bytes:])
+
+    def pump(self):
+        """Keep the mixer channel fed, returns False once playback has fully ended"""
+        with self._lock:
+            if self._stopped:
+                return False
+            if self.is_paused:
+                return True
+
+            if self.channel is None or not self.channel.get_busy():
+                if self._segments:
+                    sound = self._segments.popleft()
+                    if self.channel is None:
+                        self.channel = pygame.mixer.find_channel(True)
+                    self.channel.play(sound)
+                elif self._finished:
+                    return False
+            elif self.channel.get_queue() is None and self._segments:
+                self.channel.queue(self._segments.popleft())
+            return True
+
+    @property
+    def is_playing(self):
+        """True once audio has started and until the last segment ends"""
+        return self.channel is not None and not self._stopped
+
+    def pause(self):
+        if self.channel:
+            self.channel.pause()
+        self.is_paused = True
+
+    def resume(self):
+        if self.channel:
+            self.channel.unpause()
+        self.is_paused = False
+
+    def stop(self):
+        """Stop playback and drop anything still queued"""
+        with self._lock:
+            self._stopped = True
+            self._segments.clear()
+            if self.channel:
+                self.channel.stop()
+        # Let the decoding thread see it and end
+        self._incoming.put(None)
+
+
+# The buffer pygame.mixer.music is currently reading from
+_music_buffer = None
+
+
+def load_music(data, namehint=None):
+    """Load audio bytes into pygame.mixer.music straight from memory
+
+    The mixer keeps reading from the buffer while it plays, so it is held
+    here until the next load. Without a namehint the decoder is picked from
+    the data itself.
+    """
+    global _music_buffer
+    buffer = io.BytesIO(data)
+    if namehint:
+        pygame.mixer.music.load(buffer, namehint)
+    else:
+        pygame.mixer.music.load(buffer)
+    _music_buffer = buffer
+
+
+def play_music_from(source, seek_index=None, seconds=0.0):
+    """Start pygame.mixer.music at seconds into source, returns where playback really starts
+
+    source is audio bytes or a file path. With a seek index the stream is
+    cut at the frame playing at seconds and only the rest reaches the
+    decoder, so no earlier audio is decoded or scanned. Without one the
+    decoder's own seeking is tried, falling back to the beginning.
+    """
+    if seek_index is not None and seconds > 0:
+        offset, start = seek_position(seek_index, seconds)
+        if isinstance(source, (bytes, bytearray)):
+            data = source[offset:]
+        else:
+            with open(source, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        load_music(data)
+        pygame.mixer.music.play()
+        return start
+
+    if isinstance(source, (bytes, bytearray)):
+        load_music(source)
+    else:
+        pygame.mixer.music.load(source)
+    if seconds > 0:
+        try:
+            pygame.mixer.music.play(start=seconds)
+            return seconds
+        except pygame.error:
+            pass
+    pygame.mixer.music.play()
+    return 0.0
+
+
+def music_position(start):
+    """Seconds into the clip that play_music_from() started at start"""
+    return start + max(0, pygame.mixer.music.get_pos()) / 1000
+
+
+class MusicWatcher:
+    """Reports the end of pygame.mixer.music playback to a Tk app
+
+    The mixer posts MUSIC_END_EVENT when a track ends or is stopped. After
+    watch() the event queue is read every END_CHECK_MS until that event
+    arrives, then on_end runs on the Tk thread. Nothing is scheduled while
+    the music is paused or when nothing plays, so an idle app never wakes
+    up. Without pygame's event system (no video subsystem) the mixer's busy
+    flag is used instead.
+    """
+
+    def __init__(self, root, interval_ms=END_CHECK_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._on_end = None
+        self._after_id = None
+        pygame.mixer.music.set_endevent(MUSIC_END_EVENT)
+
+    def watch(self, on_end):
+        """Call on_end once the music that was just started ends"""
+        self._cancel_timer()
+        # End events of earlier tracks are not about this one
+        self._ended()
+        self._on_end = on_end
+        self._schedule()
+
+    def pause(self):
+        """The music was paused, stop checking until resume()"""
+        self._cancel_timer()
+
+    def resume(self):
+        if self._on_end is not None and self._after_id is None:
+            self._schedule()
+
+    def cancel(self):
+        """Stop watching without calling on_end"""
+        self._cancel_timer()
+        self._on_end = None
+
+    @property
+    def active(self):
+        return self._on_end is not None
+
+    def _schedule(self):
+        self._after_id = self.root.after(self.interval_ms, self._check)
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _ended(self):
+        try:
+            return bool(pygame.event.get(MUSIC_END_EVENT))
+        except pygame.error:
+            return not pygame.mixer.music.get_busy()
+
+    def _check(self):
+        self._after_id = None
+        if self._on_end is None:
+            return
+        if self._ended():
+            on_end, self._on_end = self._on_end, None
+            on_end()
+        else:
+            self._schedule()
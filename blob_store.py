@@ -0,0 +1,80 @@
+"""Content-addressed storage for audio files kept in history"""
+import hashlib
+import os
+import shutil
+import threading
+
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """Stores each distinct audio payload once, named by its SHA-256 digest
+
+    History entries point at blob paths. Saving audio whose bytes are already
+    stored returns the existing path without writing anything. A blob is
+    removed once no history entry references it any more. An app keeps one
+    store, so its lock orders every put and removal.
+    """
+
+    def __init__(self, blob_dir):
+        self.blob_dir = blob_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    def move_to(self, blob_dir):
+        """Store new blobs in blob_dir, those already stored stay where they are"""
+        with self._lock:
+            if blob_dir != self.blob_dir:
+                os.makedirs(blob_dir, exist_ok=True)
+                self.blob_dir = blob_dir
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest, extension):
+        return os.path.join(self.blob_dir, f"{digest}.{extension}")
+
+    def put(self, data, extension):
+        """Store data unless an identical blob exists, returns the blob path"""
+        path = self.path_for(self.digest(data), extension)
+        with self._lock:
+            if os.path.exists(path) and os.path.getsize(path) == len(data):
+                return path
+            # Write atomically so a crash never leaves a truncated blob behind
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+    def put_file(self, source_path, extension):
+        """Store a file's contents unless an identical blob exists, returns the blob path
+
+        The file is hashed and copied in blocks, so large audio is never held
+        in memory as a whole.
+        """
+        sha = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for block in iter(lambda: f.read(COPY_BLOCK_SIZE), b''):
+                sha.update(block)
+        path = self.path_for(sha.hexdigest(), extension)
+        with self._lock:
+            if os.path.exists(path) and os.path.getsize(path) == os.path.getsize(source_path):
+                return path
+            tmp_path = path + ".tmp"
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        return path
+
+    def remove(self, path, count_references):
+        """Delete a blob if count_references(path) is zero, returns True if it was deleted
+
+        The count is taken under the lock, so a put() of the same audio can't
+        find the blob in place and have it deleted right after.
+        """
+        with self._lock:
+            if count_references(path) or not os.path.exists(path):
+                return False
+            os.remove(path)
+            return True
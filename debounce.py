@@ -0,0 +1,38 @@
+"""Coalescing of rapid Tk events into a single deferred call"""
+
+# Delay after the last keystroke before the voice filter runs
+SEARCH_DEBOUNCE_MS = 200
+
+
+class Debouncer:
+    """Runs callback once, delay_ms after the most recent trigger()
+
+    Every trigger() cancels the pass scheduled by the previous one, so a burst
+    of events produces a single call with the latest state. All methods must
+    be called from the Tk thread.
+    """
+
+    def __init__(self, root, callback, delay_ms=SEARCH_DEBOUNCE_MS):
+        self.root = root
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._after_id = None
+
+    def trigger(self, *args):
+        """(Re)start the timer, accepts and ignores Tk trace/event arguments"""
+        self.cancel()
+        self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        """Drop the pending call, if any"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    @property
+    def pending(self):
+        return self._after_id is not None
+
+    def _fire(self):
+        self._after_id = None
+        self.callback()
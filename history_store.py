@@ -0,0 +1,237 @@
+"""SQLite-backed storage for generated audio history entries"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+# Entry fields that get their own (indexed) column, everything else goes into extra
+_COLUMNS = ("timestamp", "voice", "language", "title", "text", "blob")
+_INDEXED = ("timestamp", "voice", "language", "title", "blob")
+
+_INSERT = (f"INSERT INTO history ({', '.join(_COLUMNS)}, extra) "
+           f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})")
+
+# Everything but the (potentially long) text, used for list rows
+_SUMMARY_COLUMNS = "id, timestamp, voice, language, title, extra"
+
+# Number of entries the History tab fetches at a time
+HISTORY_PAGE_SIZE = 100
+
+# Fields covered by the full-text index
+_SEARCH_COLUMNS = ("title", "text", "voice", "language")
+
+_SEARCH_TERM = re.compile(r'\w+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL DEFAULT '',
+    voice TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL DEFAULT '',
+    blob TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+"""
+
+# External-content FTS5 index kept in step with the history table by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE history_fts USING fts5(
+    title, text, voice, language,
+    content='history', content_rowid='id'
+);
+CREATE TRIGGER history_fts_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts(rowid, title, text, voice, language)
+    VALUES (new.id, new.title, new.text, new.voice, new.language);
+END;
+CREATE TRIGGER history_fts_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, title, text, voice, language)
+    VALUES ('delete', old.id, old.title, old.text, old.voice, old.language);
+END;
+CREATE TRIGGER history_fts_update AFTER UPDATE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, title, text, voice, language)
+    VALUES ('delete', old.id, old.title, old.text, old.voice, old.language);
+    INSERT INTO history_fts(rowid, title, text, voice, language)
+    VALUES (new.id, new.title, new.text, new.voice, new.language);
+END;
+INSERT INTO history_fts(history_fts) VALUES ('rebuild');
+"""
+
+
+class HistoryStore:
+    """History entries stored one row each in a SQLite database
+
+    Entries are plain dicts, the same shape the apps used to keep in
+    history.json, plus an "id" key assigned by the store. Adding or deleting
+    an entry is a single-row transaction instead of a rewrite of the whole
+    history. Entries whose audio lives in the blob store carry the blob
+    path in an indexed column so references to it can be counted. An
+    existing history.json next to the database is imported once and then
+    renamed so it is not imported again.
+
+    Title, text, voice and language are full-text indexed with SQLite FTS5
+    when the sqlite3 build supports it, otherwise searches fall back to
+    LIKE scans.
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            # Databases created before audio was deduplicated lack the blob column
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(history)")]
+            if "blob" not in columns:
+                self._conn.execute("ALTER TABLE history ADD COLUMN blob TEXT NOT NULL DEFAULT ''")
+            for column in _INDEXED:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_history_{column} ON history({column})")
+        self.has_fts = self._ensure_fts()
+
+        if legacy_json_path:
+            self._migrate_json(legacy_json_path)
+
+    def _ensure_fts(self):
+        """Create the full-text index on first use, returns False if FTS5 is unavailable"""
+        with self._conn:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'").fetchone()
+        if exists:
+            return True
+        try:
+            # executescript commits on its own, a failure leaves nothing half created
+            self._conn.executescript("BEGIN;" + _FTS_SCHEMA + "COMMIT;")
+            return True
+        except sqlite3.OperationalError as e:
+            self._conn.rollback()
+            print(f"Full-text search unavailable, using slower matching: {str(e)}")
+            return False
+
+    def _migrate_json(self, json_path):
+        """Import entries from an old history.json file, once"""
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, 'r') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"Error reading {json_path} for migration: {str(e)}")
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                _INSERT,
+                [self._to_row(entry) for entry in entries if isinstance(entry, dict)])
+
+        # Keep the old file around as a backup, but never import it twice
+        os.replace(json_path, json_path + ".migrated")
+
+    @staticmethod
+    def _to_row(entry):
+        extra = {key: value for key, value in entry.items() if key not in _COLUMNS and key != "id"}
+        return tuple(str(entry.get(column) or "") for column in _COLUMNS) + (json.dumps(extra),)
+
+    @staticmethod
+    def _from_row(row):
+        entry = json.loads(row["extra"])
+        for column in row.keys():
+            if column != "extra":
+                entry[column] = row[column]
+        return entry
+
+    def add(self, entry):
+        """Insert an entry and return its new id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(_INSERT, self._to_row(entry))
+            return cursor.lastrowid
+
+    def delete(self, entry_id):
+        """Remove one entry, returns True if it existed"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+            return cursor.rowcount > 0
+
+    def get(self, entry_id):
+        """The entry with the given id, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM history WHERE id = ?", (entry_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def _search_filter(self, query):
+        """SQL condition and parameters restricting history to entries matching query
+
+        Every word of the query must match, the last one as a prefix so
+        results show up while the user is still typing.
+        """
+        terms = _SEARCH_TERM.findall(query or "")
+        if not terms:
+            return "1", ()
+
+        if self.has_fts:
+            match = " ".join(f'"{term}"' for term in terms) + "*"
+            return "id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)", (match,)
+
+        conditions = []
+        params = []
+        for term in terms:
+            conditions.append("(" + " OR ".join(f"{column} LIKE ?" for column in _SEARCH_COLUMNS) + ")")
+            params.extend([f"%{term}%"] * len(_SEARCH_COLUMNS))
+        return " AND ".join(conditions), tuple(params)
+
+    def page(self, before_id=None, limit=HISTORY_PAGE_SIZE, query=None):
+        """Up to limit entries without their text, newest first
+
+        Pass the id of the last entry of the previous page as before_id to
+        get the next one. Pages are located through the primary key, so
+        fetching a page costs the same no matter how deep into history it is.
+        With a query only entries matching it are returned.
+        """
+        condition, params = self._search_filter(query)
+        if before_id is not None:
+            condition += " AND id < ?"
+            params += (before_id,)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM history WHERE {condition} ORDER BY id DESC LIMIT ?",
+                params + (limit,)).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def all(self):
+        """Every entry, oldest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM history ORDER BY id").fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def referenced_paths(self):
+        """Every audio, blob and timestamp file path some entry points at"""
+        with self._lock:
+            rows = self._conn.execute("SELECT blob, extra FROM history").fetchall()
+        paths = set()
+        for row in rows:
+            extra = json.loads(row["extra"])
+            for path in (row["blob"], extra.get("path"), extra.get("timestamp_file")):
+                if path:
+                    paths.add(path)
+        return paths
+
+    def count_blob_references(self, blob):
+        """Number of entries whose audio is the blob at the given path"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM history WHERE blob = ?", (blob,)).fetchone()[0]
+
+    def count(self, query=None):
+        """Number of entries, or of entries matching query"""
+        condition, params = self._search_filter(query)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM history WHERE {condition}", params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
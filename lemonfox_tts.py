@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import requests
 import json
 from tkinter import filedialog
 import os
@@ -9,8 +8,16 @@ from tkinter import Scale, DoubleVar, BooleanVar
 import pygame
 import datetime
 import threading
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from tts_cache import SynthesisCache, DEFAULT_CACHE_MAX_BYTES
+from history_store import HistoryStore
+from blob_store import BlobStore
+from tts_engine import LemonFoxEngine, SynthesisRequest
+from storage_gc import StorageSweeper
+from audio_playback import StreamingPlayer, MusicWatcher, play_music_from, music_position
+from seek_index import build_seek_index_file, is_compact, format_duration
+from scrub_bar import ScrubBar
+from debounce import Debouncer
+from transcode import submit_transcode_file, format_of
 
 class LemonFoxApp:
     def __init__(self, root):
@@ -33,9 +40,15 @@ class LemonFoxApp:
         self.audio_dir = os.path.join(self.app_dir, "audio_files")
         self.ensure_directories()
         
-        # Load history
-        self.audio_history = self.load_history()
+        # Load history, the History tab only keeps the rows it has shown
+        self.load_history()
+        self.history_rows = []
+        self.history_total = 0
+        self.history_loading = False
+        self.history_query = ""
+        self.selected_history_entry = None
         # Auto-load config if exists
+        cache_max_bytes = DEFAULT_CACHE_MAX_BYTES
         config_file = os.path.join(self.app_dir, "config.json")
         if os.path.exists(config_file):
             try:
@@ -44,9 +57,19 @@ class LemonFoxApp:
                     if 'api_key' in config:
                         self.api_key = config['api_key']
                         self.api_key_var.set(config['api_key'])
+                    if 'cache_max_mb' in config:
+                        cache_max_bytes = int(config['cache_max_mb']) * 1024 * 1024
             except:
                 pass
         
+        # Cache of previously synthesized audio, saves API credits on repeats
+        self.synthesis_cache = SynthesisCache(os.path.join(self.app_dir, "cache"), cache_max_bytes)
+        
+        # Pooled API client, created on first use. A generation still running on a
+        # replaced engine keeps it open until it finishes
+        self.lemonfox_engine = None
+        self.engine_in_use = None
+        
         # Create the main frame
         self.main_frame = ttk.Frame(root, padding="10")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -77,6 +100,9 @@ class LemonFoxApp:
         pygame.init()
         pygame.mixer.init()
         
+        # Reports when the music ends, nothing runs while no audio plays
+        self.music_watcher = MusicWatcher(self.root)
+        
         # Currently playing audio
         self.currently_playing = None
         self.is_paused = False
@@ -87,12 +113,15 @@ class LemonFoxApp:
         self.status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
-        # Set up an audio status checker 
-        self.root.after(100, self.check_audio_status)
-        
         # Set up cleanup on exit
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
+        # Periodically remove stale temp files and files no history entry uses
+        self.storage_sweeper = StorageSweeper(self.root, self.get_sweep_targets,
+                                              self.history_store.referenced_paths,
+                                              self.on_storage_swept)
+        self.storage_sweeper.start(delay_ms=60 * 1000)
+        
     def init_voice_data(self):
         """Initialize the voice and language data structure with gender information"""
         # Create a dictionary of voices organized by language code and gender
@@ -156,9 +185,15 @@ class LemonFoxApp:
         # Stop any playing audio
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
+        self._stop_streaming_playback()
+        self.music_watcher.cancel()
             
-        # Clean up temp files
+        # Clean up temp files and close pooled connections
+        self.storage_sweeper.stop()
+        for engine in {self.lemonfox_engine, self.engine_in_use} - {None}:
+            engine.close()
         self.cleanup_temp_files()
+        self.history_store.close()
             
         # Properly quit pygame
         pygame.quit()
@@ -166,6 +201,25 @@ class LemonFoxApp:
         # Close the window
         self.root.destroy()
         
+    def get_sweep_targets(self):
+        """Directories the storage sweeper cleans and the files currently in use"""
+        keep = []
+        if getattr(self, 'temp_audio_file', None):
+            keep.append(self.temp_audio_file)
+            keep.append(os.path.splitext(self.temp_audio_file)[0] + "_timestamps.json")
+        return {
+            'temp_dir': os.path.join(self.app_dir, "temp"),
+            'audio_dirs': [self.audio_dir, os.path.join(self.audio_dir, "blobs")],
+            'timestamp_dirs': [],
+            'keep': keep
+        }
+    
+    def on_storage_swept(self, report):
+        """Report what the storage sweeper reclaimed"""
+        if report['files']:
+            size_mb = report['bytes'] / (1024 * 1024)
+            self.status_var.set(f"Cleaned up {report['files']} unused files ({size_mb:.1f} MB freed)")
+    
     def cleanup_temp_files(self):
         """Clean up any temporary audio files"""
         if hasattr(self, 'temp_audio_file') and self.temp_audio_file:
@@ -175,21 +229,23 @@ class LemonFoxApp:
                 except:
                     pass
         
-    def check_audio_status(self):
-        """Check if music is still playing and update UI accordingly"""
-        # If music was playing but has stopped
-        if hasattr(self, 'play_button') and not pygame.mixer.music.get_busy() and self.play_button.cget('text') == "⏸ Pause":
+    def on_music_ended(self):
+        """Reset the play buttons once the mixer reports the music has ended"""
+        if hasattr(self, 'play_button') and self.streaming_player is None and self.play_button.cget('text') == "⏸ Pause":
             # Reset the play button
             self.play_button.config(text="▶ Play")
             self.status_var.set("Ready")
         
         # Check history play button if applicable
-        if hasattr(self, 'history_play_button') and self.currently_playing == "history" and not pygame.mixer.music.get_busy() and self.history_play_button.cget('text') == "⏸ Pause":
+        if hasattr(self, 'history_play_button') and self.currently_playing == "history" and self.history_play_button.cget('text') == "⏸ Pause":
             self.history_play_button.config(text="▶ Play")
             self.status_var.set("Ready")
         
-        # Schedule this to run again
-        self.root.after(100, self.check_audio_status)
+        # Return the position slider that was following playback to the start
+        for scrub in (self.tts_scrub, self.history_scrub):
+            if scrub.tracking:
+                scrub.cancel()
+                scrub.set_position(0)
             
     def ensure_directories(self):
         """Ensure that necessary directories exist"""
@@ -197,24 +253,11 @@ class LemonFoxApp:
         os.makedirs(self.audio_dir, exist_ok=True)
         
     def load_history(self):
-        """Load audio file history from disk"""
-        history_file = os.path.join(self.app_dir, "history.json")
-        if os.path.exists(history_file):
-            try:
-                with open(history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-        
-    def save_history(self):
-        """Save audio file history to disk"""
-        history_file = os.path.join(self.app_dir, "history.json")
-        try:
-            with open(history_file, 'w') as f:
-                json.dump(self.audio_history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving history: {str(e)}")
+        """Open the history database, importing history.json once, and the blob store it points into"""
+        self.history_store = HistoryStore(
+            os.path.join(self.app_dir, "history.db"),
+            legacy_json_path=os.path.join(self.app_dir, "history.json"))
+        self.blob_store = BlobStore(os.path.join(self.audio_dir, "blobs"))
             
     def init_tts_tab(self):
         tts_frame = ttk.Frame(self.tts_tab, padding="10")
@@ -310,6 +353,13 @@ class LemonFoxApp:
         timestamps_check = ttk.Checkbutton(param_grid, variable=self.timestamps_var)
         timestamps_check.grid(column=3, row=2, sticky=tk.W, padx=5, pady=5)
         
+        # Streaming playback checkbox, only MP3 can be played before the download completes
+        ttk.Label(param_grid, text="Play While Downloading (MP3):").grid(column=2, row=3, sticky=tk.W, padx=5, pady=5)
+        
+        self.stream_playback_var = BooleanVar(value=False)
+        stream_check = ttk.Checkbutton(param_grid, variable=self.stream_playback_var)
+        stream_check.grid(column=3, row=3, sticky=tk.W, padx=5, pady=5)
+        
         # Buttons frame
         button_frame = ttk.Frame(tts_frame)
         button_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -347,9 +397,14 @@ class LemonFoxApp:
         ttk.Label(playback_frame, textvariable=self.now_playing_var, 
                  font=("Helvetica", 9, "italic")).pack(side=tk.LEFT, padx=20)
         
-        # Variable to store the audio data
-        self.audio_data = None
+        # Position slider, seeking uses the index built when the audio was downloaded
+        self.tts_scrub = ScrubBar(tts_frame, self.seek_tts_audio)
+        self.tts_scrub.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # The generated audio lives in a temp file, it is never held in memory as a whole
         self.temp_audio_file = None
+        self.audio_index = None
+        self.streaming_player = None
         
         # Initialize the voice dropdown with voices for the default language and gender
         self.update_voice_selection(show_message=False)
@@ -406,6 +461,15 @@ class LemonFoxApp:
         list_frame = ttk.Frame(history_frame)
         list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Search box, matches title, text, voice and language
+        search_frame = ttk.Frame(list_frame)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.history_search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.history_search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.history_search_debouncer = Debouncer(self.root, self.populate_history_list)
+        self.history_search_var.trace_add("write", self.history_search_debouncer.trigger)
+        
         # Create scrollable listbox
         ttk.Label(list_frame, text="Generated Audio Files:").pack(anchor=tk.W, padx=5, pady=5)
         
@@ -416,7 +480,7 @@ class LemonFoxApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.history_listbox = tk.Listbox(list_container, height=15, 
-                                         yscrollcommand=scrollbar.set, 
+                                         yscrollcommand=lambda first, last: self.on_history_scroll(scrollbar, first, last), 
                                          font=("Helvetica", 10))
         self.history_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.history_listbox.yview)
@@ -463,6 +527,10 @@ class LemonFoxApp:
         self.history_delete_button.pack(side=tk.LEFT, padx=5)
         self.history_delete_button.config(state="disabled")
         
+        # Position slider for the selected item
+        self.history_scrub = ScrubBar(details_frame, self.seek_history_audio)
+        self.history_scrub.grid(column=0, row=5, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
+        
         # Populate the history list
         self.populate_history_list()
         
@@ -527,6 +595,24 @@ class LemonFoxApp:
         test_frame.pack(fill=tk.X, padx=10, pady=10)
         
         ttk.Button(test_frame, text="Test Connection", command=self.test_connection).pack(padx=5, pady=5)
+        
+        # Synthesis cache management
+        cache_frame = ttk.LabelFrame(self.settings_tab, text="Synthesis Cache", padding="10")
+        cache_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Button(cache_frame, text="Clear Cache", command=self.clear_synthesis_cache).pack(
+            side=tk.LEFT, padx=5, pady=5)
+            
+    def clear_synthesis_cache(self):
+        """Remove all cached audio"""
+        size_mb = self.synthesis_cache.size() / (1024 * 1024)
+        confirm = messagebox.askyesno("Confirm Clear", 
+                                     f"Remove {size_mb:.1f} MB of cached audio?")
+        if not confirm:
+            return
+            
+        self.synthesis_cache.clear()
+        self.status_var.set("Synthesis cache cleared")
             
     def toggle_proxy_settings(self):
         if self.use_proxy_var.get():
@@ -545,14 +631,6 @@ class LemonFoxApp:
         if not base_url.endswith('/'):
             base_url += '/'
             
-        # Just try to hit a simple endpoint
-        url = f"{base_url}v1/models"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         proxies = None
         if self.use_proxy_var.get() and self.proxy_url_var.get():
             proxies = {
@@ -562,12 +640,14 @@ class LemonFoxApp:
         
         self.status_var.set("Testing connection...")
         
+        # The form may hold settings that are not saved yet, test them on a client of
+        # their own so the one generation uses is left alone
+        engine = None
         try:
-            # Use a session with a longer timeout
-            session = requests.Session()
             timeout = int(self.timeout_var.get())
+            engine = LemonFoxEngine(self.api_key, base_url, timeout, proxies)
             
-            response = session.get(url, headers=headers, proxies=proxies, timeout=timeout)
+            response = engine.get("v1/models")
             
             if response.status_code == 200:
                 messagebox.showinfo("Connection Successful", 
@@ -580,7 +660,22 @@ class LemonFoxApp:
         except Exception as e:
             messagebox.showerror("Connection Error", f"Error connecting to API: {str(e)}")
             self.status_var.set("Connection test failed: Error")
+        finally:
+            if engine is not None:
+                engine.close()
             
+    def get_lemonfox_engine(self):
+        """The app-wide API client for the saved settings, rebuilt only when they change"""
+        if self.lemonfox_engine is None or not self.lemonfox_engine.matches(self.base_url, self.timeout, self.proxies):
+            # A generation may still be downloading over the old client, it is closed once that ends
+            if self.lemonfox_engine is not None and self.lemonfox_engine is not self.engine_in_use:
+                self.lemonfox_engine.close()
+            self.lemonfox_engine = LemonFoxEngine(self.api_key, self.base_url, self.timeout, self.proxies,
+                                                  self.synthesis_cache)
+        # The key is sent per request, changing it needs no new connections
+        self.lemonfox_engine.api_key = self.api_key
+        return self.lemonfox_engine
+        
     def toggle_api_key_visibility(self):
         if self.show_key_var.get():
             self.api_key_entry.config(show="")
@@ -673,12 +768,26 @@ class LemonFoxApp:
         
     def toggle_play_pause(self):
         """Toggle between play and pause for the current audio"""
+        # Audio that is still downloading is played by the streaming player
+        if self.streaming_player is not None:
+            if self.streaming_player.is_paused:
+                self.streaming_player.resume()
+                self.play_button.config(text="⏸ Pause")
+                self.status_var.set("Playing audio...")
+            else:
+                self.streaming_player.pause()
+                self.play_button.config(text="▶ Resume")
+                self.status_var.set("Audio paused")
+            return
+            
         if not self.temp_audio_file or not os.path.exists(self.temp_audio_file):
             return
             
         if pygame.mixer.music.get_busy() and not self.is_paused:
             # Pause the currently playing audio
             pygame.mixer.music.pause()
+            self.music_watcher.pause()
+            self.tts_scrub.pause()
             self.is_paused = True
             self.play_button.config(text="▶ Resume")
             self.status_var.set("Audio paused")
@@ -686,18 +795,37 @@ class LemonFoxApp:
             # Either start playing or resume
             if self.is_paused:
                 pygame.mixer.music.unpause()
+                self.music_watcher.resume()
+                self.tts_scrub.resume()
                 self.is_paused = False
                 self.play_button.config(text="⏸ Pause")
                 self.status_var.set("Playing audio...")
             else:
-                pygame.mixer.music.load(self.temp_audio_file)
-                pygame.mixer.music.play()
-                self.play_button.config(text="⏸ Pause")
-                self.status_var.set("Playing audio...")
+                self.play_tts_audio()
+                
+    def play_tts_audio(self, seconds=0.0):
+        """Play the generated audio from seconds, the seek index makes any position instant"""
+        self.history_scrub.cancel()
+        start = play_music_from(self.temp_audio_file, self.audio_index, seconds)
+        self.music_watcher.watch(self.on_music_ended)
+        self.tts_scrub.track(lambda: music_position(start))
+        self.currently_playing = "tts"
+        self.is_paused = False
+        self.play_button.config(text="⏸ Pause")
+        self.status_var.set("Playing audio...")
+        
+    def seek_tts_audio(self, seconds):
+        """Continue playback of the generated audio from the slider position"""
+        if self.streaming_player is not None or not self.temp_audio_file or not os.path.exists(self.temp_audio_file):
+            return
+        try:
+            self.play_tts_audio(seconds)
+        except Exception as e:
+            messagebox.showerror("Playback Error", f"Error playing audio: {str(e)}")
                 
     def add_to_history(self):
         """Add current audio to history"""
-        if not self.audio_data:
+        if not self.temp_audio_file or not os.path.exists(self.temp_audio_file):
             return
             
         # Create a timestamp for unique filename
@@ -706,32 +834,40 @@ class LemonFoxApp:
         # Generate a safe filename
         safe_title = "".join([c if c.isalnum() or c in [' ', '-', '_'] else '_' for c in self.title_var.get()])
         
-        # Create a filename
-        filename = f"{safe_title}_{timestamp}.{self.format_var.get()}"
-        file_path = os.path.join(self.audio_dir, filename)
+        # The audio keeps the format it was generated in, whatever the dropdown shows now
+        audio_format = format_of(self.temp_audio_file)
+        
+        # Create a filename, the audio itself is stored once per distinct content
+        filename = f"{safe_title}_{timestamp}.{audio_format}"
         
-        # Save the audio file
+        # Save the audio file, identical audio already in history is reused
         try:
-            with open(file_path, 'wb') as file:
-                file.write(self.audio_data)
+            file_path = self.blob_store.put_file(self.temp_audio_file, audio_format)
+            
+            # Duration is known exactly from the frames, a constant bitrate seek index
+            # is only a few numbers and is kept so playback can start anywhere at once
+            duration = self.audio_index["duration"] if self.audio_index else None
+            seek_index = self.audio_index if is_compact(self.audio_index) else None
                 
             # Create history entry
             history_entry = {
                 'title': self.title_var.get(),
                 'filename': filename,
                 'path': file_path,
+                'blob': file_path,
                 'text': self.tts_text.get("1.0", tk.END).strip(),
                 'voice': self.voice_var.get(),
                 'language': self.language_var.get(),
                 'gender': self.gender_var.get(),
-                'format': self.format_var.get(),
+                'format': audio_format,
                 'speed': float(self.speed_var.get()),
-                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'duration': duration,
+                'seek_index': seek_index
             }
             
             # Add to history
-            self.audio_history.append(history_entry)
-            self.save_history()
+            self.history_store.add(history_entry)
             
             # Update the history list
             self.populate_history_list()
@@ -747,20 +883,51 @@ class LemonFoxApp:
             messagebox.showerror("Error", f"Failed to add to history: {str(e)}")
             
     def populate_history_list(self):
-        """Populate the history listbox with entries from history"""
+        """Show the first page of history, newest first, more pages load on scroll"""
+        # Only entries matching the search box are listed
+        self.history_search_debouncer.cancel()
+        self.history_query = self.history_search_var.get().strip()
+        
         # Clear the listbox
         self.history_listbox.delete(0, tk.END)
+        self.history_rows = []
+        self.history_total = self.history_store.count(self.history_query)
         
-        # Add entries to the listbox
-        for i, entry in enumerate(self.audio_history):
-            gender_icon = "👩" if entry.get('gender', '') == 'female' else "👨"
-            self.history_listbox.insert(tk.END, f"{entry['title']} ({gender_icon} {entry['voice']})")
+        # Add the first page of entries to the listbox
+        self.load_more_history()
             
         # Disable buttons if no history
-        if len(self.audio_history) == 0:
+        if self.history_total == 0:
             self.history_play_button.config(state="disabled")
             self.history_delete_button.config(state="disabled")
             
+    def format_history_row(self, entry):
+        """Text of the history listbox row for an entry"""
+        gender_icon = "👩" if entry.get('gender', '') == 'female' else "👨"
+        duration = f" [{format_duration(entry['duration'])}]" if entry.get('duration') else ""
+        return f"{entry['title']} ({gender_icon} {entry['voice']}){duration}"
+
+    def load_more_history(self):
+        """Fetch the next page of history entries and append them to the list"""
+        if self.history_loading or len(self.history_rows) >= self.history_total:
+            return
+        self.history_loading = True
+        try:
+            before_id = self.history_rows[-1]['id'] if self.history_rows else None
+            for entry in self.history_store.page(before_id, query=self.history_query):
+                self.history_listbox.insert(tk.END, self.format_history_row(entry))
+                self.history_rows.append(entry)
+        except Exception as e:
+            print(f"Error loading history: {str(e)}")
+        finally:
+            self.history_loading = False
+    
+    def on_history_scroll(self, scrollbar, first, last):
+        """Update the scrollbar and load more entries when the end comes into view"""
+        scrollbar.set(first, last)
+        if float(last) > 0.9 and len(self.history_rows) < self.history_total:
+            self.root.after_idle(self.load_more_history)
+
     def on_history_select(self, event):
         """Handle selection from history list"""
         if not self.history_listbox.curselection():
@@ -769,8 +936,11 @@ class LemonFoxApp:
         # Get selected index
         index = self.history_listbox.curselection()[0]
         
-        # Get the corresponding history entry
-        entry = self.audio_history[index]
+        # Fetch the full entry, including its text, only now that it is needed
+        entry = self.history_store.get(self.history_rows[index]['id'])
+        if entry is None:
+            return
+        self.selected_history_entry = entry
         
         # Update the details
         self.history_title_var.set(entry['title'])
@@ -792,6 +962,10 @@ class LemonFoxApp:
         self.history_text.insert("1.0", entry['text'])
         self.history_text.config(state="disabled")
         
+        # The slider always belongs to the selected entry, so a seek never lands in another clip.
+        # It shows the stored duration and stays disabled for older entries without one
+        self.history_scrub.set_duration(entry.get('duration'))
+        
         # Enable the buttons
         self.history_play_button.config(state="normal")
         self.history_delete_button.config(state="normal")
@@ -801,11 +975,19 @@ class LemonFoxApp:
         
     def play_history_item(self):
         """Play the currently selected history item"""
+        self.play_history_from(0.0)
+        
+    def seek_history_audio(self, seconds):
+        """Play the selected history item from the slider position"""
+        self.play_history_from(seconds)
+        
+    def play_history_from(self, seconds):
+        """Play the selected history item starting at seconds"""
         if not hasattr(self, 'selected_history_index') or self.selected_history_index is None:
             return
             
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         file_path = entry['path']
         
         # Check if the file exists
@@ -816,11 +998,15 @@ class LemonFoxApp:
         # Stop any currently playing audio
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.stop()
+        self._stop_streaming_playback()
             
         try:
-            # Load and play the audio
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
+            # Load and play the audio, the stored seek index finds the start without decoding
+            self.tts_scrub.cancel()
+            self.history_scrub.set_duration(entry.get('duration'))
+            start = play_music_from(file_path, entry.get('seek_index'), seconds)
+            self.music_watcher.watch(self.on_music_ended)
+            self.history_scrub.track(lambda: music_position(start))
             
             # Update the status
             self.status_var.set(f"Playing: {entry['title']}")
@@ -841,7 +1027,7 @@ class LemonFoxApp:
             return
             
         # Get the history entry
-        entry = self.audio_history[self.selected_history_index]
+        entry = self.selected_history_entry
         
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Delete", 
@@ -854,19 +1040,27 @@ class LemonFoxApp:
         if pygame.mixer.music.get_busy() and self.currently_playing == "history":
             pygame.mixer.music.stop()
             
-        # Delete the file
+        # Remove from history first so the blob's reference count no longer includes this entry
+        self.history_store.delete(entry['id'])
+        
+        # Delete the audio file once no other entry shares it
         try:
-            if os.path.exists(entry['path']):
+            if entry.get('blob'):
+                self.blob_store.remove(entry['blob'], self.history_store.count_blob_references)
+            elif os.path.exists(entry['path']):
                 os.remove(entry['path'])
         except Exception as e:
             messagebox.showwarning("Warning", f"Could not delete file: {str(e)}")
             
-        # Remove from history
-        self.audio_history.pop(self.selected_history_index)
-        self.save_history()
+        # Remove the row from the list, nothing else in it changes
+        self.history_listbox.delete(self.selected_history_index)
+        self.history_rows.pop(self.selected_history_index)
+        self.history_total -= 1
+        self.history_listbox.selection_clear(0, tk.END)
         
-        # Update the list
-        self.populate_history_list()
+        # Fill the gap from the next page if the end of the list is in view
+        if len(self.history_rows) < self.history_total and self.history_listbox.yview()[1] > 0.9:
+            self.load_more_history()
         
         # Clear the details
         self.history_title_var.set("")
@@ -882,6 +1076,7 @@ class LemonFoxApp:
         
         # Reset selection
         self.selected_history_index = None
+        self.selected_history_entry = None
         
         # Update status
         self.status_var.set("Item deleted from history")
@@ -916,122 +1111,110 @@ class LemonFoxApp:
         # Update status
         self.status_var.set("Generating speech...")
         
+        # Collect the request here, the engine never touches Tk variables
+        request = SynthesisRequest(
+            text=text,
+            voice=self.voice_var.get(),
+            backend="lemonfox",
+            format=self.format_var.get(),
+            word_timestamps=self.timestamps_var.get(),
+            language=self.language_var.get(),
+            speed=float(self.speed_var.get())
+        )
+        engine = self.get_lemonfox_engine()
+        self.engine_in_use = engine
+        
+        # The download is written straight to a new temp file
+        temp_dir = os.path.join(self.app_dir, "temp")
+        os.makedirs(temp_dir, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        temp_file = os.path.join(temp_dir, f"temp_{timestamp}.{request.format}")
+        
+        # Start playing as soon as the first audio arrives if requested
+        self._stop_streaming_playback()
+        if self.stream_playback_var.get() and request.format == "mp3":
+            if pygame.mixer.music.get_busy():
+                pygame.mixer.music.stop()
+            self.is_paused = False
+            self.streaming_player = StreamingPlayer()
+            self.play_button.config(text="⏸ Pause", state="normal")
+            self.root.after(50, self._pump_streaming_player)
+        
         # Start a thread for the API request
-        thread = threading.Thread(target=self._generate_speech_thread, args=(text,))
+        thread = threading.Thread(target=self._generate_speech_thread, args=(engine, request, temp_file))
         thread.daemon = True
         thread.start()
         
-    def _generate_speech_thread(self, text):
+    def _pump_streaming_player(self):
+        """Keep the streaming player supplied with decoded audio"""
+        if self.streaming_player is None:
+            return
+            
+        if self.streaming_player.pump():
+            self.root.after(50, self._pump_streaming_player)
+        else:
+            # Stream has been played to the end
+            self.streaming_player = None
+            self.play_button.config(text="▶ Play")
+            self.status_var.set("Ready")
+            
+    def _stop_streaming_playback(self):
+        """Stop any audio that is playing from an in-progress download"""
+        if self.streaming_player is not None:
+            self.streaming_player.stop()
+            self.streaming_player = None
+        
+    def _generate_speech_thread(self, engine, request, temp_file):
         """Background thread for API communication"""
         try:
-            # Set up the API endpoint
-            base_url = self.base_url
-            if not base_url.endswith('/'):
-                base_url += '/'
-                
-            url = f"{base_url}v1/audio/speech"
-            
-            # Set up the headers
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            # When streaming, the player receives audio as it downloads
+            player = self.streaming_player
+            engine.synthesize(request, output_file=temp_file,
+                              on_audio=player.feed if player is not None else None)
+            if player is not None:
+                player.finish()
             
-            # Set up the request data
-            data = {
-                "input": text,
-                "voice": self.voice_var.get(),
-                "language": self.language_var.get(),
-                "response_format": self.format_var.get(),
-                "speed": float(self.speed_var.get())
-            }
+            # Index the frames once, for the exact duration and seeking
+            audio_index = build_seek_index_file(temp_file)
             
-            # Add word timestamps if enabled
-            if self.timestamps_var.get():
-                data["word_timestamps"] = True
-                
-            # Set up retry strategy
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=0.5,
-                status_forcelist=[429, 500, 502, 503, 504]
-            )
-            
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            
-            with requests.Session() as session:
-                session.mount("http://", adapter)
-                session.mount("https://", adapter)
-                
-                # Make the API request
-                timeout = int(self.timeout_var.get())
-                response = session.post(
-                    url, 
-                    headers=headers, 
-                    json=data, 
-                    proxies=self.proxies,
-                    timeout=timeout
-                )
-                
-                # Check if the request was successful
-                if response.status_code == 200:
-                    # Get the audio content
-                    audio_content = response.content
-                    
-                    # Create a temporary file for playback
-                    temp_dir = os.path.join(self.app_dir, "temp")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    # Create a unique temporary filename
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-                    temp_file = os.path.join(temp_dir, f"temp_{timestamp}.{self.format_var.get()}")
-                    
-                    # Write the audio to the temp file
-                    with open(temp_file, 'wb') as f:
-                        f.write(audio_content)
-                        
-                    # Store the audio data
-                    self.audio_data = audio_content
-                    
-                    # Cleanup previous temp file if it exists
-                    if hasattr(self, 'temp_audio_file') and self.temp_audio_file and os.path.exists(self.temp_audio_file):
-                        try:
-                            os.remove(self.temp_audio_file)
-                        except:
-                            pass
-                            
-                    # Set the new temp file
-                    self.temp_audio_file = temp_file
-                    
-                    # Update the UI on the main thread
-                    self.root.after(0, self._update_ui_after_generation, True, None)
-                else:
-                    # Handle error
-                    error_message = f"API error: {response.status_code}"
-                    try:
-                        error_json = response.json()
-                        if 'error' in error_json:
-                            error_message = f"API error: {error_json['error']['message']}"
-                    except:
-                        pass
-                        
-                    # Update the UI with the error
-                    self.root.after(0, self._update_ui_after_generation, False, error_message)
+            # Update the UI on the main thread, which also takes over the new audio
+            self.root.after(0, self._update_ui_after_generation, True, None, temp_file, audio_index)
                     
         except Exception as e:
-            # Handle any exceptions
+            # Handle any exceptions, API errors carry the message from the response
             self.root.after(0, self._update_ui_after_generation, False, str(e))
             
-    def _update_ui_after_generation(self, success, error_message):
+    def _replace_temp_audio_file(self, temp_file):
+        """Make a finished download the current audio, removing the previous temp file"""
+        if self.temp_audio_file and self.temp_audio_file != temp_file and os.path.exists(self.temp_audio_file):
+            try:
+                os.remove(self.temp_audio_file)
+            except:
+                pass
+                
+        # Set the new temp file
+        self.temp_audio_file = temp_file
+        
+    def _update_ui_after_generation(self, success, error_message, temp_file=None, audio_index=None):
         """Update the UI after speech generation (called on main thread)"""
         # Re-enable generate button
         self.generate_button.config(state="normal")
         
+        # Close the client this generation used if the settings replaced it meanwhile
+        engine, self.engine_in_use = self.engine_in_use, None
+        if engine is not None and engine is not self.lemonfox_engine:
+            engine.close()
+        
         if success:
+            # The file and its index change together, on the thread that plays them
+            self._replace_temp_audio_file(temp_file)
+            self.audio_index = audio_index
+            
             # Enable playback controls
             self.play_button.config(state="normal")
             self.save_button.config(state="normal")
             self.add_history_button.config(state="normal")
+            self.tts_scrub.set_duration(self.audio_index["duration"] if self.audio_index else None)
             
             # Update labels
             gender_icon = "👩" if self.gender_var.get() == 'female' else "👨"
@@ -1040,11 +1223,15 @@ class LemonFoxApp:
             # Update status
             self.status_var.set("Speech generated successfully")
             
-            # Offer to play
-            play_now = messagebox.askyesno("Success", "Speech generated successfully. Play now?")
-            if play_now:
-                self.toggle_play_pause()
+            # Offer to play, unless it is already playing from the download
+            if self.streaming_player is None:
+                play_now = messagebox.askyesno("Success", "Speech generated successfully. Play now?")
+                if play_now:
+                    self.toggle_play_pause()
         else:
+            self._stop_streaming_playback()
+            self.play_button.config(text="▶ Play")
+            
             # Show error message
             messagebox.showerror("Error", f"Failed to generate speech: {error_message}")
             
@@ -1053,11 +1240,11 @@ class LemonFoxApp:
             
     def save_audio(self):
         """Save the generated audio to a file"""
-        if not self.audio_data:
+        if not self.temp_audio_file or not os.path.exists(self.temp_audio_file):
             return
             
-        # Ask for save location
-        file_ext = self.format_var.get()
+        # Ask for save location, offering the format the audio was generated in
+        file_ext = format_of(self.temp_audio_file)
         filetypes = []
         
         if file_ext == "mp3":
@@ -1083,15 +1270,24 @@ class LemonFoxApp:
         )
         
         if file_path:
-            try:
-                with open(file_path, 'wb') as file:
-                    file.write(self.audio_data)
-                    
-                messagebox.showinfo("Success", f"Audio saved as: {file_path}")
-                self.status_var.set(f"Audio saved to {os.path.basename(file_path)}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save audio: {str(e)}")
+            # A different supported extension converts the file, anything else gets a plain copy
+            if format_of(file_path) not in (None, file_ext):
+                self.status_var.set(f"Converting audio to {format_of(file_path)}...")
+            # The job converts its own pinned link to the temp file, a new generation may delete it meanwhile
+            future = submit_transcode_file(self.temp_audio_file, file_path)
+            
+            def done(future):
+                self.root.after(0, self._on_audio_saved, file_path, future.exception())
+            
+            future.add_done_callback(done)
+            
+    def _on_audio_saved(self, file_path, error):
+        """Report the result of save_audio"""
+        if error is None:
+            messagebox.showinfo("Success", f"Audio saved as: {file_path}")
+            self.status_var.set(f"Audio saved to {os.path.basename(file_path)}")
+        else:
+            messagebox.showerror("Error", f"Failed to save audio: {str(error)}")
 
 
 # Initialize and run the application
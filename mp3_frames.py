@@ -0,0 +1,167 @@
+"""Minimal MPEG audio frame parsing for working with MP3 streams without decoding them"""
+
+# Bitrates in kbit/s indexed by [version is MPEG-1][layer][bitrate index]
+_BITRATES = {
+    True: {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    False: {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+# Sample rates indexed by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+
+FRAME_HEADER_SIZE = 4
+
+
+def parse_frame_header(data, pos=0):
+    """Parse the MPEG audio frame header at data[pos]
+
+    Returns a dict with the frame length in bytes, sample rate, samples per
+    frame and channel count, or None if there is no valid header there.
+    """
+    if pos + FRAME_HEADER_SIZE > len(data):
+        return None
+
+    b0, b1, b2, b3 = data[pos], data[pos + 1], data[pos + 2], data[pos + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    is_mpeg1 = version_bits == 3
+    bitrate = _BITRATES[is_mpeg1][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or is_mpeg1:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+
+    return {
+        "length": length,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "channels": 1 if (b3 >> 6) == 3 else 2,
+        "is_mpeg1": is_mpeg1,
+    }
+
+
+def id3v2_size(data, pos=0):
+    """Size in bytes of an ID3v2 tag starting at data[pos], or 0 if there is none"""
+    if data[pos:pos + 3] != b"ID3" or len(data) < pos + 10:
+        return 0
+    flags = data[pos + 5]
+    size = 0
+    for byte in data[pos + 6:pos + 10]:
+        size = (size << 7) | (byte & 0x7F)
+    # A footer adds another 10 bytes
+    return size + 10 + (10 if flags & 0x10 else 0)
+
+
+def complete_frames_end(data, start=0):
+    """Offset just past the last complete frame in data, walking from start
+
+    Used to cut a growing stream at a frame boundary so that every slice
+    handed to a decoder only contains whole frames.
+    """
+    pos = start + id3v2_size(data, start)
+    while True:
+        header = parse_frame_header(data, pos)
+        if header is None or pos + header["length"] > len(data):
+            return pos
+        pos += header["length"]
+
+
+def is_info_frame(data, pos, header):
+    """True if the frame at data[pos] carries a Xing, Info or VBRI header instead of audio"""
+    if header["is_mpeg1"]:
+        side_info = 17 if header["channels"] == 1 else 32
+    else:
+        side_info = 9 if header["channels"] == 1 else 17
+    tag_pos = pos + FRAME_HEADER_SIZE + side_info
+    return (data[tag_pos:tag_pos + 4] in (b"Xing", b"Info")
+            or data[pos + FRAME_HEADER_SIZE + 32:pos + FRAME_HEADER_SIZE + 36] == b"VBRI")
+
+
+def frame_index(data):
+    """Locate the audio frames of an MP3 stream without decoding it
+
+    A leading ID3v2 tag and a Xing/Info/VBRI header frame are skipped, the
+    walk ends at the first byte that isn't a complete frame (an ID3v1 tag,
+    trailing garbage or a cut-off frame). Returns a dict with:
+
+        start, end   -- the byte range holding exactly the audio frames
+        offsets      -- byte offset of every audio frame
+        samples      -- total samples per channel, the exact duration
+        sample_rate  -- sample rate of the stream, 0 if no frame was found
+    """
+    pos = id3v2_size(data)
+    header = parse_frame_header(data, pos)
+    if header is not None and is_info_frame(data, pos, header):
+        pos += header["length"]
+
+    start = pos
+    offsets = []
+    samples = 0
+    sample_rate = 0
+    while True:
+        header = parse_frame_header(data, pos)
+        if header is None or pos + header["length"] > len(data):
+            break
+        offsets.append(pos)
+        samples += header["samples"]
+        sample_rate = sample_rate or header["sample_rate"]
+        pos += header["length"]
+
+    return {
+        "start": start,
+        "end": pos,
+        "offsets": offsets,
+        "samples": samples,
+        "sample_rate": sample_rate,
+    }
+
+
+def concatenate(parts):
+    """Join MP3 streams at the frame level, without decoding or re-encoding
+
+    Only the audio frames of each part are kept, so tags and Xing/Info
+    frames don't end up in the middle of the result, where a decoder would
+    play them as a short silence. Returns the joined bytes and each part's
+    frame_index() (without offsets into the joined stream); a part with no
+    recognisable frames is appended as it is and has sample_rate 0.
+    """
+    joined = bytearray()
+    indexes = []
+    for part in parts:
+        index = frame_index(part)
+        if index["offsets"]:
+            joined += memoryview(part)[index["start"]:index["end"]]
+        else:
+            joined += part
+        indexes.append(index)
+    return bytes(joined), indexes
@@ -0,0 +1,90 @@
+"""Client-side rate limiting for HTTP APIs that throttle with 429 responses"""
+import threading
+import time
+
+# Defaults used for the LemonFox API when no account limits are configured
+DEFAULT_REQUESTS_PER_SECOND = 4.0
+DEFAULT_MAX_IN_FLIGHT = 4
+# The rate never drops below this fraction of the configured one
+MIN_RATE_FRACTION = 0.05
+# After this many successes in a row the rate steps back up
+RECOVERY_SUCCESSES = 10
+
+
+class TokenBucket:
+    """Limits requests per second and requests in flight, slowing down when throttled
+
+    Every request takes a token, tokens refill at the current rate up to
+    burst. At most max_in_flight requests hold a slot at once. throttled()
+    stops everyone until the server's Retry-After has passed and halves the
+    rate; a run of successful requests raises it again step by step up to the
+    configured rate. All methods are thread safe and acquire() blocks.
+    """
+
+    def __init__(self, rate=DEFAULT_REQUESTS_PER_SECOND, max_in_flight=DEFAULT_MAX_IN_FLIGHT, burst=None):
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.burst = float(burst if burst is not None else max(1.0, self.max_rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent, the caller must release() afterwards"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._in_flight >= self.max_in_flight:
+                    wait = None
+                elif self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+                self._condition.wait(wait)
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def throttled(self, retry_after):
+        """The server answered 429, pause for retry_after seconds and send slower from now on"""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._successes = 0
+            self._condition.notify_all()
+
+    def succeeded(self):
+        """A request went through, recover towards the configured rate"""
+        with self._condition:
+            if self.rate >= self.max_rate:
+                return
+            self._successes += 1
+            if self._successes >= RECOVERY_SUCCESSES:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+                self._successes = 0
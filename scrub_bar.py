@@ -0,0 +1,99 @@
+"""Playback position slider with elapsed and total time"""
+import tkinter as tk
+from tkinter import ttk
+
+from seek_index import format_duration
+
+# How often the slider follows the playback position
+POSITION_UPDATE_MS = 250
+
+
+class ScrubBar(ttk.Frame):
+    """A ttk.Scale over a clip's duration and an "elapsed / total" label
+
+    on_seek(seconds) is called when the user lets go of the slider. After
+    track(get_position) the slider follows get_position() every
+    POSITION_UPDATE_MS; pause() and cancel() stop that, so nothing is
+    scheduled while nothing plays. The slider is disabled while the
+    duration is unknown.
+    """
+
+    def __init__(self, parent, on_seek, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_seek = on_seek
+        self.duration = 0.0
+        self._get_position = None
+        self._after_id = None
+        self._dragging = False
+
+        self.position_var = tk.DoubleVar(value=0.0)
+        self.scale = ttk.Scale(self, from_=0, to=1, orient=tk.HORIZONTAL,
+                               variable=self.position_var, command=self._on_drag)
+        self.scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.scale.bind("<ButtonPress-1>", self._on_press)
+        self.scale.bind("<ButtonRelease-1>", self._on_release)
+
+        self.time_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.time_var, width=16).pack(side=tk.LEFT, padx=5)
+        self.set_duration(None)
+
+    def set_duration(self, seconds):
+        """Show a new clip, None when its duration is unknown"""
+        self.cancel()
+        self.duration = float(seconds or 0.0)
+        self.scale.config(to=max(self.duration, 1.0))
+        self.scale.state(["!disabled"] if self.duration else ["disabled"])
+        self.set_position(0.0)
+
+    def set_position(self, seconds):
+        if not self._dragging:
+            self.position_var.set(seconds)
+        self._show(seconds)
+
+    def _show(self, seconds):
+        total = format_duration(self.duration) if self.duration else "--:--"
+        self.time_var.set(f"{format_duration(seconds)} / {total}")
+
+    @property
+    def tracking(self):
+        return self._get_position is not None
+
+    def track(self, get_position):
+        """Follow get_position() until pause() or cancel()"""
+        self._get_position = get_position
+        self.resume()
+
+    def pause(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def resume(self):
+        if self._get_position is not None and self._after_id is None:
+            self._update()
+
+    def cancel(self):
+        """Stop following playback, the slider stays where it is"""
+        self.pause()
+        self._get_position = None
+
+    def _update(self):
+        self._after_id = None
+        if self._get_position is None:
+            return
+        self.set_position(min(self.duration, self._get_position()))
+        self._after_id = self.after(POSITION_UPDATE_MS, self._update)
+
+    def _on_press(self, event):
+        if self.duration:
+            self._dragging = True
+
+    def _on_drag(self, value):
+        if self._dragging:
+            self._show(float(value))
+
+    def _on_release(self, event):
+        if not self._dragging:
+            return
+        self._dragging = False
+        self.on_seek(self.position_var.get())
@@ -0,0 +1,112 @@
+"""Frame/time index for generated MP3 audio, built once so playback can start anywhere
+
+MP3 frames each hold the same number of samples, so the frame playing at
+any time is found by arithmetic. For constant bitrate streams such as Edge
+TTS output the frame's byte offset is arithmetic as well, and the index is
+a handful of numbers small enough to keep in a history entry. Other streams
+carry a table of frame offsets.
+"""
+import mmap
+import os
+
+from mp3_frames import frame_index
+from tts_chunking import TICKS_PER_SECOND
+
+# Characters allowed between one located word and the next, room for punctuation
+# and a word or two Edge TTS reports differently from how the text spells it
+MAX_WORD_GAP = 64
+
+
+def build_seek_index(audio):
+    """Seek index for MP3 audio (bytes or any buffer), None if it holds no MP3 frames
+
+    The index is a dict with the exact duration in seconds, the sample rate,
+    samples per frame and frame count, plus either start and frame_length
+    (constant bitrate) or offsets (one per frame).
+    """
+    index = frame_index(audio)
+    offsets = index["offsets"]
+    if not offsets:
+        return None
+
+    seek_index = {
+        "duration": index["samples"] / index["sample_rate"],
+        "sample_rate": index["sample_rate"],
+        "frame_samples": index["samples"] // len(offsets),
+        "frames": len(offsets),
+        "start": offsets[0],
+    }
+    lengths = set(following - offset for offset, following in zip(offsets, offsets[1:]))
+    if len(lengths) <= 1:
+        seek_index["frame_length"] = lengths.pop() if lengths else index["end"] - offsets[0]
+    else:
+        seek_index["offsets"] = offsets
+    return seek_index
+
+
+def build_seek_index_file(path):
+    """build_seek_index() for an MP3 file, mapped rather than read into memory"""
+    if os.path.splitext(path)[1].lower() != ".mp3" or not os.path.getsize(path):
+        return None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return build_seek_index(data)
+
+
+def is_compact(seek_index):
+    """True if the index needs no per-frame table, and so is cheap to store anywhere"""
+    return seek_index is not None and "offsets" not in seek_index
+
+
+def seek_position(seek_index, seconds):
+    """(byte offset, start time in seconds) of the frame playing at seconds"""
+    frame = int(seconds * seek_index["sample_rate"]) // seek_index["frame_samples"]
+    frame = max(0, min(frame, seek_index["frames"] - 1))
+    if "offsets" in seek_index:
+        offset = seek_index["offsets"][frame]
+    else:
+        offset = seek_index["start"] + frame * seek_index["frame_length"]
+    return offset, frame * seek_index["frame_samples"] / seek_index["sample_rate"]
+
+
+def word_seconds(boundary):
+    """Start of a WordBoundary event in seconds"""
+    return boundary.get("offset", 0) / TICKS_PER_SECOND
+
+
+def locate_words(text, word_boundaries):
+    """Copies of WordBoundary events with the character offset of their word in text
+
+    Words are looked for in order, each shortly after the one before. A word
+    the text doesn't hold there, such as a number Edge TTS spelled out, gets
+    no text_offset.
+    """
+    located = []
+    position = 0
+    for boundary in word_boundaries:
+        boundary = dict(boundary)
+        word = boundary.get("text", "")
+        found = text.find(word, position, position + MAX_WORD_GAP + len(word)) if word else -1
+        if found >= 0:
+            boundary["text_offset"] = found
+            position = found + len(word)
+        located.append(boundary)
+    return located
+
+
+def word_at(word_boundaries, offset):
+    """The located WordBoundary of the word at or after character offset, None past the last"""
+    for boundary in word_boundaries:
+        start = boundary.get("text_offset")
+        if start is not None and offset < start + len(boundary.get("text", "")):
+            return boundary
+    return None
+
+
+def format_duration(seconds):
+    """m:ss, or h:mm:ss from an hour on"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,150 @@
+"""Background cleanup of temp files and audio/timestamp files no history entry references"""
+import os
+import re
+import threading
+import time
+
+# Temp files older than this are removed even when the size budget is not exceeded
+TEMP_MAX_AGE = 24 * 60 * 60
+# Unreferenced history files younger than this may belong to a save in progress
+ORPHAN_GRACE_PERIOD = 60 * 60
+# Temp files are trimmed oldest first down to this total size
+TEMP_MAX_BYTES = 200 * 1024 * 1024
+# Time between sweeps
+SWEEP_INTERVAL_MS = 30 * 60 * 1000
+
+# Only files the apps name themselves are considered, output folders may hold user files
+_AUDIO_NAME = re.compile(r'(^[0-9a-f]{64}|_\d{14})\.(mp3|wav|ogg|webm|flac|opus|aac)$')
+_TIMESTAMP_NAME = re.compile(r'_\d{14}_timestamps\.json$')
+
+
+def _scan(directory, pattern=None):
+    """(path, size, mtime) of the regular files in directory matching pattern"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    files = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or (pattern and not pattern.search(entry.name)):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        files.append((entry.path, stat.st_size, stat.st_mtime))
+    return files
+
+
+def _remove(path):
+    """Delete a file, returns True if it was removed"""
+    try:
+        os.remove(path)
+        return True
+    except OSError as e:
+        print(f"Could not remove {path}: {str(e)}")
+        return False
+
+
+def sweep(temp_dir, audio_dirs, timestamp_dirs, referenced, keep=(),
+          now=None, temp_max_age=TEMP_MAX_AGE, orphan_grace=ORPHAN_GRACE_PERIOD,
+          temp_max_bytes=TEMP_MAX_BYTES):
+    """Delete stale temp files and orphaned history files
+
+    referenced -- paths used by history entries, never deleted
+    keep       -- further paths in use right now, e.g. the current temp file
+
+    Temp files are removed once older than temp_max_age, then oldest first
+    until the directory fits temp_max_bytes. Audio and timestamp files that
+    no history entry references are removed once older than orphan_grace.
+    Returns a dict with the number of files and bytes reclaimed.
+    """
+    now = time.time() if now is None else now
+    protected = set(os.path.normcase(os.path.abspath(path)) for path in list(referenced) + list(keep) if path)
+    report = {"files": 0, "bytes": 0}
+
+    def reclaim(path, size):
+        if _remove(path):
+            report["files"] += 1
+            report["bytes"] += size
+
+    def unprotected(files):
+        return [f for f in files if os.path.normcase(os.path.abspath(f[0])) not in protected]
+
+    # Temp files: by age, then by size budget
+    temp_files = sorted(unprotected(_scan(temp_dir)), key=lambda f: f[2])
+    remaining = []
+    for path, size, mtime in temp_files:
+        if now - mtime > temp_max_age:
+            reclaim(path, size)
+        else:
+            remaining.append((path, size, mtime))
+    total = sum(size for _, size, _ in remaining)
+    for path, size, mtime in remaining:
+        if total <= temp_max_bytes:
+            break
+        reclaim(path, size)
+        total -= size
+
+    # History files nothing points at any more
+    orphans = []
+    for directory in audio_dirs:
+        orphans.extend(_scan(directory, _AUDIO_NAME))
+    for directory in timestamp_dirs:
+        orphans.extend(_scan(directory, _TIMESTAMP_NAME))
+    for path, size, mtime in unprotected(orphans):
+        if now - mtime > orphan_grace:
+            reclaim(path, size)
+
+    return report
+
+
+class StorageSweeper:
+    """Runs sweep() on a worker thread every SWEEP_INTERVAL_MS while the app is open
+
+    get_targets is called on the Tk thread before each sweep and returns the
+    keyword arguments for sweep() other than referenced, so directory
+    settings and the file in use are always current. get_referenced is
+    called on the worker thread and returns the paths history still uses.
+    on_done receives the report back on the Tk thread.
+    """
+
+    def __init__(self, root, get_targets, get_referenced, on_done=None, interval_ms=SWEEP_INTERVAL_MS):
+        self.root = root
+        self.get_targets = get_targets
+        self.get_referenced = get_referenced
+        self.on_done = on_done
+        self.interval_ms = interval_ms
+        self._after_id = None
+        self._running = False
+
+    def start(self, delay_ms=None):
+        """Schedule the first sweep, by default one interval from now"""
+        self._after_id = self.root.after(self.interval_ms if delay_ms is None else delay_ms, self.run_now)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def run_now(self):
+        """Start a sweep in the background unless one is already running"""
+        self._after_id = None
+        if not self._running:
+            self._running = True
+            targets = self.get_targets()
+            threading.Thread(target=self._sweep_thread, args=(targets,), daemon=True).start()
+        self.start()
+
+    def _sweep_thread(self, targets):
+        try:
+            report = sweep(referenced=self.get_referenced(), **targets)
+        except Exception as e:
+            print(f"Error cleaning up storage: {str(e)}")
+            report = None
+        finally:
+            self._running = False
+        if report is not None and self.on_done:
+            try:
+                self.root.after(0, self.on_done, report)
+            except RuntimeError:
+                # The window was closed while sweeping
+                pass
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from async_loop import BackgroundLoop, get_shared_loop
+
+
+@pytest.fixture
+def background():
+    loop = BackgroundLoop(name="test-loop")
+    yield loop
+    loop.stop()
+
+
+def test_submit_runs_coroutines_on_the_loop_thread(background):
+    async def where():
+        await asyncio.sleep(0)
+        return threading.current_thread(), asyncio.get_running_loop()
+
+    results = [background.submit(where()) for _ in range(5)]
+    threads, loops = zip(*(future.result(timeout=5) for future in results))
+    assert set(threads) == {background._thread}
+    assert background._thread.name == "test-loop"
+    assert set(loops) == {background.loop}
+
+
+def test_exceptions_reach_the_caller(background):
+    async def fail():
+        raise ValueError("no voice")
+
+    future = background.submit(fail())
+    with pytest.raises(ValueError, match="no voice"):
+        future.result(timeout=5)
+    with pytest.raises(ValueError, match="no voice"):
+        background.run(fail(), timeout=5)
+    # The loop keeps running after a failure
+    assert background.run(asyncio.sleep(0, result=42), timeout=5) == 42
+
+
+def test_stop_cancels_pending_work():
+    background = BackgroundLoop()
+    future = background.submit(asyncio.sleep(60))
+    background.stop()
+    assert future.cancelled()
+    assert background.loop.is_closed()
+    background.stop()
+
+
+def test_shared_loop_is_started_once():
+    assert get_shared_loop() is get_shared_loop()
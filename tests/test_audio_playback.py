@@ -0,0 +1,57 @@
+import threading
+import time
+
+from audio_playback import MAX_RESERVOIR_BYTES, StreamingPlayer, _overlap_tail
+
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes(140)
+
+
+def test_overlap_tail_covers_the_bit_reservoir_plus_a_frame():
+    segment = FRAME * 10
+    tail = _overlap_tail(segment)
+    # Four 144 byte frames hold the 511 byte reservoir, one more primes the decoder
+    assert len(tail) == 5 * len(FRAME)
+    assert len(tail) - len(FRAME) >= MAX_RESERVOIR_BYTES
+    assert segment.endswith(tail)
+
+
+def test_overlap_tail_of_a_short_segment_is_all_of_it():
+    assert _overlap_tail(FRAME * 2) == FRAME * 2
+    assert _overlap_tail(b"not mp3") == b""
+
+
+def test_feed_returns_without_decoding(monkeypatch):
+    release = threading.Event()
+    decoded = []
+
+    def decode(self, segment):
+        release.wait(5)
+        decoded.append((threading.current_thread(), segment))
+        return segment
+
+    monkeypatch.setattr(StreamingPlayer, "_decode", decode)
+    player = StreamingPlayer()
+    player.feed(FRAME * 100)
+    player.feed(FRAME * 10)
+    player.finish()
+    # Decoding is held up, yet the feeding thread is already through
+    assert decoded == []
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while not player._finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [segment for _, segment in decoded] == [FRAME * 100, FRAME * 10]
+    assert all(thread is not threading.current_thread() for thread, _ in decoded)
+    assert list(player._segments) == [FRAME * 100, FRAME * 10]
+
+
+def test_stop_drops_what_was_not_decoded(monkeypatch):
+    monkeypatch.setattr(StreamingPlayer, "_decode", lambda self, segment: segment)
+    player = StreamingPlayer()
+    player.stop()
+    player.feed(FRAME * 100)
+    player.finish()
+    time.sleep(0.05)
+    assert not player._segments
+    assert not player.pump()
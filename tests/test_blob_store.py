@@ -0,0 +1,68 @@
+import hashlib
+import os
+
+import pytest
+
+import blob_store
+from blob_store import BlobStore
+
+
+def test_put_stores_identical_audio_once(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    path = store.put(b"audio", "mp3")
+    assert path == str(tmp_path / "blobs" / (hashlib.sha256(b"audio").hexdigest() + ".mp3"))
+    assert store.put(b"audio", "mp3") == path
+    assert store.put(b"other audio", "mp3") != path
+    assert len(os.listdir(tmp_path / "blobs")) == 2
+
+
+def test_put_file_matches_put(tmp_path):
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(b"x" * (3 * blob_store.COPY_BLOCK_SIZE // 2))
+    store = BlobStore(str(tmp_path / "blobs"))
+    path = store.put_file(str(source), "mp3")
+    assert store.put(source.read_bytes(), "mp3") == path
+    with open(path, 'rb') as f:
+        assert f.read() == source.read_bytes()
+
+
+def test_write_is_atomic(tmp_path, monkeypatch):
+    store = BlobStore(str(tmp_path))
+
+    def crash(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(blob_store.os, "replace", crash)
+    with pytest.raises(OSError):
+        store.put(b"audio", "mp3")
+    # Only the temp file was written, never a blob that looks complete
+    assert [name.endswith(".tmp") for name in os.listdir(tmp_path)] == [True]
+    monkeypatch.undo()
+
+    path = store.put(b"audio", "mp3")
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_remove_only_without_references(tmp_path):
+    store = BlobStore(str(tmp_path))
+    path = store.put(b"audio", "mp3")
+    counted = []
+
+    def references(count):
+        return lambda blob: counted.append(blob) or count
+
+    assert not store.remove(path, references(1))
+    assert os.path.exists(path)
+    assert store.remove(path, references(0))
+    assert not os.path.exists(path)
+    assert counted == [path, path]
+    assert not store.remove(path, references(0))
+
+
+def test_move_to_keeps_existing_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / "old"))
+    old_path = store.put(b"audio", "mp3")
+    store.move_to(str(tmp_path / "new"))
+    new_path = store.put(b"more audio", "mp3")
+    assert os.path.dirname(new_path) == str(tmp_path / "new")
+    assert store.remove(old_path, lambda blob: 0)
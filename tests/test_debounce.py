@@ -0,0 +1,57 @@
+from debounce import Debouncer
+
+
+class FakeRoot:
+    """Tk's after() and after_cancel(), with time advanced by hand"""
+
+    def __init__(self):
+        self.now = 0
+        self.timers = {}
+        self._next_id = 0
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.timers[self._next_id] = (self.now + delay_ms, callback)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        del self.timers[after_id]
+
+    def advance(self, ms):
+        self.now += ms
+        for after_id, (due, callback) in sorted(self.timers.items(), key=lambda timer: timer[1][0]):
+            if due <= self.now and after_id in self.timers:
+                del self.timers[after_id]
+                callback()
+
+
+def test_burst_gives_one_call_after_the_last_trigger():
+    root = FakeRoot()
+    calls = []
+    debouncer = Debouncer(root, lambda: calls.append(root.now), delay_ms=200)
+
+    for _ in range(5):
+        debouncer.trigger("trace", "args")
+        root.advance(100)
+    assert calls == []
+    assert debouncer.pending
+    root.advance(100)
+    assert calls == [600]
+    assert not debouncer.pending
+    assert root.timers == {}
+
+
+def test_cancel_drops_the_pending_call():
+    root = FakeRoot()
+    calls = []
+    debouncer = Debouncer(root, lambda: calls.append(root.now), delay_ms=200)
+
+    debouncer.trigger()
+    debouncer.cancel()
+    debouncer.cancel()
+    root.advance(1000)
+    assert calls == []
+
+    debouncer.trigger()
+    root.advance(200)
+    assert calls == [1200]
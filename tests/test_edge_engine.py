@@ -0,0 +1,82 @@
+import asyncio
+
+import tts_engine
+from tts_chunking import TICKS_PER_SECOND
+from tts_engine import EdgeEngine, SynthesisRequest
+
+
+def frames(tag, count):
+    """count 144 byte MPEG-2 Layer III frames whose payload bytes are all tag"""
+    return (bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes([tag]) * 140) * count
+
+
+# Later chunks finish first
+CHUNK_DELAYS = [0.06, 0.03, 0.0]
+FRAME_TICKS = 576 * TICKS_PER_SECOND // 24000
+
+
+class StubEngine(EdgeEngine):
+    """Synthesizes chunk n of "zero|one|two" as n + 1 frames, streamed in two halves"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.running = 0
+        self.most_running = 0
+        self.finished = []
+
+    async def synthesize_chunk(self, voice, text, attempts=3, on_audio=None, prosody=None):
+        index = ["zero", "one", "two"].index(text)
+        audio = frames(index, index + 1)
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            half = len(audio) // 2
+            for part in (audio[:half], audio[half:]):
+                await asyncio.sleep(CHUNK_DELAYS[index])
+                if on_audio is not None:
+                    on_audio(part)
+        finally:
+            self.running -= 1
+        self.finished.append(index)
+        return audio, [{"text": text, "offset": 100, "duration": 50}]
+
+
+def synthesize(engine, monkeypatch, **kwargs):
+    monkeypatch.setattr(tts_engine, "split_text", lambda text: text.split("|"))
+    request = SynthesisRequest(text="zero|one|two", voice="en-US-AriaNeural")
+    return asyncio.run(engine.synthesize(request, **kwargs))
+
+
+def test_chunks_run_in_parallel_and_are_stitched_in_order(monkeypatch):
+    engine = StubEngine()
+    progress = []
+    result = synthesize(engine, monkeypatch, on_progress=lambda done, total: progress.append((done, total)))
+
+    assert engine.most_running == 3
+    assert engine.finished == [2, 1, 0]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert result.audio == frames(0, 1) + frames(1, 2) + frames(2, 3)
+    assert [(b["text"], b["offset"], b["text_offset"]) for b in result.word_boundaries] == [
+        ("zero", 100, 0),
+        ("one", FRAME_TICKS + 100, 5),
+        ("two", 3 * FRAME_TICKS + 100, 9),
+    ]
+
+
+def test_streamed_audio_arrives_in_text_order(monkeypatch):
+    engine = StubEngine()
+    streamed = []
+    result = synthesize(engine, monkeypatch, on_audio=streamed.append)
+
+    assert engine.finished == [2, 1, 0]
+    assert b"".join(streamed) == result.audio
+    # The first chunk's halves go straight through, the rest was held back until it closed
+    assert streamed[:2] == [frames(0, 1)[:72], frames(0, 1)[72:]]
+
+
+def test_concurrency_limit(monkeypatch):
+    engine = StubEngine(max_concurrency=1)
+    result = synthesize(engine, monkeypatch)
+    assert engine.most_running == 1
+    assert engine.finished == [0, 1, 2]
+    assert result.audio == frames(0, 1) + frames(1, 2) + frames(2, 3)
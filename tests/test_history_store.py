@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    yield store
+    store.close()
+
+
+def entry(n, **fields):
+    return dict({"timestamp": f"2024-01-01 00:00:{n:02d}", "voice": "en-US-AriaNeural",
+                 "language": "English", "title": f"Entry {n}", "text": f"Text of entry {n}"}, **fields)
+
+
+def test_add_get_delete(store):
+    entry_id = store.add(entry(1, path="/audio/1.mp3", rate="+10%"))
+    stored = store.get(entry_id)
+    assert stored["id"] == entry_id
+    assert stored["title"] == "Entry 1"
+    # Fields without a column of their own round-trip through extra
+    assert stored["path"] == "/audio/1.mp3"
+    assert stored["rate"] == "+10%"
+
+    assert store.delete(entry_id)
+    assert not store.delete(entry_id)
+    assert store.get(entry_id) is None
+
+
+def test_pages_newest_first_without_text(store):
+    ids = [store.add(entry(n)) for n in range(5)]
+    first = store.page(limit=2)
+    assert [e["id"] for e in first] == [ids[4], ids[3]]
+    assert "text" not in first[0]
+    second = store.page(before_id=first[-1]["id"], limit=2)
+    assert [e["id"] for e in second] == [ids[2], ids[1]]
+    assert [e["id"] for e in store.all()] == ids
+    assert store.count() == 5
+
+
+def test_referenced_paths(store):
+    store.add(entry(1, path="/audio/1.mp3", timestamp_file="/ts/1.json"))
+    store.add(entry(2, blob="/blobs/ab/abcd.mp3", path="/blobs/ab/abcd.mp3"))
+    store.add(entry(3, blob="/blobs/ab/abcd.mp3"))
+    assert store.referenced_paths() == {"/audio/1.mp3", "/ts/1.json", "/blobs/ab/abcd.mp3"}
+    assert store.count_blob_references("/blobs/ab/abcd.mp3") == 2
+
+
+def test_migrates_legacy_json_once(tmp_path):
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps([entry(1), entry(2), "not an entry"]))
+
+    store = HistoryStore(str(tmp_path / "history.db"), str(legacy))
+    assert [e["title"] for e in store.all()] == ["Entry 1", "Entry 2"]
+    store.close()
+    assert not legacy.exists()
+    assert (tmp_path / "history.json.migrated").exists()
+
+    store = HistoryStore(str(tmp_path / "history.db"), str(legacy))
+    assert store.count() == 2
+    store.close()
+
+
+@pytest.fixture(params=[True, False], ids=["fts5", "like"])
+def search_store(request, tmp_path, monkeypatch):
+    if not request.param:
+        # Behave like a sqlite3 build without FTS5
+        monkeypatch.setattr(HistoryStore, "_ensure_fts", lambda self: False)
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.has_fts == request.param
+    store.add(entry(1, title="Morning news", text="The weather today is sunny"))
+    store.add(entry(2, title="Recipe", text="Mix the flour with water", voice="de-DE-KatjaNeural"))
+    store.add(entry(3, title="Weather report", text="Rain is expected tomorrow"))
+    yield store
+    store.close()
+
+
+def titles(entries):
+    return [e["title"] for e in entries]
+
+
+def test_search_matches_title_text_and_voice(search_store):
+    assert titles(search_store.page(query="weather")) == ["Weather report", "Morning news"]
+    assert titles(search_store.page(query="flour")) == ["Recipe"]
+    assert titles(search_store.page(query="katja")) == ["Recipe"]
+    assert search_store.count(query="weather") == 2
+
+
+def test_search_needs_every_term_and_the_last_one_as_a_prefix(search_store):
+    assert titles(search_store.page(query="weather sun")) == ["Morning news"]
+    assert titles(search_store.page(query="rain tom")) == ["Weather report"]
+    assert search_store.page(query="weather flour") == []
+
+
+def test_search_ignores_punctuation(search_store):
+    # Quotes and FTS5 syntax in the query must not reach the MATCH syntax
+    assert titles(search_store.page(query='"recipe* (')) == ["Recipe"]
+    assert search_store.count(query="  ") == 3
+
+
+def test_search_pages(search_store):
+    first = search_store.page(query="weather", limit=1)
+    assert titles(first) == ["Weather report"]
+    assert titles(search_store.page(query="weather", before_id=first[0]["id"])) == ["Morning news"]
+
+
+def test_search_follows_deletes(search_store):
+    entry_id = search_store.page(query="recipe")[0]["id"]
+    search_store.delete(entry_id)
+    assert search_store.page(query="recipe") == []
+    assert search_store.count(query="flour") == 0
@@ -0,0 +1,114 @@
+import email.utils
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from rate_limit import TokenBucket
+from tts_engine import (MAX_RETRY_AFTER, THROTTLE_RETRIES, LemonFoxEngine, SynthesisError,
+                        SynthesisRequest, retry_after_seconds)
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def json(self):
+        raise ValueError("not JSON")
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeSession:
+    """Answers posts with the given responses in turn"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append((url, kwargs))
+        return self.responses.pop(0)
+
+
+def make_engine(responses, rate=1000):
+    engine = LemonFoxEngine("key", rate_limiter=TokenBucket(rate, max_in_flight=2))
+    engine._session = FakeSession(responses)
+    return engine
+
+
+def request():
+    return SynthesisRequest(text="Hello", voice="sarah", backend="lemonfox")
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("-1") == 0.0
+    assert retry_after_seconds("100000") == MAX_RETRY_AFTER
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after_seconds(when) <= 30
+    # Missing or unreadable, back off exponentially
+    assert retry_after_seconds(None, attempt=0) == 1.0
+    assert retry_after_seconds("soon", attempt=3) == 8.0
+    assert retry_after_seconds(None, attempt=20) == MAX_RETRY_AFTER
+
+
+def test_429_slows_the_bucket_and_retries():
+    throttled = FakeResponse(429, headers={"Retry-After": "0.05"})
+    engine = make_engine([throttled, FakeResponse(200, b"audio")])
+
+    start = time.monotonic()
+    result = engine.synthesize(request())
+    assert result.audio == b"audio"
+    assert len(engine.session.posts) == 2
+    assert throttled.closed
+    # Every sender waited out Retry-After, and the rate was halved
+    assert time.monotonic() - start >= 0.05
+    assert engine.rate_limiter.rate == 500
+    assert engine.rate_limiter._in_flight == 0
+
+
+def test_429_gives_up_after_the_retries():
+    responses = [FakeResponse(429, headers={"Retry-After": "0"}) for _ in range(THROTTLE_RETRIES + 1)]
+    engine = make_engine(responses)
+
+    with pytest.raises(SynthesisError, match="429"):
+        engine.synthesize(request())
+    assert len(engine.session.posts) == THROTTLE_RETRIES + 1
+    assert engine.rate_limiter.rate < engine.rate_limiter.max_rate
+    assert engine.rate_limiter._in_flight == 0
+
+
+def test_successes_count_towards_recovery():
+    engine = make_engine([FakeResponse(200, b"audio")])
+    engine.rate_limiter.throttled(0)
+    engine.synthesize(request())
+    assert engine.rate_limiter._successes == 1
+
+
+def test_streams_into_output_file(tmp_path):
+    engine = make_engine([FakeResponse(200, b"x" * 200000)])
+    chunks = []
+    output = tmp_path / "speech.mp3"
+
+    result = engine.synthesize(request(), output_file=str(output), on_audio=chunks.append)
+    assert result.audio is None
+    assert result.path == str(output)
+    assert output.read_bytes() == b"x" * 200000
+    assert b"".join(chunks) == b"x" * 200000
+    assert engine.session.posts[0][1]["stream"]
@@ -0,0 +1,100 @@
+from mp3_frames import complete_frames_end, concatenate, frame_index, id3v2_size, parse_frame_header
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz mono: what Edge TTS streams, 144 bytes a frame
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes(140)
+# The same with the padding bit set, one byte longer
+PADDED_FRAME = bytes([0xFF, 0xF3, 0x66, 0xC4]) + bytes(141)
+# A frame of the same format carrying a Xing header after the 9 bytes of side info
+INFO_FRAME = FRAME[:13] + b"Xing" + bytes(127)
+
+
+def id3v2_tag(body_size):
+    """An ID3v2 tag header followed by body_size bytes of tag data"""
+    size = bytes((body_size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + size + bytes(body_size)
+
+
+def test_parse_frame_header():
+    header = parse_frame_header(FRAME)
+    assert header == {
+        "length": 144,
+        "bitrate": 48000,
+        "sample_rate": 24000,
+        "samples": 576,
+        "channels": 1,
+        "is_mpeg1": False,
+    }
+    assert parse_frame_header(PADDED_FRAME)["length"] == 145
+
+
+def test_parse_mpeg1_frame_header():
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz stereo
+    header = parse_frame_header(bytes([0xFF, 0xFB, 0x90, 0x00]))
+    assert header["length"] == 417
+    assert header["samples"] == 1152
+    assert header["channels"] == 2
+    assert header["is_mpeg1"]
+
+
+def test_parse_frame_header_rejects_non_frames():
+    assert parse_frame_header(b"") is None
+    assert parse_frame_header(FRAME[:3]) is None
+    assert parse_frame_header(b"ID3\x04") is None
+    # Free format and reserved bitrate / sample rate indexes
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0x04, 0xC4])) is None
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0xF4, 0xC4])) is None
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0x6C, 0xC4])) is None
+    assert parse_frame_header(FRAME + FRAME, pos=1) is None
+
+
+def test_id3v2_size():
+    assert id3v2_size(id3v2_tag(300) + FRAME) == 310
+    assert id3v2_size(FRAME) == 0
+
+
+def test_complete_frames_end_cuts_at_frame_boundaries():
+    stream = FRAME + PADDED_FRAME + FRAME
+    assert complete_frames_end(stream) == len(stream)
+    assert complete_frames_end(stream[:-1]) == 144 + 145
+    assert complete_frames_end(stream[:100]) == 0
+    assert complete_frames_end(stream, start=144) == len(stream)
+
+
+def test_complete_frames_end_skips_id3v2_tag():
+    stream = id3v2_tag(50) + FRAME + FRAME[:10]
+    assert complete_frames_end(stream) == 60 + 144
+
+
+def test_frame_index():
+    stream = id3v2_tag(20) + INFO_FRAME + FRAME + PADDED_FRAME + FRAME + b"TAG" + bytes(125)
+    index = frame_index(stream)
+    start = 30 + 144
+    assert index == {
+        "start": start,
+        "end": start + 144 + 145 + 144,
+        "offsets": [start, start + 144, start + 144 + 145],
+        "samples": 3 * 576,
+        "sample_rate": 24000,
+    }
+
+
+def test_frame_index_without_frames():
+    index = frame_index(b"not an mp3 stream")
+    assert index["offsets"] == []
+    assert index["samples"] == 0
+    assert index["sample_rate"] == 0
+
+
+def test_frame_index_stops_at_a_cut_off_frame():
+    index = frame_index(FRAME * 3 + FRAME[:50])
+    assert index["end"] == 3 * 144
+    assert index["samples"] == 3 * 576
+
+
+def test_concatenate_keeps_only_audio_frames():
+    first = id3v2_tag(20) + INFO_FRAME + FRAME * 2
+    second = INFO_FRAME + PADDED_FRAME
+    joined, indexes = concatenate([first, second, b"raw"])
+    assert joined == FRAME * 2 + PADDED_FRAME + b"raw"
+    assert [index["samples"] for index in indexes] == [2 * 576, 576, 0]
+    assert indexes[2]["sample_rate"] == 0
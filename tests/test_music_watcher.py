@@ -0,0 +1,121 @@
+import types
+
+import pytest
+
+import audio_playback
+from audio_playback import MUSIC_END_EVENT, MusicWatcher
+from test_debounce import FakeRoot
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakePygame:
+    """pygame's mixer.music end event and busy flag, controlled by the test"""
+
+    def __init__(self, has_events=True):
+        self.error = FakeError
+        self.has_events = has_events
+        self.busy = False
+        self.queued = []
+        self.endevent = None
+        self.mixer = types.SimpleNamespace(music=types.SimpleNamespace(
+            set_endevent=self._set_endevent, get_busy=lambda: self.busy))
+        self.event = types.SimpleNamespace(get=self._get_events)
+
+    def _set_endevent(self, event_type):
+        self.endevent = event_type
+
+    def _get_events(self, event_type):
+        if not self.has_events:
+            raise FakeError("video system not initialized")
+        events = [event for event in self.queued if event == event_type]
+        self.queued = [event for event in self.queued if event != event_type]
+        return events
+
+    def end(self):
+        self.busy = False
+        self.queued.append(self.endevent)
+
+
+@pytest.fixture
+def fake_pygame(monkeypatch):
+    fake = FakePygame()
+    monkeypatch.setattr(audio_playback, "pygame", fake)
+    return fake
+
+
+def start(fake, root, on_end):
+    watcher = MusicWatcher(root, interval_ms=250)
+    fake.busy = True
+    watcher.watch(on_end)
+    return watcher
+
+
+def test_on_end_runs_once_after_the_end_event(fake_pygame):
+    root = FakeRoot()
+    ended = []
+    watcher = start(fake_pygame, root, lambda: ended.append(root.now))
+    assert fake_pygame.endevent == MUSIC_END_EVENT
+
+    root.advance(1000)
+    assert ended == []
+    fake_pygame.end()
+    root.advance(250)
+    assert ended == [1250]
+    assert not watcher.active
+    # Nothing stays scheduled once the music has ended
+    assert root.timers == {}
+
+
+def test_stale_end_events_are_ignored(fake_pygame):
+    root = FakeRoot()
+    ended = []
+    # The previous track's end event is still queued when the next one starts
+    fake_pygame.end()
+    start(fake_pygame, root, lambda: ended.append(root.now))
+    root.advance(500)
+    assert ended == []
+
+
+def test_pause_stops_checking_until_resume(fake_pygame):
+    root = FakeRoot()
+    ended = []
+    watcher = start(fake_pygame, root, lambda: ended.append(root.now))
+
+    watcher.pause()
+    assert root.timers == {}
+    fake_pygame.end()
+    root.advance(1000)
+    assert ended == []
+    watcher.resume()
+    root.advance(250)
+    assert ended == [1250]
+
+
+def test_cancel_never_calls_on_end(fake_pygame):
+    root = FakeRoot()
+    ended = []
+    watcher = start(fake_pygame, root, lambda: ended.append(root.now))
+    watcher.cancel()
+    fake_pygame.end()
+    root.advance(1000)
+    assert ended == []
+    assert not watcher.active
+    watcher.resume()
+    assert root.timers == {}
+
+
+def test_busy_flag_without_the_event_system(monkeypatch):
+    fake = FakePygame(has_events=False)
+    monkeypatch.setattr(audio_playback, "pygame", fake)
+    root = FakeRoot()
+    ended = []
+    start(fake, root, lambda: ended.append(root.now))
+
+    root.advance(500)
+    assert ended == []
+    fake.busy = False
+    root.advance(250)
+    assert ended == [750]
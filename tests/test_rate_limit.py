@@ -0,0 +1,65 @@
+import threading
+import time
+
+from rate_limit import MIN_RATE_FRACTION, RECOVERY_SUCCESSES, TokenBucket
+
+
+def test_burst_goes_through_then_the_rate_applies():
+    bucket = TokenBucket(rate=20, max_in_flight=10, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        with bucket:
+            pass
+    # Two more tokens at 20 per second
+    for _ in range(2):
+        with bucket:
+            pass
+    assert time.monotonic() - start >= 0.09
+
+
+def test_max_in_flight_blocks_until_a_release():
+    bucket = TokenBucket(rate=1000, max_in_flight=1)
+    bucket.acquire()
+    acquired = threading.Event()
+
+    def second():
+        with bucket:
+            acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.05)
+    bucket.release()
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_throttled_pauses_and_halves_the_rate():
+    bucket = TokenBucket(rate=100, max_in_flight=4)
+    bucket.throttled(0.1)
+    assert bucket.rate == 50
+    start = time.monotonic()
+    with bucket:
+        pass
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_never_drops_below_the_floor():
+    bucket = TokenBucket(rate=4)
+    for _ in range(20):
+        bucket.throttled(0)
+    assert bucket.rate == 4 * MIN_RATE_FRACTION
+
+
+def test_successes_recover_the_rate_step_by_step():
+    bucket = TokenBucket(rate=10)
+    bucket.throttled(0)
+    assert bucket.rate == 5
+    for _ in range(RECOVERY_SUCCESSES - 1):
+        bucket.succeeded()
+    assert bucket.rate == 5
+    bucket.succeeded()
+    assert bucket.rate == 6
+    for _ in range(10 * RECOVERY_SUCCESSES):
+        bucket.succeeded()
+    assert bucket.rate == 10
@@ -0,0 +1,97 @@
+import pytest
+
+from seek_index import (MAX_WORD_GAP, build_seek_index, build_seek_index_file, format_duration, is_compact,
+                        locate_words, seek_position, word_at, word_seconds)
+
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes(140)
+PADDED_FRAME = bytes([0xFF, 0xF3, 0x66, 0xC4]) + bytes(141)
+FRAME_SECONDS = 576 / 24000
+# An empty ID3v2 tag
+ID3_TAG = b"ID3\x04\x00\x00" + bytes(4)
+
+
+def test_constant_bitrate_index_is_arithmetic():
+    index = build_seek_index(ID3_TAG + FRAME * 100)
+    assert index == {
+        "duration": pytest.approx(100 * FRAME_SECONDS),
+        "sample_rate": 24000,
+        "frame_samples": 576,
+        "frames": 100,
+        "start": len(ID3_TAG),
+        "frame_length": 144,
+    }
+    assert is_compact(index)
+
+
+def test_variable_frame_lengths_get_an_offset_table():
+    index = build_seek_index(FRAME + PADDED_FRAME + FRAME)
+    assert index["offsets"] == [0, 144, 289]
+    assert not is_compact(index)
+    assert seek_position(index, 2 * FRAME_SECONDS + 0.001) == (289, pytest.approx(2 * FRAME_SECONDS))
+
+
+def test_single_frame_and_no_frames():
+    assert build_seek_index(FRAME)["frame_length"] == 144
+    assert build_seek_index(b"no frames here") is None
+    assert not is_compact(None)
+
+
+def test_seek_position_is_clamped_to_the_stream():
+    index = build_seek_index(FRAME * 10)
+    assert seek_position(index, 3.5 * FRAME_SECONDS) == (3 * 144, pytest.approx(3 * FRAME_SECONDS))
+    assert seek_position(index, -1) == (0, 0)
+    assert seek_position(index, 60) == (9 * 144, pytest.approx(9 * FRAME_SECONDS))
+
+
+def test_build_seek_index_file(tmp_path):
+    path = tmp_path / "speech.mp3"
+    path.write_bytes(FRAME * 4)
+    assert build_seek_index_file(str(path))["frames"] == 4
+
+    empty = tmp_path / "empty.mp3"
+    empty.write_bytes(b"")
+    wav = tmp_path / "speech.wav"
+    wav.write_bytes(FRAME * 4)
+    assert build_seek_index_file(str(empty)) is None
+    assert build_seek_index_file(str(wav)) is None
+
+
+def test_word_seconds_and_format_duration():
+    assert word_seconds({"offset": 25000000}) == 2.5
+    assert word_seconds({}) == 0
+    assert format_duration(59.9) == "0:59"
+    assert format_duration(754) == "12:34"
+    assert format_duration(3723) == "1:02:03"
+
+
+def boundaries(*words):
+    return [{"text": word, "offset": n * 1000} for n, word in enumerate(words)]
+
+
+def test_locate_words_in_order():
+    text = "The cat sat on the mat. The end!"
+    located = locate_words(text, boundaries("The", "cat", "sat", "on", "the", "mat", "The", "end"))
+    assert [b["text_offset"] for b in located] == [0, 4, 8, 12, 15, 19, 24, 28]
+    # The input events are left as they were
+    assert "text_offset" not in boundaries("The")[0]
+
+
+def test_locate_words_skips_words_the_text_spells_differently():
+    located = locate_words("I have 5 cats", boundaries("I", "have", "five", "cats"))
+    assert [b.get("text_offset") for b in located] == [0, 2, None, 9]
+
+
+def test_locate_words_does_not_jump_far_ahead():
+    text = "alpha " + "x" * (MAX_WORD_GAP + 10) + " beta alpha"
+    located = locate_words(text, boundaries("alpha", "gamma", "alpha"))
+    assert [b.get("text_offset") for b in located] == [0, None, None]
+
+
+def test_word_at():
+    located = locate_words("One two, three.", boundaries("One", "two", "three"))
+    assert word_at(located, 0)["text"] == "One"
+    assert word_at(located, 5)["text"] == "two"
+    # Between words the next one is taken
+    assert word_at(located, 7)["text"] == "three"
+    assert word_at(located, 14) is None
+    assert word_at(boundaries("One"), 0) is None
@@ -0,0 +1,65 @@
+import os
+
+from storage_gc import sweep
+
+NOW = 1700000000.0
+HOUR = 60 * 60
+BLOB_NAME = "ab" * 32 + ".mp3"
+
+
+def make_file(directory, name, size=10, age=0.0):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return str(path)
+
+
+def test_removes_old_temp_files(tmp_path):
+    temp = tmp_path / "temp"
+    old = make_file(temp, "old.mp3", age=25 * HOUR)
+    fresh = make_file(temp, "fresh.mp3", age=HOUR)
+    in_use = make_file(temp, "in_use.mp3", age=48 * HOUR)
+
+    report = sweep(str(temp), [], [], referenced=[], keep=[in_use], now=NOW)
+    assert report == {"files": 1, "bytes": 10}
+    assert not os.path.exists(old)
+    assert os.path.exists(fresh)
+    assert os.path.exists(in_use)
+
+
+def test_trims_temp_files_oldest_first_to_the_budget(tmp_path):
+    temp = tmp_path / "temp"
+    oldest = make_file(temp, "a.mp3", size=100, age=3 * HOUR)
+    older = make_file(temp, "b.mp3", size=100, age=2 * HOUR)
+    newest = make_file(temp, "c.mp3", size=100, age=HOUR)
+
+    report = sweep(str(temp), [], [], referenced=[], now=NOW, temp_max_bytes=150)
+    assert report == {"files": 2, "bytes": 200}
+    assert not os.path.exists(oldest)
+    assert not os.path.exists(older)
+    assert os.path.exists(newest)
+
+
+def test_removes_unreferenced_history_files_after_the_grace_period(tmp_path):
+    audio = tmp_path / "audio"
+    timestamps = tmp_path / "timestamps"
+    orphan = make_file(audio, "speech_20240101120000.mp3", age=2 * HOUR)
+    orphan_blob = make_file(audio, BLOB_NAME, age=2 * HOUR)
+    orphan_timestamps = make_file(timestamps, "speech_20240101120000_timestamps.json", age=2 * HOUR)
+    referenced = make_file(audio, "speech_20240101120001.mp3", age=2 * HOUR)
+    saving = make_file(audio, "speech_20240101120002.mp3", age=0.5 * HOUR)
+    users_file = make_file(audio, "my recording.mp3", age=100 * HOUR)
+
+    report = sweep(str(tmp_path / "temp"), [str(audio)], [str(timestamps)],
+                   referenced=[referenced], now=NOW)
+    assert report["files"] == 3
+    for path in (orphan, orphan_blob, orphan_timestamps):
+        assert not os.path.exists(path)
+    for path in (referenced, saving, users_file):
+        assert os.path.exists(path)
+
+
+def test_missing_directories_are_ignored(tmp_path):
+    missing = str(tmp_path / "missing")
+    assert sweep(missing, [missing, ""], [None], referenced=[], now=NOW) == {"files": 0, "bytes": 0}
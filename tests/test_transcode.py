@@ -0,0 +1,117 @@
+import os
+import threading
+
+import pytest
+
+import transcode
+from transcode import (TranscodeError, available_formats, format_of, submit_transcode_file,
+                       transcode as transcode_bytes, transcode_file)
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch):
+    monkeypatch.setattr(transcode.shutil, "which", lambda name: None)
+    monkeypatch.setattr(transcode, "_pygame_ready", lambda: False)
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Records where ffmpeg was asked to write, writes the source bytes there"""
+    written = []
+
+    def run_ffmpeg(ffmpeg, source_path, output_path, target):
+        written.append(output_path)
+        with open(source_path, 'rb') as source, open(output_path, 'wb') as output:
+            output.write(b"converted " + source.read())
+
+    monkeypatch.setattr(transcode, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(transcode, "_run_ffmpeg", run_ffmpeg)
+    return written
+
+
+def test_format_of():
+    assert format_of("/out/Speech.MP3") == "mp3"
+    assert format_of("speech.opus") == "opus"
+    assert format_of("speech.txt") is None
+    assert format_of("speech") is None
+
+
+def test_same_format_is_passed_through(no_ffmpeg, tmp_path):
+    data = b"mp3 bytes"
+    assert transcode_bytes(data, "MP3") is data
+
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(data)
+    assert transcode_file(str(source), str(tmp_path / "copy.mp3")) == str(tmp_path / "copy.mp3")
+    assert (tmp_path / "copy.mp3").read_bytes() == data
+    # An extension that names no format gets a plain copy too
+    transcode_file(str(source), str(tmp_path / "copy.bin"))
+    assert (tmp_path / "copy.bin").read_bytes() == data
+
+
+def test_missing_ffmpeg_is_a_clear_error(no_ffmpeg, tmp_path):
+    assert available_formats() == ("mp3",)
+    with pytest.raises(TranscodeError, match="needs ffmpeg on the PATH"):
+        transcode_bytes(b"mp3 bytes", "ogg")
+
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(b"mp3 bytes")
+    with pytest.raises(TranscodeError, match="needs ffmpeg on the PATH"):
+        transcode_file(str(source), str(tmp_path / "speech.flac"))
+    assert not (tmp_path / "speech.flac").exists()
+
+
+def test_unsupported_format(no_ffmpeg):
+    with pytest.raises(TranscodeError, match="Unsupported output format: aiff"):
+        transcode_bytes(b"mp3 bytes", "aiff")
+
+
+def test_file_is_written_to_a_temp_file_then_renamed(fake_ffmpeg, tmp_path):
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(b"mp3 bytes")
+    output = tmp_path / "speech.ogg"
+
+    assert transcode_file(str(source), str(output)) == str(output)
+    assert fake_ffmpeg == [str(output) + ".tmp.ogg"]
+    assert output.read_bytes() == b"converted mp3 bytes"
+    assert sorted(os.listdir(tmp_path)) == ["speech.mp3", "speech.ogg"]
+
+
+def test_failed_conversion_leaves_the_destination_alone(fake_ffmpeg, monkeypatch, tmp_path):
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(b"mp3 bytes")
+    output = tmp_path / "speech.ogg"
+    output.write_bytes(b"previous save")
+
+    def fail(ffmpeg, source_path, output_path, target):
+        with open(output_path, 'wb') as f:
+            f.write(b"half")
+        raise TranscodeError("ffmpeg could not convert to ogg: boom")
+
+    monkeypatch.setattr(transcode, "_run_ffmpeg", fail)
+    with pytest.raises(TranscodeError):
+        transcode_file(str(source), str(output))
+    assert output.read_bytes() == b"previous save"
+    assert sorted(os.listdir(tmp_path)) == ["speech.mp3", "speech.ogg"]
+
+
+def test_submitted_job_survives_the_source_being_deleted(no_ffmpeg, monkeypatch, tmp_path):
+    source = tmp_path / "speech.mp3"
+    source.write_bytes(b"mp3 bytes")
+    output = tmp_path / "saved.mp3"
+    start = threading.Event()
+    real_transcode_file = transcode.transcode_file
+
+    def held_transcode_file(*args):
+        start.wait(5)
+        return real_transcode_file(*args)
+
+    monkeypatch.setattr(transcode, "transcode_file", held_transcode_file)
+    future = submit_transcode_file(str(source), str(output))
+    # A new generation removes its temp file before the job gets to run
+    source.unlink()
+    start.set()
+
+    assert future.result(timeout=5) == str(output)
+    assert output.read_bytes() == b"mp3 bytes"
+    assert os.listdir(tmp_path) == ["saved.mp3"]
@@ -0,0 +1,112 @@
+from treeview_sync import TreeviewSync
+
+
+class FakeTree:
+    """The parts of a flat ttk.Treeview TreeviewSync uses, recording every call"""
+
+    def __init__(self):
+        self.values = {}
+        self.children = []
+        self.calls = []
+
+    def insert(self, parent, index, iid, values):
+        self.calls.append("insert")
+        self.values[iid] = values
+        self.children.append(iid)
+
+    def detach(self, *iids):
+        self.calls.append("detach")
+        self.children = [iid for iid in self.children if iid not in iids]
+
+    def move(self, iid, parent, index):
+        self.calls.append("move")
+        if iid in self.children:
+            self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def item(self, iid, values):
+        self.calls.append("item")
+        self.values[iid] = values
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def exists(self, iid):
+        return iid in self.values
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.values.pop(iid)
+            if iid in self.children:
+                self.children.remove(iid)
+
+    def shown(self):
+        return [(iid, self.values[iid]) for iid in self.children]
+
+
+def rows(*names):
+    return [(name, (name.upper(), "Female")) for name in names]
+
+
+def sync(tree, sync_rows):
+    tree.calls = []
+    tree.syncer.sync(sync_rows)
+    assert tree.shown() == [(iid, tuple(values)) for iid, values in sync_rows]
+    return tree.calls
+
+
+def make():
+    tree = FakeTree()
+    tree.syncer = TreeviewSync(tree)
+    return tree
+
+
+def test_first_sync_inserts_every_row():
+    tree = make()
+    assert sync(tree, rows("a", "b", "c")) == ["insert"] * 3
+
+
+def test_unchanged_rows_cost_nothing():
+    tree = make()
+    sync(tree, rows("a", "b", "c"))
+    assert sync(tree, rows("a", "b", "c")) == []
+
+
+def test_filtering_detaches_and_reattaches_in_order():
+    tree = make()
+    sync(tree, rows("a", "b", "c", "d"))
+    assert sync(tree, rows("b", "d")) == ["detach"]
+    assert sorted(sync(tree, rows("a", "b", "c", "d"))) == ["move", "move"]
+    # Nothing was inserted twice
+    assert len(tree.values) == 4
+
+
+def test_reordering_and_changed_values():
+    tree = make()
+    sync(tree, rows("a", "b", "c"))
+    changed = [("c", ("C", "Female")), ("a", ("A", "Male")), ("b", ("B", "Female"))]
+    calls = sync(tree, changed)
+    assert calls.count("item") == 1
+    assert "insert" not in calls
+
+
+def test_update_rewrites_only_known_changed_rows():
+    tree = make()
+    sync(tree, rows("a", "b"))
+    sync(tree, rows("a"))
+    tree.calls = []
+    tree.syncer.update("b", ("B ★", "Female"))
+    tree.syncer.update("a", ("A", "Female"))
+    tree.syncer.update("unknown", ("X",))
+    assert tree.calls == ["item"]
+    # The detached row shows its new values when it comes back
+    assert sync(tree, rows("a") + [("b", ("B ★", "Female"))]) == ["move"]
+
+
+def test_clear_deletes_attached_and_detached_rows():
+    tree = make()
+    sync(tree, rows("a", "b", "c"))
+    sync(tree, rows("a"))
+    tree.syncer.clear()
+    assert tree.values == {}
+    assert sync(tree, rows("b")) == ["insert"]
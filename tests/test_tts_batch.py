@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from tts_batch import Checkpoint, build_request, load_jobs
+
+
+def test_mark_done_survives_restart(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    output = tmp_path / "job1.mp3"
+    output.write_bytes(b"audio")
+
+    Checkpoint(path).mark_done("job1", "fp1", str(output))
+    checkpoint = Checkpoint(path)
+    assert checkpoint.is_done("job1", "fp1", str(output))
+    assert checkpoint.done["job1"]["output"] == str(output)
+
+
+def test_not_done_when_fingerprint_changed_or_output_missing(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    output = tmp_path / "job1.mp3"
+    output.write_bytes(b"audio")
+    checkpoint.mark_done("job1", "fp1", str(output))
+
+    assert not checkpoint.is_done("job1", "fp2", str(output))
+    assert not checkpoint.is_done("job2", "fp1", str(output))
+    output.unlink()
+    assert not checkpoint.is_done("job1", "fp1", str(output))
+
+
+def test_later_records_win_and_a_torn_line_is_skipped(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    records = [{"id": "job1", "fingerprint": "old"}, {"id": "job2", "fingerprint": "fp"},
+               {"id": "job1", "fingerprint": "new"}]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + '{"id": "job3", "fin')
+
+    checkpoint = Checkpoint(str(path))
+    assert checkpoint.done["job1"]["fingerprint"] == "new"
+    assert set(checkpoint.done) == {"job1", "job2"}
+
+
+def test_record_after_a_torn_line_is_kept(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text('{"id": "job1", "fin')
+    output = tmp_path / "job2.mp3"
+    output.write_bytes(b"audio")
+
+    Checkpoint(str(path)).mark_done("job2", "fp", str(output))
+    assert Checkpoint(str(path)).is_done("job2", "fp", str(output))
+
+
+DEFAULTS = {"voice": "en-US-AriaNeural", "backend": "edge", "format": "mp3", "rate": "+0",
+            "pitch": "+0", "volume": "+0", "language": "en-us", "speed": 1.0}
+
+
+def test_load_jobs_from_a_directory(tmp_path):
+    (tmp_path / "b.txt").write_text("Second", encoding="utf-8")
+    (tmp_path / "a.txt").write_text("First", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("Not a job", encoding="utf-8")
+    assert load_jobs(str(tmp_path)) == [{"id": "a", "text": "First"}, {"id": "b", "text": "Second"}]
+
+
+def test_load_jobs_from_csv(tmp_path):
+    (tmp_path / "texts").mkdir()
+    (tmp_path / "texts" / "long.txt").write_text("From a file", encoding="utf-8")
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("id,text,file,voice\n"
+                        "intro,Hello,,en-GB-SoniaNeural\n"
+                        ",,texts/long.txt,\n"
+                        "empty,,,\n"
+                        "intro,Again,,\n", encoding="utf-8")
+    jobs = load_jobs(str(manifest))
+    assert [(job["id"], job["text"]) for job in jobs] == [
+        ("intro", "Hello"), ("00002", "From a file"), ("intro_2", "Again")]
+    assert jobs[0]["voice"] == "en-GB-SoniaNeural"
+    assert "voice" not in jobs[1]
+
+
+def test_load_jobs_skips_malformed_jsonl_rows(tmp_path, capsys):
+    manifest = tmp_path / "manifest.jsonl"
+    lines = ['{"id": "ok", "text": "Fine"}', '["a", "list"]', '"just text"', '{"text": 42}',
+             '{"file": ["x"]}', '{"id": "cut", "te', "", '{"text": "Also fine"}']
+    manifest.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    jobs = load_jobs(str(manifest))
+    assert [(job["id"], job["text"]) for job in jobs] == [("ok", "Fine"), ("00007", "Also fine")]
+    skipped = capsys.readouterr().out.splitlines()
+    assert [line.split(":")[0] for line in skipped] == [
+        f"Skipping manifest entry {index}" for index in (2, 3, 4, 5, 6)]
+
+
+def test_load_jobs_rejects_other_inputs(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported input"):
+        load_jobs(str(tmp_path / "manifest.xml"))
+
+
+def test_build_request_manifest_fields_win():
+    job = {"id": "x", "text": "  Hello  ", "voice": "en-US-GuyNeural", "ssml": "yes", "speed": "1.5"}
+    request = build_request(job, DEFAULTS)
+    assert request.text == "Hello"
+    assert request.voice == "en-US-GuyNeural"
+    assert request.ssml is True
+    assert request.speed == 1.5
+    assert request.format == "mp3"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (10, "+10"), ("10", "+10"), ("+10", "+10"), ("-5", "-5"), ("10%", "+10"), (" -20 % ", "-20"), (0, "+0"),
+])
+def test_build_request_signs_prosody_values(value, expected):
+    request = build_request({"text": "Hi", "rate": value, "volume": value}, DEFAULTS)
+    assert request.rate == expected
+    assert request.volume == expected
+
+
+def test_build_request_pitch_in_hz():
+    assert build_request({"text": "Hi", "pitch": "5Hz"}, DEFAULTS).pitch == "+5"
+    assert build_request({"text": "Hi", "pitch": -3}, DEFAULTS).pitch == "-3"
+
+
+@pytest.mark.parametrize("field, value", [("rate", "fast"), ("rate", "1.5"), ("pitch", "5%"), ("speed", "quick")])
+def test_build_request_rejects_bad_values(field, value):
+    with pytest.raises(ValueError):
+        build_request({"text": "Hi", field: value}, DEFAULTS)
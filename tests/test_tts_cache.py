@@ -0,0 +1,70 @@
+import os
+
+import tts_cache
+from tts_cache import SynthesisCache
+
+
+def test_make_key_ignores_line_endings_and_surrounding_whitespace():
+    key = SynthesisCache.make_key(text="Hello\r\nworld ", voice="en-US-AriaNeural")
+    assert key == SynthesisCache.make_key(voice="en-US-AriaNeural", text="  Hello\nworld")
+    assert key != SynthesisCache.make_key(text="Hello\nworld", voice="en-US-GuyNeural")
+
+
+def test_put_then_get(tmp_path):
+    cache = SynthesisCache(str(tmp_path))
+    boundaries = [{"text": "Hello", "offset": 0, "duration": 100}]
+    cache.put("k", b"audio", boundaries)
+    assert cache.get("k") == (b"audio", boundaries)
+    assert cache.get("missing") is None
+    assert cache.size() == os.path.getsize(tmp_path / "k.audio") + os.path.getsize(tmp_path / "k.json")
+
+
+def test_put_without_timestamps(tmp_path):
+    cache = SynthesisCache(str(tmp_path))
+    cache.put("k", b"audio")
+    assert cache.get("k") == (b"audio", None)
+
+
+def test_put_file_and_copy_to(tmp_path):
+    source = tmp_path / "source.mp3"
+    source.write_bytes(b"streamed audio")
+    cache = SynthesisCache(str(tmp_path / "cache"))
+    cache.put_file("k", str(source))
+
+    destination = tmp_path / "out.mp3"
+    assert cache.copy_to("k", str(destination))
+    assert destination.read_bytes() == b"streamed audio"
+    assert not cache.copy_to("missing", str(tmp_path / "other.mp3"))
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(tts_cache.time, "time", lambda: next(clock))
+    cache = SynthesisCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    # Reading a makes b the least recently used entry
+    assert cache.get("a") is not None
+    cache.put("c", b"x" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert not (tmp_path / "b.audio").exists()
+
+
+def test_index_survives_restart(tmp_path):
+    SynthesisCache(str(tmp_path)).put("k", b"audio", [{"text": "Hi"}])
+    (tmp_path / "partial.audio.tmp").write_bytes(b"half written")
+
+    cache = SynthesisCache(str(tmp_path))
+    assert cache.get("k") == (b"audio", [{"text": "Hi"}])
+    assert "partial" not in cache._entries
+
+
+def test_clear(tmp_path):
+    cache = SynthesisCache(str(tmp_path))
+    cache.put("k", b"audio", [{"text": "Hi"}])
+    cache.clear()
+    assert cache.size() == 0
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,69 @@
+from tts_chunking import EDGE_MP3_BITRATE, TICKS_PER_SECOND, split_text, stitch_chunks
+
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes(140)
+
+
+def test_short_text_is_one_chunk():
+    assert split_text("Hello there. How are you?") == ["Hello there. How are you?"]
+
+
+def test_blank_text_gives_no_chunks():
+    assert split_text("") == []
+    assert split_text("  \n\n  \n") == []
+
+
+def test_paragraphs_are_packed_together_up_to_max_chars():
+    text = "First paragraph.\n\nSecond one.\n\n\nThird paragraph here."
+    assert split_text(text, max_chars=30) == ["First paragraph.\n\nSecond one.", "Third paragraph here."]
+
+
+def test_long_paragraph_splits_on_sentences():
+    text = "One two three. Four five six! Seven eight nine? Ten."
+    chunks = split_text(text, max_chars=30)
+    assert chunks == ["One two three. Four five six!", "Seven eight nine? Ten."]
+    assert all(len(chunk) <= 30 for chunk in chunks)
+
+
+def test_long_sentence_splits_on_words():
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    chunks = split_text(text, max_chars=12)
+    assert all(len(chunk) <= 12 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_overlong_word_is_cut_hard():
+    assert split_text("x" * 25, max_chars=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_cjk_sentences_split_without_spaces():
+    text = "今天天气很好。我们去公园吧！好的。"
+    assert split_text(text, max_chars=8) == ["今天天气很好。", "我们去公园吧！", "好的。"]
+
+
+def test_no_text_is_lost():
+    text = " ".join(f"Sentence number {n} is here." for n in range(200))
+    chunks = split_text(text, max_chars=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_stitch_chunks_rebases_offsets_on_exact_durations():
+    results = [
+        (FRAME * 10, [{"text": "one", "offset": 0}, {"text": "two", "offset": 1000}]),
+        (FRAME * 5, [{"text": "three", "offset": 0}]),
+        (FRAME, [{"text": "four", "offset": 500}]),
+    ]
+    audio, timestamps = stitch_chunks(results)
+    assert audio == FRAME * 16
+    first = 10 * 576 * TICKS_PER_SECOND // 24000
+    second = 5 * 576 * TICKS_PER_SECOND // 24000
+    assert [(t["text"], t["offset"]) for t in timestamps] == [
+        ("one", 0), ("two", 1000), ("three", first), ("four", first + second + 500)]
+    # The input boundaries are left as they were
+    assert results[2][1][0]["offset"] == 500
+
+
+def test_stitch_chunks_estimates_unparsable_audio_from_the_bitrate():
+    audio, timestamps = stitch_chunks([(b"x" * 6000, []), (FRAME, [{"text": "next"}])])
+    assert audio == b"x" * 6000 + FRAME
+    assert timestamps == [{"text": "next", "offset": 6000 * 8 * TICKS_PER_SECOND // EDGE_MP3_BITRATE}]
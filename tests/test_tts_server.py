@@ -0,0 +1,132 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from tts_cache import SynthesisCache
+from tts_engine import SynthesisResult
+from tts_server import SpeechServer
+
+
+class FakeEngine:
+    """Counts syntheses, each one waits for release to be set"""
+
+    def __init__(self):
+        self.requests = []
+        self._release = None
+
+    @property
+    def release(self):
+        # Made on first use, on the loop the test runs
+        if self._release is None:
+            self._release = asyncio.Event()
+        return self._release
+
+    async def synthesize(self, request):
+        self.requests.append(request)
+        await self.release.wait()
+        return SynthesisResult(b"audio for " + request.text.encode(), request.format,
+                               [{"text": "Hello", "offset": 0}])
+
+
+def run(server, test, **kwargs):
+    """Run test(client) against the server's app on a fresh event loop"""
+    async def main():
+        async with TestClient(TestServer(server.make_app())) as client:
+            return await test(client)
+    return asyncio.run(main())
+
+
+def post(client, body, **kwargs):
+    data = body if isinstance(body, (bytes, str)) else json.dumps(body)
+    return client.post("/v1/audio/speech", data=data, **kwargs)
+
+
+async def error_of(response):
+    return response.status, (await response.json())["error"]["message"]
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"not json", "Request body must be JSON"),
+    ([1, 2], "Request body must be a JSON object"),
+    ({}, "'input' must be a non-empty string"),
+    ({"input": "   "}, "'input' must be a non-empty string"),
+    ({"input": 5}, "'input' must be a non-empty string"),
+    ({"input": "Hi", "response_format": "aiff"}, "Unsupported response_format 'aiff'"),
+    ({"input": "Hi", "speed": "fast"}, "'speed' must be a number"),
+    ({"input": "Hi", "speed": 9}, "'speed' must be between 0.25 and 4.0"),
+])
+def test_invalid_requests_get_400(body, message):
+    server = SpeechServer()
+    server.engine = FakeEngine()
+
+    async def test(client):
+        return await error_of(await post(client, body))
+
+    status, error = run(server, test)
+    assert status == 400
+    assert error.startswith(message)
+    assert server.engine.requests == []
+
+
+def test_api_key_unknown_routes_and_methods():
+    server = SpeechServer(api_key="secret")
+
+    async def test(client):
+        return [
+            (await error_of(await post(client, {"input": "Hi"})))[0],
+            (await error_of(await post(client, {"input": "Hi"}, headers={"Authorization": "Bearer wrong"})))[0],
+            (await client.get("/nowhere")).status,
+            (await client.get("/v1/audio/speech")).status,
+            (await client.get("/health")).status,
+        ]
+
+    assert run(server, test) == [401, 401, 404, 405, 200]
+
+
+def test_cache_hit_is_served_without_synthesis(tmp_path):
+    cache = SynthesisCache(str(tmp_path))
+    server = SpeechServer(cache)
+    request = server.build_request({"input": "Hello there", "voice": "en-US-GuyNeural", "speed": 1.5})
+    assert request.rate == "+50"
+    cache.put(server.engine.cache_key(request), b"cached audio", [{"text": "Hello", "offset": 0}])
+
+    async def test(client):
+        body = {"input": "Hello there", "voice": "en-US-GuyNeural", "speed": 1.5, "word_timestamps": True}
+        audio = await post(client, body)
+        as_json = await post(client, body, headers={"Accept": "application/json"})
+        return audio.status, audio.headers, await audio.read(), await as_json.json()
+
+    status, headers, audio, as_json = run(server, test)
+    assert status == 200
+    assert headers["Content-Type"] == "audio/mpeg"
+    assert headers["X-Cache"] == "hit"
+    assert audio == b"cached audio"
+    assert base64.b64decode(as_json["audio"]) == b"cached audio"
+    assert as_json["word_timestamps"][0]["text"] == "Hello"
+
+
+def test_identical_requests_share_one_synthesis():
+    server = SpeechServer()
+    engine = server.engine = FakeEngine()
+
+    async def test(client):
+        first = asyncio.ensure_future(post(client, {"input": "Same text"}))
+        second = asyncio.ensure_future(post(client, {"input": "Same text"}))
+        other = asyncio.ensure_future(post(client, {"input": "Other text"}))
+        while len(engine.requests) < 2:
+            await asyncio.sleep(0.01)
+        # Give the duplicate time to arrive before the synthesis finishes
+        await asyncio.sleep(0.05)
+        engine.release.set()
+        responses = await asyncio.gather(first, second, other)
+        return [await response.read() for response in responses]
+
+    assert run(server, test) == [b"audio for Same text", b"audio for Same text", b"audio for Other text"]
+    assert sorted(request.text for request in engine.requests) == ["Other text", "Same text"]
+    assert server._in_flight == {}
@@ -0,0 +1,54 @@
+from voice_index import VoiceIndex
+
+VOICES = [
+    {"ShortName": "en-US-AriaNeural", "FriendlyName": "Microsoft Aria Online (Natural) - English (United States)",
+     "Locale": "en-US", "Gender": "Female"},
+    {"ShortName": "en-US-GuyNeural", "FriendlyName": "Microsoft Guy Online (Natural) - English (United States)",
+     "Locale": "en-US", "Gender": "Male"},
+    {"ShortName": "en-GB-SoniaNeural", "FriendlyName": "Microsoft Sonia Online (Natural) - English (United Kingdom)",
+     "Locale": "en-GB", "Gender": "Female"},
+    {"ShortName": "de-DE-KatjaNeural", "FriendlyName": "Microsoft Katja Online (Natural) - German (Germany)",
+     "Locale": "de-DE", "Gender": "Female"},
+]
+
+LANGUAGES = {"en": "English", "de": "German"}
+
+
+def make_index():
+    return VoiceIndex(VOICES, lambda locale: LANGUAGES[locale.split("-")[0]])
+
+
+def test_rows_hold_display_values():
+    index = make_index()
+    assert index.rows[0]["short_name"] == "en-US-AriaNeural"
+    assert index.rows[3]["values"] == (VOICES[3]["FriendlyName"], "Female", "German (de-DE)", "de-DE-KatjaNeural")
+    assert index.by_name["en-GB-SoniaNeural"] == 2
+
+
+def test_no_filters_returns_every_row():
+    assert make_index().search() == [0, 1, 2, 3]
+
+
+def test_text_matches_token_prefixes():
+    index = make_index()
+    assert index.search("ar") == [0]
+    assert index.search("united") == [0, 1, 2]
+    # CamelCase parts of the short name are tokens of their own
+    assert index.search("neural") == [0, 1, 2, 3]
+    assert index.search("ENGLISH kingdom") == [2]
+
+
+def test_text_falls_back_to_substrings():
+    index = make_index()
+    assert index.search("onia") == [2]
+    assert index.search("xyz") == []
+
+
+def test_locale_gender_and_names():
+    index = make_index()
+    assert index.search(locale="en-US") == [0, 1]
+    assert index.search(gender="FEMALE") == [0, 2, 3]
+    assert index.search(locale="en-US", gender="female") == [0]
+    assert index.search(names=["de-DE-KatjaNeural", "en-US-GuyNeural", "gone-Voice"]) == [1, 3]
+    assert index.search("guy", names=["de-DE-KatjaNeural"]) == []
+    assert index.search(locale="fr-FR") == []
@@ -0,0 +1,194 @@
+"""Conversion of synthesized audio between output formats
+
+Edge TTS always delivers MP3: edge-tts requests the service's
+audio-24khz-48kbitrate-mono-mp3 output and offers no way to ask for another,
+so every other format is produced locally. ffmpeg, when it is on the PATH,
+handles all of them. Without it WAV is still available by decoding through
+pygame's mixer, provided the mixer has been initialized.
+
+Conversions run in a small worker pool, submit_transcode() and
+submit_transcode_file() return concurrent.futures.Future objects.
+"""
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+# Formats the pipeline can write, with the ffmpeg output options for each
+_FFMPEG_OUTPUT = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "4"],
+    "wav": ["-c:a", "pcm_s16le"],
+    "ogg": ["-c:a", "libvorbis", "-q:a", "4"],
+    "opus": ["-c:a", "libopus", "-b:a", "48k", "-f", "ogg"],
+    "webm": ["-c:a", "libopus", "-b:a", "48k"],
+    "flac": ["-c:a", "flac"],
+}
+SUPPORTED_FORMATS = tuple(_FFMPEG_OUTPUT)
+
+# Conversions running at once, the work itself happens in ffmpeg processes
+TRANSCODE_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class TranscodeError(Exception):
+    """Raised when audio can't be converted to the requested format"""
+
+
+def ffmpeg_path():
+    return shutil.which("ffmpeg")
+
+
+def _pygame_ready():
+    return pygame is not None and bool(pygame.mixer.get_init())
+
+
+def available_formats():
+    """Output formats that can be produced on this machine right now"""
+    if ffmpeg_path():
+        return SUPPORTED_FORMATS
+    if _pygame_ready():
+        return ("mp3", "wav")
+    return ("mp3",)
+
+
+def format_of(path):
+    """Lower-case extension of path if it names a supported format, else None"""
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return extension if extension in _FFMPEG_OUTPUT else None
+
+
+def transcode(data, target, source="mp3"):
+    """Audio bytes in source format converted to target format"""
+    target = target.lower()
+    if target == source.lower():
+        return data
+    if target not in _FFMPEG_OUTPUT:
+        raise TranscodeError(f"Unsupported output format: {target}")
+
+    ffmpeg = ffmpeg_path()
+    if ffmpeg:
+        with tempfile.TemporaryDirectory(prefix="tts_transcode_") as work_dir:
+            source_path = os.path.join(work_dir, f"input.{source}")
+            with open(source_path, 'wb') as f:
+                f.write(data)
+            output_path = os.path.join(work_dir, f"output.{target}")
+            _run_ffmpeg(ffmpeg, source_path, output_path, target)
+            with open(output_path, 'rb') as f:
+                return f.read()
+    if target == "wav" and _pygame_ready():
+        return _decode_to_wav(data)
+    raise TranscodeError(f"Converting audio to {target} needs ffmpeg on the PATH")
+
+
+def transcode_file(source_path, output_path, target=None):
+    """Convert a file into output_path, the target format defaults to output_path's extension
+
+    Nothing is read into memory when ffmpeg does the work or the formats
+    already match.
+    """
+    target = (target or format_of(output_path) or "").lower()
+    source = format_of(source_path)
+    if not target or target == source:
+        shutil.copyfile(source_path, output_path)
+        return output_path
+    if target not in _FFMPEG_OUTPUT:
+        raise TranscodeError(f"Unsupported output format: {target}")
+
+    ffmpeg = ffmpeg_path()
+    if ffmpeg:
+        # Write next to the destination and move it into place once complete
+        tmp_path = output_path + f".tmp.{target}"
+        try:
+            _run_ffmpeg(ffmpeg, source_path, tmp_path, target)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return output_path
+
+    with open(source_path, 'rb') as f:
+        data = transcode(f.read(), target, source or "mp3")
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return output_path
+
+
+def _run_ffmpeg(ffmpeg, source_path, output_path, target):
+    # Output goes to a real file, not a pipe, so ffmpeg can write complete
+    # headers (WAV sizes, FLAC stream info, WebM cues)
+    command = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+               "-i", source_path, "-vn", *_FFMPEG_OUTPUT[target], output_path]
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        message = process.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise TranscodeError(f"ffmpeg could not convert to {target}: "
+                             f"{message[-1] if message else process.returncode}")
+
+
+def _decode_to_wav(data):
+    """Decode audio with the pygame mixer into a 16-bit WAV at the mixer's rate"""
+    frequency, size, channels = pygame.mixer.get_init()
+    if size != -16:
+        raise TranscodeError("Converting audio to wav without ffmpeg needs a 16-bit mixer")
+    sound = pygame.mixer.Sound(file=io.BytesIO(data))
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(frequency)
+        wav_file.writeframes(sound.get_raw())
+    return output.getvalue()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TRANSCODE_WORKERS, thread_name_prefix="transcode")
+        return _executor
+
+
+def submit_transcode(data, target, source="mp3"):
+    """Run transcode() in the worker pool, returns a Future of the converted bytes"""
+    return _get_executor().submit(transcode, data, target, source)
+
+
+def _pin(path):
+    """A hard link to path, or a copy where links aren't possible, that outlives changes to path"""
+    root, extension = os.path.splitext(path)
+    pinned = f"{root}.{uuid.uuid4().hex[:8]}.pinned{extension}"
+    try:
+        os.link(path, pinned)
+    except OSError:
+        shutil.copyfile(path, pinned)
+    return pinned
+
+
+def submit_transcode_file(source_path, output_path, target=None):
+    """Run transcode_file() in the worker pool, returns a Future of output_path
+
+    The source is pinned before the job is queued, so the caller may delete
+    or replace source_path straight away, e.g. when a new generation
+    replaces its temp file.
+    """
+    pinned = _pin(source_path)
+
+    def run():
+        try:
+            return transcode_file(pinned, output_path, target)
+        finally:
+            os.remove(pinned)
+
+    return _get_executor().submit(run)
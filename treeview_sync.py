@@ -0,0 +1,63 @@
+"""Incremental row diffing for ttk.Treeview widgets"""
+
+
+class TreeviewSync:
+    """Keeps a flat Treeview in step with a list of rows using as few Tk calls as possible
+
+    Every row has a stable iid. sync() detaches rows that are no longer wanted,
+    inserts rows seen for the first time, reattaches or moves rows that are out
+    of place, and only rewrites values that actually changed.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._values = {}     # iid -> values currently shown for the item
+        self._attached = []   # iids currently attached, in display order
+
+    def sync(self, rows):
+        """Make the tree show exactly rows, a list of (iid, values) in display order"""
+        wanted = [iid for iid, _ in rows]
+        wanted_set = set(wanted)
+
+        # Hide rows that are no longer wanted
+        hidden = [iid for iid in self._attached if iid not in wanted_set]
+        if hidden:
+            self.tree.detach(*hidden)
+        current = [iid for iid in self._attached if iid in wanted_set]
+
+        for iid, values in rows:
+            values = tuple(values)
+            if iid not in self._values:
+                self.tree.insert("", "end", iid=iid, values=values)
+                current.append(iid)
+            elif self._values[iid] != values:
+                self.tree.item(iid, values=values)
+            self._values[iid] = values
+
+        # Reattach detached rows and fix the order, touching only rows out of place
+        for index, iid in enumerate(wanted):
+            if index < len(current) and current[index] == iid:
+                continue
+            self.tree.move(iid, "", index)
+            if iid in current:
+                current.remove(iid)
+            current.insert(index, iid)
+        self._attached = wanted
+
+    def update(self, iid, values):
+        """Rewrite one known row in place, whether it is attached or not"""
+        values = tuple(values)
+        if iid in self._values and self._values[iid] != values:
+            self.tree.item(iid, values=values)
+            self._values[iid] = values
+
+    def clear(self):
+        """Delete every item, known or not, and forget all state"""
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for iid in list(self._values):
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+        self._values = {}
+        self._attached = []
@@ -0,0 +1,319 @@
+"""Command-line batch conversion of many texts to audio without the GUI
+
+Examples:
+    python tts_batch.py prompts/ -o out/ --voice en-US-AriaNeural --parallel 8
+    python tts_batch.py manifest.csv -o out/
+    python tts_batch.py manifest.jsonl -o out/ --backend lemonfox --api-key KEY
+
+A directory input converts every .txt file in it. A manifest has one job per
+CSV row or JSON line with a "text" (or "file") field and optionally "id",
+"voice", "backend", "format", "rate", "pitch", "volume", "ssml", "language"
+and "speed", which override the command-line defaults for that job.
+
+Each job writes <id>.<format> and, when word timestamps are available,
+<id>_timestamps.json to the output directory. Finished jobs are recorded in
+a checkpoint file, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from tts_engine import EdgeEngine, LemonFoxEngine, SynthesisRequest
+from tts_cache import SynthesisCache
+from tts_chunking import DEFAULT_CONCURRENCY
+from rate_limit import TokenBucket, DEFAULT_REQUESTS_PER_SECOND
+
+CHECKPOINT_NAME = ".tts_batch_checkpoint.jsonl"
+DEFAULT_PARALLEL_JOBS = 4
+
+# Manifest fields that map onto SynthesisRequest attributes
+_REQUEST_FIELDS = ("voice", "backend", "format", "rate", "pitch", "volume", "ssml", "language", "speed")
+_UNSAFE_NAME = re.compile(r'[^\w\-. ]')
+# Edge TTS prosody fields and their units, the service wants a signed whole number
+_PROSODY_UNITS = {"rate": "%", "pitch": "Hz", "volume": "%"}
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _signed(name, value):
+    """Prosody value with the sign Edge TTS needs, 10, "10" and "+10%" all give +10"""
+    text = str(value).strip()
+    unit = _PROSODY_UNITS[name]
+    if text.lower().endswith(unit.lower()):
+        text = text[:-len(unit)].strip()
+    try:
+        return f"{int(text):+d}"
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number of {unit}, e.g. +10, got {value!r}")
+
+
+def _safe_id(value):
+    """Job id usable as a file name"""
+    return _UNSAFE_NAME.sub('_', str(value)).strip() or "job"
+
+
+def load_jobs(source):
+    """List of job dicts (id, text, and optional overrides) from a directory or manifest"""
+    if os.path.isdir(source):
+        jobs = []
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if name.lower().endswith(".txt") and os.path.isfile(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    jobs.append({"id": os.path.splitext(name)[0], "text": f.read()})
+        return jobs
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    if source.lower().endswith(".csv"):
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    elif source.lower().endswith((".jsonl", ".ndjson")):
+        rows = []
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # Kept in place so the entry numbers printed below match the file
+                    rows.append(None)
+    else:
+        raise ValueError(f"Unsupported input {source}: expected a directory, .csv or .jsonl file")
+
+    jobs = []
+    for index, row in enumerate(rows, start=1):
+        # One malformed entry must not stop the rest of the batch
+        if not isinstance(row, dict):
+            print(f"Skipping manifest entry {index}: not a JSON object")
+            continue
+        job = {key: value for key, value in row.items() if value not in (None, "")}
+        if not isinstance(job.get("text", ""), str) or not isinstance(job.get("file", ""), str):
+            print(f"Skipping manifest entry {index}: text and file must be strings")
+            continue
+        if "text" not in job and "file" in job:
+            # Paths in a manifest are relative to the manifest itself
+            with open(os.path.join(base_dir, job["file"]), 'r', encoding='utf-8') as f:
+                job["text"] = f.read()
+        if not job.get("text", "").strip():
+            print(f"Skipping manifest entry {index}: no text")
+            continue
+        job["id"] = job.get("id") or f"{index:05d}"
+        jobs.append(job)
+
+    # Ids become file names, so two entries must never share one
+    seen = set()
+    for job in jobs:
+        job_id = base_id = _safe_id(job["id"])
+        suffix = 2
+        while job_id in seen:
+            job_id = f"{base_id}_{suffix}"
+            suffix += 1
+        seen.add(job_id)
+        job["id"] = job_id
+    return jobs
+
+
+def build_request(job, defaults):
+    """SynthesisRequest for a job, manifest fields win over command-line defaults"""
+    options = dict(defaults)
+    for name in _REQUEST_FIELDS:
+        if name in job:
+            options[name] = job[name]
+    options["ssml"] = _bool(options.get("ssml", False))
+    for name in _PROSODY_UNITS:
+        if name in options:
+            options[name] = _signed(name, options[name])
+    options["speed"] = float(options.get("speed", 1.0))
+    return SynthesisRequest(text=job["text"].strip(), **options)
+
+
+def request_fingerprint(request):
+    """Hash identifying the rendering a checkpoint entry refers to"""
+    payload = json.dumps(request.__dict__, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """Append-only record of finished jobs, one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = {}
+        # A crash can leave the last line unterminated, the next record starts on a line of its own
+        self._torn = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._torn = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash, the job simply runs again
+                        continue
+                    self.done[record["id"]] = record
+
+    def is_done(self, job_id, fingerprint, output_file):
+        record = self.done.get(job_id)
+        return (record is not None and record.get("fingerprint") == fingerprint
+                and os.path.exists(output_file))
+
+    def mark_done(self, job_id, fingerprint, output_file):
+        record = {"id": job_id, "fingerprint": fingerprint, "output": output_file, "finished": time.time()}
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(("\n" if self._torn else "") + json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._torn = False
+            self.done[job_id] = record
+
+
+def _write_atomic(path, data, mode='wb'):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+async def run_jobs(jobs, defaults, args):
+    """Synthesize all jobs with at most args.parallel running at once"""
+    os.makedirs(args.output_dir, exist_ok=True)
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(args.output_dir, CHECKPOINT_NAME))
+    cache = SynthesisCache(args.cache_dir) if args.cache_dir else None
+
+    edge_engine = EdgeEngine(cache, args.chunk_concurrency)
+    # LemonFox requests share one rate limit however many jobs run at once
+    rate_limiter = TokenBucket(args.rate_limit, max_in_flight=args.parallel)
+    lemonfox_engine = LemonFoxEngine(args.api_key, args.base_url, args.timeout, cache=cache,
+                                     rate_limiter=rate_limiter)
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.parallel)
+    totals = {"done": 0, "skipped": 0, "failed": 0}
+    total = len(jobs)
+
+    async def run(position, job):
+        job_id = _safe_id(job["id"])
+        try:
+            request = build_request(job, defaults)
+        except (TypeError, ValueError) as e:
+            totals["failed"] += 1
+            print(f"[{position}/{total}] {job_id} has invalid settings: {str(e)}", file=sys.stderr)
+            return
+        fingerprint = request_fingerprint(request)
+        output_file = os.path.join(args.output_dir, f"{job_id}.{request.format}")
+        timestamp_file = os.path.join(args.output_dir, f"{job_id}_timestamps.json")
+
+        if checkpoint.is_done(job_id, fingerprint, output_file):
+            totals["skipped"] += 1
+            return
+
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if request.backend == "edge":
+                    result = await edge_engine.synthesize(request)
+                elif request.backend == "lemonfox":
+                    if not args.api_key:
+                        raise ValueError("the lemonfox backend needs --api-key or LEMONFOX_API_KEY")
+                    # The LemonFox client blocks, keep it off the event loop. The
+                    # download streams to a temp file that replaces the output once complete
+                    result = await loop.run_in_executor(None, lemonfox_engine.synthesize,
+                                                        request, output_file + ".tmp")
+                else:
+                    raise ValueError(f"unknown backend {request.backend}")
+
+                if result.path:
+                    os.replace(result.path, output_file)
+                else:
+                    _write_atomic(output_file, result.audio)
+                if request.word_timestamps and result.word_boundaries:
+                    _write_atomic(timestamp_file, json.dumps(result.word_boundaries), 'w')
+                checkpoint.mark_done(job_id, fingerprint, output_file)
+
+                totals["done"] += 1
+                elapsed = time.perf_counter() - started
+                print(f"[{position}/{total}] {job_id} -> {output_file} ({elapsed:.1f}s)")
+            except Exception as e:
+                totals["failed"] += 1
+                print(f"[{position}/{total}] {job_id} failed: {str(e)}", file=sys.stderr)
+
+    await asyncio.gather(*(run(position, job) for position, job in enumerate(jobs, start=1)))
+    return totals
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a directory or manifest of texts to audio files.")
+    parser.add_argument("source", help="directory of .txt files, or a .csv/.jsonl manifest")
+    parser.add_argument("-o", "--output-dir", default="output", help="where audio and timestamps are written")
+    parser.add_argument("--backend", choices=["edge", "lemonfox"], default="edge")
+    parser.add_argument("--voice", default="en-US-AriaNeural", help="default voice for jobs that don't name one")
+    parser.add_argument("--format", default="mp3", help="audio format / file extension")
+    parser.add_argument("--rate", default="+0", help="Edge TTS rate in percent, e.g. +10")
+    parser.add_argument("--pitch", default="+0", help="Edge TTS pitch in Hz, e.g. -5")
+    parser.add_argument("--volume", default="+0", help="Edge TTS volume in percent")
+    parser.add_argument("--language", default="en-us", help="LemonFox language code")
+    parser.add_argument("--speed", type=float, default=1.0, help="LemonFox speed")
+    parser.add_argument("--no-timestamps", action="store_true", help="don't request or write word timestamps")
+    parser.add_argument("-j", "--parallel", type=int, default=DEFAULT_PARALLEL_JOBS,
+                        help="number of jobs synthesized at the same time")
+    parser.add_argument("--chunk-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="parallel Edge TTS requests per long text")
+    parser.add_argument("--checkpoint", help=f"checkpoint file (default: <output-dir>/{CHECKPOINT_NAME})")
+    parser.add_argument("--cache-dir", help="reuse renderings from a synthesis cache directory")
+    parser.add_argument("--api-key", default=os.environ.get("LEMONFOX_API_KEY", ""), help="LemonFox API key")
+    parser.add_argument("--base-url", default="https://api.lemonfox.ai/", help="LemonFox API base URL")
+    parser.add_argument("--timeout", type=int, default=60, help="LemonFox request timeout in seconds")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="LemonFox requests per second, lowered automatically when the API throttles")
+    args = parser.parse_args(argv)
+    args.parallel = max(1, args.parallel)
+    args.chunk_concurrency = max(1, args.chunk_concurrency)
+    if args.rate_limit <= 0:
+        parser.error("--rate-limit must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        jobs = load_jobs(args.source)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {args.source}: {str(e)}", file=sys.stderr)
+        return 2
+
+    defaults = {
+        "voice": args.voice,
+        "backend": args.backend,
+        "format": args.format,
+        "word_timestamps": not args.no_timestamps,
+        "rate": args.rate,
+        "pitch": args.pitch,
+        "volume": args.volume,
+        "language": args.language,
+        "speed": args.speed,
+    }
+
+    started = time.perf_counter()
+    totals = asyncio.run(run_jobs(jobs, defaults, args))
+    elapsed = time.perf_counter() - started
+    print(f"Finished in {elapsed:.1f}s: {totals['done']} converted, "
+          f"{totals['skipped']} already done, {totals['failed']} failed")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""On-disk, content-addressed cache for synthesized audio and word timestamps"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+# Default size cap for a cache directory
+DEFAULT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+
+class SynthesisCache:
+    """Stores audio blobs and WordBoundary JSON keyed by a hash of the synthesis request
+
+    Entries are evicted least-recently-used first once the total size exceeds
+    max_bytes. The last-used time is kept in the file mtime so the order
+    survives restarts.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> {"files": [...], "size": int, "last_used": float}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(**request):
+        """Hash a normalized synthesis request into a cache key"""
+        normalized = {}
+        for name, value in request.items():
+            if isinstance(value, str):
+                # Line endings and surrounding whitespace don't change the audio
+                value = value.replace("\r\n", "\n").strip()
+            normalized[name] = value
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        """Rebuild the in-memory index from the files in the cache directory"""
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            key = entry.name.split(".", 1)[0]
+            stat = entry.stat()
+            info = self._entries.setdefault(key, {"files": [], "size": 0, "last_used": 0.0})
+            info["files"].append(entry.path)
+            info["size"] += stat.st_size
+            info["last_used"] = max(info["last_used"], stat.st_mtime)
+
+    def _audio_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.audio")
+
+    def _timestamps_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return (audio_bytes, word_boundaries) for a key, or None on a miss"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+
+            try:
+                with open(self._audio_path(key), 'rb') as f:
+                    audio_data = f.read()
+
+                word_boundaries = None
+                if os.path.exists(self._timestamps_path(key)):
+                    with open(self._timestamps_path(key), 'r') as f:
+                        word_boundaries = json.load(f)
+            except Exception as e:
+                print(f"Error reading cache entry: {str(e)}")
+                self._remove(key)
+                return None
+
+            self._touch(key)
+            return audio_data, word_boundaries
+
+    def copy_to(self, key, destination):
+        """Copy a cached rendering's audio to destination, returns False on a miss
+
+        The file is copied rather than read, so large audio is never held in
+        memory as a whole.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+
+            try:
+                shutil.copyfile(self._audio_path(key), destination)
+            except Exception as e:
+                print(f"Error reading cache entry: {str(e)}")
+                self._remove(key)
+                return False
+
+            self._touch(key)
+            return True
+
+    def _touch(self, key):
+        # Mark as most recently used
+        now = time.time()
+        for path in self._entries[key]["files"]:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        self._entries[key]["last_used"] = now
+
+    def put(self, key, audio_data, word_boundaries=None):
+        """Store audio and optional word timestamps, then evict down to the size cap"""
+        with self._lock:
+            files = []
+            try:
+                files.append(self._write(self._audio_path(key), audio_data))
+                if word_boundaries:
+                    files.append(self._write(self._timestamps_path(key),
+                                             json.dumps(word_boundaries).encode("utf-8")))
+            except Exception as e:
+                print(f"Error writing cache entry: {str(e)}")
+                self._remove(key)
+                return
+
+            self._add(key, files)
+
+    def put_file(self, key, source_path, word_boundaries=None):
+        """Like put(), but copies the audio from a file instead of taking bytes"""
+        with self._lock:
+            files = []
+            try:
+                audio_path = self._audio_path(key)
+                shutil.copyfile(source_path, audio_path + ".tmp")
+                os.replace(audio_path + ".tmp", audio_path)
+                files.append(audio_path)
+                if word_boundaries:
+                    files.append(self._write(self._timestamps_path(key),
+                                             json.dumps(word_boundaries).encode("utf-8")))
+            except Exception as e:
+                print(f"Error writing cache entry: {str(e)}")
+                self._remove(key)
+                return
+
+            self._add(key, files)
+
+    def _add(self, key, files):
+        self._entries[key] = {
+            "files": files,
+            "size": sum(os.path.getsize(path) for path in files),
+            "last_used": time.time()
+        }
+        self._evict()
+
+    def _write(self, path, data):
+        # Write to a temp file first so readers never see a partial entry
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+    def _remove(self, key):
+        info = self._entries.pop(key, None)
+        paths = info["files"] if info else [self._audio_path(key), self._timestamps_path(key)]
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = sum(info["size"] for info in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_used"]):
+            total -= self._entries[key]["size"]
+            self._remove(key)
+            if total <= self.max_bytes:
+                break
+
+    def size(self):
+        """Total bytes currently held by the cache"""
+        with self._lock:
+            return sum(info["size"] for info in self._entries.values())
+
+    def clear(self):
+        """Remove every cache entry"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
@@ -0,0 +1,159 @@
+"""Sentence-aware text chunking and audio/timestamp stitching for long Edge TTS syntheses"""
+import asyncio
+import re
+
+from mp3_frames import concatenate
+
+# WordBoundary offsets and durations are reported in 100-nanosecond ticks
+TICKS_PER_SECOND = 10000000
+
+# Edge TTS streams 24kHz mono MP3 at a constant 48 kbit/s
+EDGE_MP3_BITRATE = 48000
+
+# Maximum characters sent in a single Communicate call
+DEFAULT_CHUNK_CHARS = 3000
+
+# Number of chunks synthesized at the same time
+DEFAULT_CONCURRENCY = 4
+
+_PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?;:])\s+|(?<=[。！？；])')
+
+
+def split_text(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """Split text into chunks of at most max_chars on paragraph and sentence boundaries"""
+    chunks = []
+    current = ""
+
+    def flush():
+        nonlocal current
+        if current.strip():
+            chunks.append(current.strip())
+        current = ""
+
+    def add_piece(piece, separator):
+        nonlocal current
+        if not current:
+            current = piece
+        elif len(current) + len(separator) + len(piece) <= max_chars:
+            current += separator + piece
+        else:
+            flush()
+            current = piece
+
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        # Whole paragraph fits, keep it together
+        if len(paragraph) <= max_chars:
+            add_piece(paragraph, "\n\n")
+            continue
+
+        # Paragraph is too long, fall back to sentences
+        flush()
+        for sentence in _SENTENCE_SPLIT.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if len(sentence) <= max_chars:
+                add_piece(sentence, " ")
+                continue
+
+            # Sentence is too long, fall back to words and finally hard cuts
+            for word in sentence.split():
+                while len(word) > max_chars:
+                    flush()
+                    chunks.append(word[:max_chars])
+                    word = word[max_chars:]
+                if word:
+                    add_piece(word, " ")
+        flush()
+
+    flush()
+    return chunks
+
+
+def stitch_chunks(results):
+    """Join per-chunk (audio, word_boundaries) results onto a single timeline
+
+    The MP3 chunks are concatenated frame by frame with their headers
+    stripped, and each chunk's WordBoundary offsets, which start at zero, are
+    shifted by the exact duration of the frames that precede the chunk.
+    """
+    results = list(results)
+    audio, indexes = concatenate(chunk_audio for chunk_audio, _ in results)
+    timestamps = []
+    offset = 0
+
+    for (chunk_audio, word_boundaries), index in zip(results, indexes):
+        for boundary in word_boundaries:
+            rebased = dict(boundary)
+            rebased["offset"] = boundary.get("offset", 0) + offset
+            timestamps.append(rebased)
+
+        if index["sample_rate"]:
+            offset += index["samples"] * TICKS_PER_SECOND // index["sample_rate"]
+        else:
+            # Not MP3 we can parse, estimate from Edge's constant bitrate
+            offset += len(chunk_audio) * 8 * TICKS_PER_SECOND // EDGE_MP3_BITRATE
+
+    return audio, timestamps
+
+
+async def synthesize_chunks(chunks, synthesize, concurrency=DEFAULT_CONCURRENCY, on_progress=None):
+    """Run synthesize(chunk) for every chunk with at most `concurrency` in flight
+
+    Results are returned in the order of `chunks` regardless of completion order.
+    on_progress(completed, total) is called after each chunk finishes.
+    """
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    completed = 0
+
+    async def run(chunk_text):
+        nonlocal completed
+        async with semaphore:
+            result = await synthesize(chunk_text)
+        completed += 1
+        if on_progress:
+            on_progress(completed, len(chunks))
+        return result
+
+    tasks = [asyncio.ensure_future(run(chunk_text)) for chunk_text in chunks]
+    try:
+        return await asyncio.gather(*tasks)
+    except Exception:
+        # Don't leave the remaining chunks running after a failure
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+class OrderedAudioFeed:
+    """Forwards audio from concurrently synthesized chunks to a sink in text order
+
+    Data for the chunk currently being played goes straight through. Data for
+    later chunks is held back until every chunk before it has closed.
+    Intended to be used from a single event loop thread.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._current = 0
+        self._pending = {}
+        self._closed = set()
+
+    def write(self, index, data):
+        if index == self._current:
+            self.sink(data)
+        else:
+            self._pending.setdefault(index, bytearray()).extend(data)
+
+    def close(self, index):
+        self._closed.add(index)
+        while self._current in self._closed:
+            self._current += 1
+            held = self._pending.pop(self._current, None)
+            if held:
+                self.sink(bytes(held))
@@ -0,0 +1,452 @@
+"""UI-free speech synthesis engine shared by the Tk apps and headless tools
+
+Both backends take a SynthesisRequest and return a SynthesisResult. Nothing
+here touches Tk, so the same code runs in the GUIs, in batch jobs and
+behind a server on machines without a display.
+"""
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Each backend's client library is only needed when that backend is used
+try:
+    import edge_tts
+except ImportError:
+    edge_tts = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+from tts_chunking import split_text, stitch_chunks, synthesize_chunks, OrderedAudioFeed, DEFAULT_CONCURRENCY
+from async_loop import get_shared_loop
+from rate_limit import TokenBucket, DEFAULT_REQUESTS_PER_SECOND
+from seek_index import locate_words
+from transcode import submit_transcode
+
+# Connections kept open to the LemonFox API per engine
+LEMONFOX_POOL_SIZE = 8
+# Bytes read from a streamed LemonFox response at a time
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Times a request answered with 429 is sent again, and the longest wait honoured
+THROTTLE_RETRIES = 5
+MAX_RETRY_AFTER = 120
+
+
+def retry_after_seconds(value, attempt=0):
+    """Seconds to wait from a Retry-After header, exponential backoff when it is missing"""
+    if value:
+        try:
+            return min(MAX_RETRY_AFTER, max(0.0, float(value)))
+        except ValueError:
+            try:
+                when = email.utils.parsedate_to_datetime(value)
+                return min(MAX_RETRY_AFTER, max(0.0, when.timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return min(MAX_RETRY_AFTER, 2.0 ** attempt)
+
+
+class SynthesisError(Exception):
+    """Raised when a backend refuses or fails a synthesis request"""
+
+
+@dataclass
+class SynthesisRequest:
+    text: str
+    voice: str
+    backend: str = "edge"           # "edge" or "lemonfox"
+    format: str = "mp3"
+    word_timestamps: bool = True
+    # Edge TTS only
+    rate: str = "+0"                # percent, as shown by the rate slider without the "%"
+    pitch: str = "+0"               # Hz, without the unit
+    volume: str = "+0"              # percent, without the "%"
+    ssml: bool = False
+    # LemonFox only
+    language: str = ""
+    speed: float = 1.0
+
+
+@dataclass
+class SynthesisResult:
+    # None when the audio was written to an output file instead, see path
+    audio: Optional[bytes]
+    format: str
+    # Edge TTS WordBoundary events with offsets on the timeline of audio, for
+    # plain text also the character offset of each word in the text (text_offset)
+    word_boundaries: List[dict] = field(default_factory=list)
+    cached: bool = False
+    # Set instead of audio when the audio was streamed straight to a file
+    path: Optional[str] = None
+
+
+class EdgeEngine:
+    """Synthesizes requests of any length with Edge TTS
+
+    Long plain text is split into chunks that are synthesized concurrently,
+    retried on their own and stitched back together with word timestamps
+    rebased onto one timeline. Edge TTS produces MP3, other formats are
+    transcoded in the transcode worker pool once the audio is complete.
+    Results are cached when a cache is given.
+    Must be awaited on an event loop, synthesize_blocking() runs it on the
+    shared background loop instead.
+    """
+
+    def __init__(self, cache=None, max_concurrency=DEFAULT_CONCURRENCY):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+
+    def cache_key(self, request):
+        # Audio cached before rate, pitch and volume reached Edge TTS was rendered
+        # without them, the prosody marker keeps it from matching these keys
+        return self.cache.make_key(
+            backend="edge", text=request.text, voice=request.voice, rate=request.rate,
+            pitch=request.pitch, volume=request.volume, format=request.format, ssml=request.ssml,
+            prosody=True
+        )
+
+    async def synthesize(self, request, on_audio=None, on_progress=None):
+        """Synthesize a request
+
+        on_audio    -- receives the MP3 audio in order as soon as it arrives,
+                       whatever format the result is converted to
+        on_progress -- called with (completed_chunks, total_chunks)
+        """
+        # The cache reads, hashes and writes files, which would stall every other
+        # synthesis sharing the event loop, so it runs in the default executor
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            key = self.cache_key(request)
+            cached = await loop.run_in_executor(None, self.cache.get, key)
+            if cached:
+                audio, word_boundaries = cached
+                if on_audio is not None and request.format == "mp3":
+                    on_audio(audio)
+                return SynthesisResult(audio, request.format, self._located(request, word_boundaries or []),
+                                       cached=True)
+
+        audio, word_boundaries = await self._synthesize_text(request, on_audio, on_progress)
+        if audio and request.format != "mp3":
+            # Decoding and encoding is CPU work, keep it off the event loop
+            audio = await asyncio.wrap_future(submit_transcode(audio, request.format))
+        if self.cache is not None and audio:
+            await loop.run_in_executor(None, self.cache.put, key, audio, word_boundaries)
+        return SynthesisResult(audio, request.format, self._located(request, word_boundaries))
+
+    @staticmethod
+    def _located(request, word_boundaries):
+        # Words of an SSML document can't be mapped back to its markup
+        return word_boundaries if request.ssml else locate_words(request.text, word_boundaries)
+
+    def synthesize_blocking(self, request, timeout=None):
+        """Run synthesize() on the shared background loop and wait for it"""
+        return get_shared_loop().run(self.synthesize(request), timeout)
+
+    async def _synthesize_text(self, request, on_audio=None, on_progress=None):
+        """Synthesize text of any length, returning the stitched audio and word timestamps"""
+        # SSML documents can't be split safely, long plain text is split on sentence boundaries
+        chunks = [request.text] if request.ssml else split_text(request.text)
+
+        # SSML documents carry their own prosody, plain text gets the request's
+        prosody = None if request.ssml else {
+            "rate": f"{request.rate}%", "pitch": f"{request.pitch}Hz", "volume": f"{request.volume}%"
+        }
+
+        # When streaming, hand audio on in text order as it arrives
+        feed = OrderedAudioFeed(on_audio) if on_audio is not None else None
+
+        async def synthesize(item):
+            index, chunk_text = item
+            if feed is None:
+                return await self.synthesize_chunk(request.voice, chunk_text, prosody=prosody)
+            try:
+                return await self.synthesize_chunk(request.voice, chunk_text, prosody=prosody,
+                                                   on_audio=lambda data: feed.write(index, data))
+            finally:
+                feed.close(index)
+
+        # Synthesize the chunks concurrently, retrying failed chunks on their own
+        results = await synthesize_chunks(
+            list(enumerate(chunks)),
+            synthesize,
+            concurrency=self.max_concurrency,
+            on_progress=on_progress
+        )
+
+        # Stitch the audio and rebase the word timestamps onto one timeline
+        return stitch_chunks(results)
+
+    async def synthesize_chunk(self, voice, text, attempts=3, on_audio=None, prosody=None):
+        """Synthesize a single chunk of text, returning its audio and WordBoundary events
+
+        prosody holds Edge TTS rate, pitch and volume strings such as "+10%",
+        "-5Hz" and "+0%". on_audio, if given, receives audio bytes as they
+        stream in. A retry only forwards bytes beyond what earlier attempts
+        already delivered.
+        """
+        if edge_tts is None:
+            raise SynthesisError("The edge-tts package is required for the Edge TTS backend")
+
+        forwarded = 0
+        for attempt in range(1, attempts + 1):
+            try:
+                communicate = edge_tts.Communicate(text, voice=voice, **(prosody or {}))
+                audio = bytearray()
+                word_boundaries = []
+
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio.extend(chunk["data"])
+                        if on_audio is not None and len(audio) > forwarded:
+                            on_audio(bytes(audio[forwarded:]))
+                            forwarded = len(audio)
+                    elif chunk["type"] == "WordBoundary":
+                        word_boundaries.append(chunk)
+
+                return bytes(audio), word_boundaries
+
+            except Exception as e:
+                if attempt == attempts:
+                    raise
+                print(f"Chunk synthesis failed (attempt {attempt} of {attempts}): {str(e)}")
+                await asyncio.sleep(attempt)
+
+
+class LemonFoxEngine:
+    """Synthesizes requests through the LemonFox v1/audio/speech API
+
+    One requests.Session with a pool of keep-alive connections and the retry
+    policy mounted once is shared by every call, so back-to-back requests
+    reuse an open TLS connection. The session is thread safe enough for
+    concurrent posts. An engine is tied to its base URL, timeout and proxies,
+    build a new one (and close() the old) when those change; the API key may
+    be updated in place.
+
+    Speech requests pass through rate_limiter, a TokenBucket that caps
+    requests per second and requests in flight across all threads using the
+    engine. A 429 response pauses every sender for its Retry-After and slows
+    the bucket down, then the request is sent again.
+    """
+
+    def __init__(self, api_key, base_url="https://api.lemonfox.ai/", timeout=60, proxies=None, cache=None,
+                 pool_size=LEMONFOX_POOL_SIZE, rate_limiter=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.proxies = proxies
+        self.cache = cache
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter or TokenBucket(DEFAULT_REQUESTS_PER_SECOND, max_in_flight=pool_size)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def matches(self, base_url, timeout, proxies):
+        """True if this engine's connection settings are the given ones"""
+        return (self.base_url, self.timeout, self.proxies) == (base_url, timeout, proxies)
+
+    @property
+    def session(self):
+        """The pooled session, created once on first use even when threads race for it"""
+        if requests is None:
+            raise SynthesisError("The requests package is required for the LemonFox backend")
+        with self._session_lock:
+            if self._session is None:
+                # 429 is left to the rate limiter, which honours Retry-After for every thread
+                retry_strategy = Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[500, 502, 503, 504]
+                )
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=max(self.pool_size, self.rate_limiter.max_in_flight),
+                                      max_retries=retry_strategy)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        """Close the pooled connections"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def endpoint(self, path):
+        base_url = self.base_url
+        if not base_url.endswith('/'):
+            base_url += '/'
+        return f"{base_url}{path}"
+
+    @property
+    def url(self):
+        return self.endpoint("v1/audio/speech")
+
+    @property
+    def headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def get(self, path):
+        """GET an API path over the pooled session, e.g. "v1/models" to test the connection"""
+        return self.session.get(self.endpoint(path), headers=self.headers,
+                                proxies=self.proxies, timeout=self.timeout)
+
+    @staticmethod
+    def request_body(request):
+        """JSON body of the API call for a request"""
+        data = {
+            "input": request.text,
+            "voice": request.voice,
+            "language": request.language,
+            "response_format": request.format,
+            "speed": float(request.speed)
+        }
+        if request.word_timestamps:
+            data["word_timestamps"] = True
+        return data
+
+    def synthesize(self, request, output_file=None, on_audio=None):
+        """Synthesize a request, blocking until the audio has been downloaded
+
+        output_file -- stream the audio into this file as it downloads instead
+                       of returning it as bytes. The file is flushed after
+                       every chunk, so it can be played before it is complete,
+                       and memory use stays the same for any length of audio.
+        on_audio    -- receives each downloaded chunk of audio bytes in order
+        """
+        if requests is None:
+            raise SynthesisError("The requests package is required for the LemonFox backend")
+
+        url = self.url
+        data = self.request_body(request)
+
+        # Reuse a previous rendering of the same request if we have one
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(backend="lemonfox", url=url, **data)
+            if output_file is not None:
+                if self.cache.copy_to(cache_key, output_file):
+                    if on_audio is not None:
+                        self._replay_file(output_file, on_audio)
+                    return SynthesisResult(None, request.format, cached=True, path=output_file)
+            else:
+                cached = self.cache.get(cache_key)
+                if cached:
+                    if on_audio is not None:
+                        on_audio(cached[0])
+                    return SynthesisResult(cached[0], request.format, cached=True)
+
+        response = self._post_speech(url, data)
+        try:
+            return self._receive(request, response, cache_key, output_file, on_audio)
+        finally:
+            self.rate_limiter.release()
+
+    def _post_speech(self, url, data):
+        """POST a speech request once the rate limiter allows it, sending it again after a 429
+
+        Returns the response with the limiter slot still held, the caller
+        releases it once the body has been read.
+        """
+        for attempt in range(THROTTLE_RETRIES + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.post(
+                    url,
+                    headers=self.headers,
+                    json=data,
+                    proxies=self.proxies,
+                    timeout=self.timeout,
+                    stream=True
+                )
+            except BaseException:
+                self.rate_limiter.release()
+                raise
+
+            if response.status_code != 429 or attempt == THROTTLE_RETRIES:
+                if response.status_code != 429:
+                    self.rate_limiter.succeeded()
+                return response
+
+            delay = retry_after_seconds(response.headers.get("Retry-After"), attempt)
+            print(f"LemonFox rate limit reached, retrying in {delay:.1f}s")
+            response.close()
+            self.rate_limiter.release()
+            self.rate_limiter.throttled(delay)
+
+    def _receive(self, request, response, cache_key, output_file, on_audio):
+        """Read a speech response into bytes or output_file"""
+        with response:
+            if response.status_code != 200:
+                error_message = f"API error: {response.status_code}"
+                try:
+                    error_json = response.json()
+                    if 'error' in error_json:
+                        error_message = f"API error: {error_json['error']['message']}"
+                except Exception:
+                    pass
+                raise SynthesisError(error_message)
+
+            if output_file is None:
+                audio = bytearray()
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    audio.extend(chunk)
+                    if on_audio is not None:
+                        on_audio(chunk)
+                audio_content = bytes(audio)
+                if cache_key is not None:
+                    self.cache.put(cache_key, audio_content)
+                return SynthesisResult(audio_content, request.format)
+
+            try:
+                with open(output_file, 'wb') as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        f.flush()
+                        if on_audio is not None:
+                            on_audio(chunk)
+            except BaseException:
+                # Never leave a truncated file that looks like a finished rendering
+                try:
+                    os.remove(output_file)
+                except OSError:
+                    pass
+                raise
+
+        if cache_key is not None:
+            self.cache.put_file(cache_key, output_file)
+        return SynthesisResult(None, request.format, path=output_file)
+
+    @staticmethod
+    def _replay_file(path, on_audio):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                on_audio(chunk)
+
+
+def synthesize(request, engine=None):
+    """Synthesize a request with the backend it names, blocking until done
+
+    engine -- a configured EdgeEngine or LemonFoxEngine. Edge TTS needs no
+              configuration and gets an uncached engine when omitted,
+              LemonFox always needs one for the API key.
+    """
+    if request.backend == "edge":
+        return (engine or EdgeEngine()).synthesize_blocking(request)
+    if request.backend == "lemonfox":
+        if engine is None:
+            raise ValueError("A LemonFoxEngine with an API key is required for the lemonfox backend")
+        return engine.synthesize(request)
+    raise ValueError(f"Unknown backend: {request.backend}")
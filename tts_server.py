@@ -0,0 +1,244 @@
+"""Local HTTP synthesis server with an OpenAI/LemonFox compatible speech endpoint
+
+    python tts_server.py --port 8880 --max-concurrent 8
+
+POST /v1/audio/speech takes the same JSON body LemonFoxApp sends (input,
+voice, language, response_format, speed, word_timestamps) and answers with
+the audio bytes, synthesized by Edge TTS. Pointing the LemonFox app's base
+URL at http://127.0.0.1:8880/ makes it use this server unchanged. Clients
+that send "Accept: application/json" get {"audio": <base64>, "format": ...,
+"word_timestamps": [...]} instead.
+
+The server runs on aiohttp.web, which edge-tts already depends on, so it
+needs nothing beyond the packages the apps already use. aiohttp handles
+keep-alive, chunked request bodies and the body size limit.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+from tts_engine import EdgeEngine, SynthesisRequest
+from tts_cache import SynthesisCache, DEFAULT_CACHE_MAX_BYTES
+from tts_chunking import DEFAULT_CONCURRENCY
+from transcode import available_formats
+
+DEFAULT_PORT = 8880
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_VOICE = "en-US-AriaNeural"
+MAX_BODY_BYTES = 1024 * 1024
+
+_CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg",
+    "webm": "audio/webm",
+    "flac": "audio/flac",
+}
+
+
+class RequestError(Exception):
+    """A client error that becomes an OpenAI-style error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SpeechServer:
+    """Serves /v1/audio/speech from one warm EdgeEngine
+
+    At most max_concurrent syntheses run at once, later requests wait.
+    Identical requests arriving while one is being synthesized share its
+    result, and finished renderings are kept in the on-disk synthesis cache.
+    """
+
+    def __init__(self, cache=None, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 chunk_concurrency=DEFAULT_CONCURRENCY, default_voice=DEFAULT_VOICE, api_key=None):
+        self.engine = EdgeEngine(cache, chunk_concurrency)
+        self.default_voice = default_voice
+        self.api_key = api_key
+        self.max_concurrent = max_concurrent
+        # MP3 is Edge's own output, the rest depend on the local transcoders
+        self.formats = available_formats()
+        self._semaphore = None
+        self._in_flight = {}
+
+    def build_request(self, body):
+        """SynthesisRequest from a LemonFox/OpenAI style JSON body"""
+        text = body.get("input")
+        if not isinstance(text, str) or not text.strip():
+            raise RequestError(400, "'input' must be a non-empty string")
+
+        response_format = str(body.get("response_format") or "mp3").lower()
+        if response_format not in self.formats:
+            raise RequestError(400, f"Unsupported response_format '{response_format}', "
+                                    f"supported: {', '.join(self.formats)}")
+
+        try:
+            speed = float(body.get("speed", 1.0))
+        except (TypeError, ValueError):
+            raise RequestError(400, "'speed' must be a number")
+        if not 0.25 <= speed <= 4.0:
+            raise RequestError(400, "'speed' must be between 0.25 and 4.0")
+
+        # OpenAI/LemonFox voice names aren't Edge voices, those get the default
+        voice = str(body.get("voice") or "")
+        if voice.count("-") < 2:
+            voice = self.default_voice
+
+        return SynthesisRequest(
+            text=text,
+            voice=voice,
+            backend="edge",
+            format=response_format,
+            word_timestamps=bool(body.get("word_timestamps", False)),
+            rate=f"{round((speed - 1) * 100):+d}",
+            language=str(body.get("language") or ""),
+            speed=speed
+        )
+
+    async def synthesize(self, request):
+        """Synthesize with the concurrency limit, sharing work between identical requests"""
+        key = (request.text, request.voice, request.rate, request.format)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        async def run():
+            async with self._semaphore:
+                return await self.engine.synthesize(request)
+
+        task = asyncio.ensure_future(run())
+        self._in_flight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._in_flight.pop(key, None)
+            else:
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+    async def handle_speech(self, http_request):
+        """POST /v1/audio/speech"""
+        headers = http_request.headers
+        if self.api_key and headers.get("Authorization") != f"Bearer {self.api_key}":
+            raise RequestError(401, "Invalid API key")
+        body = await http_request.read()
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(400, "Request body must be JSON")
+        if not isinstance(data, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+
+        request = self.build_request(data)
+        result = await self.synthesize(request)
+
+        if "application/json" in headers.get("Accept", ""):
+            return web.json_response({
+                "audio": base64.b64encode(result.audio).decode("ascii"),
+                "format": result.format,
+                "word_timestamps": result.word_boundaries if request.word_timestamps else None,
+            })
+
+        return web.Response(body=result.audio,
+                            content_type=_CONTENT_TYPES.get(result.format, "application/octet-stream"),
+                            headers={"X-Cache": "hit" if result.cached else "miss"})
+
+    async def handle_health(self, http_request):
+        return web.json_response({"status": "ok"})
+
+    async def handle_errors(self, http_request, handler):
+        """Middleware turning every failure into an OpenAI-style JSON error, and logging requests"""
+        started = time.perf_counter()
+        try:
+            response = await handler(http_request)
+        except RequestError as e:
+            response = self.error_response(e.status, e.message)
+        except web.HTTPException as e:
+            # Unknown routes, wrong methods and oversized bodies, raised by aiohttp
+            response = self.error_response(e.status, e.reason)
+        except Exception as e:
+            print(f"Error handling {http_request.method} {http_request.path}: {str(e)}", file=sys.stderr)
+            response = self.error_response(500, str(e))
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{http_request.method} {http_request.path} {response.status} "
+              f"{response.content_length or 0}B {elapsed:.0f}ms")
+        return response
+
+    @staticmethod
+    def error_response(status, message):
+        return web.json_response({"error": {"message": message, "type": "invalid_request_error"
+                                            if status < 500 else "server_error"}}, status=status)
+
+    def make_app(self):
+        """The aiohttp application serving the speech endpoint, made on the loop that runs it"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        @web.middleware
+        async def errors(http_request, handler):
+            return await self.handle_errors(http_request, handler)
+
+        app = web.Application(client_max_size=MAX_BODY_BYTES, middlewares=[errors])
+        app.router.add_post("/v1/audio/speech", self.handle_speech)
+        app.router.add_post("/v1/audio/speech/", self.handle_speech)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        runner = web.AppRunner(self.make_app(), access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, port).start()
+            print(f"Serving /v1/audio/speech on http://{host}:{port}/")
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Edge TTS through an OpenAI-compatible speech endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT,
+                        help="syntheses running at the same time, further requests queue")
+    parser.add_argument("--chunk-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="parallel Edge TTS requests per long text")
+    parser.add_argument("--voice", default=DEFAULT_VOICE,
+                        help="Edge voice used when a request names a non-Edge voice")
+    parser.add_argument("--cache-dir", default=os.path.join(os.path.expanduser("~"), "EdgeTTS", "cache"),
+                        help="response cache directory, shared with the Edge TTS app")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--no-cache", action="store_true", help="don't cache responses")
+    parser.add_argument("--api-key", default=os.environ.get("TTS_SERVER_API_KEY"),
+                        help="require this bearer token from clients")
+    args = parser.parse_args(argv)
+
+    if web is None:
+        print("The aiohttp package is required for the server, it is installed with edge-tts", file=sys.stderr)
+        return 1
+
+    cache = None if args.no_cache else SynthesisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    server = SpeechServer(cache, max(1, args.max_concurrent), max(1, args.chunk_concurrency),
+                          args.voice, args.api_key)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
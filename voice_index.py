@@ -0,0 +1,97 @@
+"""Precomputed search index over the Edge TTS voice catalog"""
+import re
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+_CAMEL_SPLIT = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+')
+
+
+def _tokens(text):
+    """Lower-cased tokens of a field, including the parts of CamelCase words"""
+    tokens = set(token for token in _TOKEN_SPLIT.split(text.lower()) if token)
+    tokens.update(part.lower() for part in _CAMEL_SPLIT.findall(text))
+    return tokens
+
+
+class VoiceIndex:
+    """Voice rows with pre-lowered fields, a token prefix index and locale/gender buckets
+
+    Built once when the voice list is loaded. search() answers a filter query
+    by intersecting posting lists instead of scanning every voice.
+    """
+
+    def __init__(self, voices, get_language_name):
+        self.rows = []
+        self.by_name = {}
+        self.by_locale = {}
+        self.by_gender = {}
+        self._prefixes = {}
+        self._haystacks = []
+
+        for row_id, voice in enumerate(voices):
+            locale = voice["Locale"]
+            gender = voice["Gender"]
+            language_name = get_language_name(locale)
+
+            row = {
+                "voice": voice,
+                "short_name": voice["ShortName"],
+                "values": (
+                    voice["FriendlyName"],
+                    gender,
+                    f"{language_name} ({locale})",
+                    voice["ShortName"]
+                )
+            }
+            self.rows.append(row)
+            self.by_name[voice["ShortName"]] = row_id
+            self.by_locale.setdefault(locale, set()).add(row_id)
+            self.by_gender.setdefault(gender.lower(), set()).add(row_id)
+
+            # Fields the search box matches against
+            fields = (voice["FriendlyName"], voice["ShortName"], locale)
+            self._haystacks.append("\n".join(field.lower() for field in fields))
+
+            for field in fields:
+                for token in _tokens(field):
+                    for end in range(1, len(token) + 1):
+                        self._prefixes.setdefault(token[:end], set()).add(row_id)
+
+    def _match_term(self, term):
+        """Ids of voices matching one search term"""
+        matches = self._prefixes.get(term)
+        if matches is not None:
+            return matches
+        # Not a token prefix (e.g. the middle of a word), fall back to substring matching
+        return set(row_id for row_id, haystack in enumerate(self._haystacks) if term in haystack)
+
+    def search(self, text="", locale=None, gender=None, names=None):
+        """Row ids matching all given filters, in catalog order
+
+        text     -- free text, every term must match a token prefix or substring
+        locale   -- exact locale code such as "en-US"
+        gender   -- "male", "female" or "neutral"
+        names    -- iterable of ShortNames to restrict to (e.g. favorites)
+        """
+        postings = []
+
+        if names is not None:
+            postings.append(set(self.by_name[name] for name in names if name in self.by_name))
+        if locale:
+            postings.append(self.by_locale.get(locale, set()))
+        if gender:
+            postings.append(self.by_gender.get(gender.lower(), set()))
+        for term in _TOKEN_SPLIT.split(text.lower()):
+            if term:
+                postings.append(self._match_term(term))
+
+        if not postings:
+            return list(range(len(self.rows)))
+
+        # Intersect starting from the smallest posting list
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return sorted(result)